@@ -0,0 +1,234 @@
+import csv
+import io
+import json
+import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from openpyxl import load_workbook
+
+from review_analyser.tracing import span
+from reviews.cache import REVIEWS_SCOPE, bump_version
+from reviews.indexing import mark_reviews_dirty
+from reviews.models import Review, review_text_hash
+from review_processor.near_duplicates import minhash, pack_signature
+from .pipeline import link_near_duplicates, lock_institution_reviews, save_reviews
+from .tasks import process_reviews_batch
+
+FILE_FORMATS = ("csv", "jsonl", "xlsx")
+CHUNK_SIZE = 5000
+POSTPROCESSING_BATCH_SIZE = 200
+
+STAGING_COLUMNS = ["text", "text_hash", "minhash", "source_external_id", "reviewed_at"]
+
+
+def detect_file_format(filename: str) -> Optional[str]:
+    extension = filename.rsplit(".", 1)[-1].lower()
+    return extension if extension in FILE_FORMATS else None
+
+
+def iter_file_rows(fileobj, file_format: str) -> Iterator[Dict]:
+    if file_format == "csv":
+        yield from csv.DictReader(io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline=""))
+    elif file_format == "jsonl":
+        for line in io.TextIOWrapper(fileobj, encoding="utf-8"):
+            if line.strip():
+                yield json.loads(line)
+    elif file_format == "xlsx":
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+            for row in rows:
+                yield dict(zip(header, row))
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+
+def iter_chunks(rows: Iterable, size: int) -> Iterator[List]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def parse_reviewed_at(value) -> Optional[datetime.datetime]:
+    if isinstance(value, datetime.datetime):
+        parsed = value
+    elif isinstance(value, datetime.date):
+        parsed = datetime.datetime.combine(value, datetime.time())
+    elif isinstance(value, str) and value.strip():
+        value = value.strip()
+        parsed = parse_datetime(value)
+        if parsed is None:
+            date = parse_date(value)
+            parsed = datetime.datetime.combine(date, datetime.time()) if date else None
+    else:
+        parsed = None
+
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class BulkReviewLoader:
+    def __init__(
+        self,
+        institution,
+        source: str,
+        text_column: str = "text",
+        date_column: str = "date",
+        external_id_column: str = "external_id",
+        chunk_size: int = CHUNK_SIZE,
+        link_duplicates: bool = False,
+        enqueue_postprocessing: bool = True,
+    ):
+        self.institution = institution
+        self.source = source
+        self.text_column = text_column
+        self.date_column = date_column
+        self.external_id_column = external_id_column
+        self.chunk_size = chunk_size
+        self.link_duplicates = link_duplicates
+        self.enqueue_postprocessing = enqueue_postprocessing
+
+        self.total_processed = 0
+        self.imported_count = 0
+        self.invalid_count = 0
+
+    @property
+    def skipped_count(self) -> int:
+        return self.total_processed - self.imported_count - self.invalid_count
+
+    def load(self, rows: Iterable[Dict]) -> "BulkReviewLoader":
+        for chunk in iter_chunks(rows, self.chunk_size):
+            self.load_chunk(chunk)
+        return self
+
+    def load_chunk(self, chunk: List[Dict]) -> List[int]:
+        records = []
+        for row in chunk:
+            record = self._prepare_record(row)
+            if record is None:
+                self.invalid_count += 1
+            else:
+                records.append(record)
+        self.total_processed += len(chunk)
+
+        if connection.vendor == "postgresql":
+            with span("insert", source=self.source, candidates=len(records)) as insert:
+                created_ids = self._copy_records(records)
+                insert.set_attribute("created", len(created_ids))
+        else:
+            created_ids = self._save_records(records)
+        self.imported_count += len(created_ids)
+        if created_ids:
+            bump_version(REVIEWS_SCOPE)
+            mark_reviews_dirty(created_ids)
+
+        if self.link_duplicates and created_ids:
+            with span("near_duplicates", reviews=len(created_ids)) as near_duplicates:
+                linked = link_near_duplicates(self.institution, list(Review.objects.filter(id__in=created_ids)))
+                near_duplicates.set_attribute("linked", len(linked))
+        if self.enqueue_postprocessing:
+            for batch in iter_chunks(created_ids, POSTPROCESSING_BATCH_SIZE):
+                process_reviews_batch.delay(batch)
+        return created_ids
+
+    def _prepare_record(self, row: Dict) -> Optional[Dict]:
+        text = str(row.get(self.text_column) or "").strip()
+        reviewed_at = parse_reviewed_at(row.get(self.date_column))
+        if not text or reviewed_at is None:
+            return None
+
+        signature = minhash(text) if self.link_duplicates else None
+        external_id = row.get(self.external_id_column)
+        return {
+            "text": text,
+            "text_hash": review_text_hash(text),
+            "minhash": pack_signature(signature) if signature else None,
+            "source_external_id": str(external_id) if external_id not in (None, "") else None,
+            "reviewed_at": reviewed_at,
+        }
+
+    def _copy_records(self, records: List[Dict]) -> List[int]:
+        if not records:
+            return []
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        seen_hashes, seen_external_ids = set(), set()
+        for record in records:
+            external_id = record["source_external_id"]
+            if record["text_hash"] in seen_hashes or (external_id and external_id in seen_external_ids):
+                continue
+            seen_hashes.add(record["text_hash"])
+            if external_id:
+                seen_external_ids.add(external_id)
+            writer.writerow([
+                record["text"],
+                record["text_hash"],
+                "\\x" + record["minhash"].hex() if record["minhash"] else None,
+                record["source_external_id"],
+                record["reviewed_at"].isoformat(),
+            ])
+        buffer.seek(0)
+
+        review_table = Review._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE review_import_staging ("
+                "text text, text_hash varchar(64), minhash bytea, "
+                "source_external_id varchar(255), reviewed_at timestamptz"
+                ") ON COMMIT DROP"
+            )
+            copy_sql = f"COPY review_import_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+            raw_cursor = cursor.cursor
+            if hasattr(raw_cursor, "copy_expert"):
+                raw_cursor.copy_expert(copy_sql, buffer)
+            else:
+                with raw_cursor.copy(copy_sql) as copy:
+                    copy.write(buffer.getvalue())
+
+            lock_institution_reviews(self.institution.pk)
+            cursor.execute(
+                f"INSERT INTO {review_table} ("
+                "institution_id, source, text, text_hash, minhash, source_external_id, reviewed_at, "
+                "positive_aspects, negative_aspects, created_at"
+                ") "
+                "SELECT %s, %s, text, text_hash, minhash, source_external_id, reviewed_at, "
+                "'[]'::jsonb, '[]'::jsonb, %s "
+                "FROM review_import_staging staging "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {review_table} review "
+                "WHERE review.institution_id = %s AND review.text_hash = staging.text_hash) "
+                f"AND NOT EXISTS (SELECT 1 FROM {review_table} review "
+                "WHERE review.institution_id = %s AND review.source = %s "
+                "AND review.source_external_id = staging.source_external_id) "
+                "ON CONFLICT DO NOTHING "
+                "RETURNING id",
+                [
+                    self.institution.pk, self.source, timezone.now(),
+                    self.institution.pk, self.institution.pk, self.source,
+                ],
+            )
+            created_ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute("DROP TABLE review_import_staging")
+        return created_ids
+
+    def _save_records(self, records: List[Dict]) -> List[int]:
+        created, _ = save_reviews(
+            self.institution,
+            [
+                {**record, "external_id": record["source_external_id"]}
+                for record in records
+            ],
+            source=self.source,
+            text_key="text",
+            date_key="reviewed_at",
+            link_duplicates=False,
+        )
+        return [review.id for review in created]
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from importer.pipeline import link_near_duplicates
+from reviews.models import Institution, Review
+from review_processor.near_duplicates import minhash, pack_signature
+
+
+class Command(BaseCommand):
+    help = "Compute MinHash signatures for existing reviews and link near-duplicates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        for institution in Institution.objects.all():
+            linked_count = 0
+            last_id = 0
+
+            while True:
+                batch = list(
+                    Review.objects.filter(
+                        institution=institution,
+                        minhash__isnull=True,
+                        id__gt=last_id,
+                    ).order_by("id")[:options["batch_size"]]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1].id
+
+                for review in batch:
+                    signature = minhash(review.text)
+                    review.minhash = pack_signature(signature) if signature else None
+                Review.objects.bulk_update([review for review in batch if review.minhash], ["minhash"])
+
+                linked_count += len(link_near_duplicates(institution, batch))
+
+            self.stdout.write(f"{institution}: linked {linked_count} near-duplicates")
@@ -0,0 +1,63 @@
+import csv
+import datetime
+import random
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from importer.bulk import BulkReviewLoader, CHUNK_SIZE, iter_file_rows
+from reviews.models import Institution
+
+WORDS = (
+    "спектакль концерт зал актёры звук свет буфет гардероб билеты сцена балкон партер "
+    "кресла антракт очередь парковка кондиционер музыка оркестр режиссёр постановка"
+).split()
+
+
+class Command(BaseCommand):
+    help = "Benchmark bulk review ingest on a synthetic CSV file (rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000)
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument("--duplicate-ratio", type=float, default=0.1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        start_date = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+        with tempfile.NamedTemporaryFile("w+", suffix=".csv", encoding="utf-8", newline="") as tmp:
+            writer = csv.writer(tmp)
+            writer.writerow(["text", "date"])
+            for i in range(options["rows"]):
+                number = rng.randrange(i) if i and rng.random() < options["duplicate_ratio"] else i
+                text_rng = random.Random(number)
+                text = " ".join(
+                    f"{word}{text_rng.randrange(1000)}" for word in text_rng.choices(WORDS, k=20)
+                )
+                writer.writerow([text, (start_date + datetime.timedelta(minutes=i)).isoformat()])
+            tmp.flush()
+
+            with transaction.atomic():
+                institution = Institution.objects.create(name="Benchmark", address="-")
+                loader = BulkReviewLoader(
+                    institution,
+                    source="Benchmark",
+                    chunk_size=options["chunk_size"],
+                    enqueue_postprocessing=False,
+                )
+
+                started = time.perf_counter()
+                with open(tmp.name, "rb") as fileobj:
+                    loader.load(iter_file_rows(fileobj, "csv"))
+                elapsed = time.perf_counter() - started
+
+                transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"Loaded {loader.imported_count} of {loader.total_processed} rows "
+            f"({loader.skipped_count} duplicates) in {elapsed:.2f}s: "
+            f"{loader.total_processed / elapsed:.0f} rows/sec"
+        )
@@ -0,0 +1,55 @@
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from django.core.management.base import BaseCommand
+
+from importer.services.otzovik_importer import OtzovikReviewsParser
+
+FIXTURES_DIR = Path(__file__).resolve().parents[2] / "fixtures" / "otzovik"
+
+
+def parse_with_bs4(html: str) -> list:
+    soup = BeautifulSoup(html, "html.parser")
+    results = []
+    for review in soup.select(".item-right"):
+        text_block = review.select_one(".review-teaser")
+        date_block = review.select_one(".review-postdate")
+        if text_block and date_block:
+            results.append(text_block.get_text(strip=True))
+    return results
+
+
+class Command(BaseCommand):
+    help = "Benchmark Otzovik page parsing over saved HTML fixtures"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fixtures", default=str(FIXTURES_DIR))
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        pages = [path.read_text(encoding="utf-8") for path in sorted(Path(options["fixtures"]).glob("*.html"))]
+        if not pages:
+            self.stderr.write("No HTML fixtures found")
+            return
+
+        parser = OtzovikReviewsParser(reviews_url="https://otzovik.com/reviews/fixture")
+        runs = [
+            ("html.parser (bs4)", parse_with_bs4),
+            ("lexbor (selectolax)", lambda html: [item["text"] for item in parser.parse_page(html)]),
+        ]
+
+        for name, parse in runs:
+            start = time.perf_counter()
+            for _ in range(options["repeat"]):
+                for html in pages:
+                    parse(html)
+            elapsed = time.perf_counter() - start
+            per_page = elapsed / (options["repeat"] * len(pages)) * 1000
+            self.stdout.write(f"{name}: {per_page:.3f} ms/page")
+
+        for html in pages:
+            if parse_with_bs4(html) != [item["text"] for item in parser.parse_page(html)]:
+                self.stderr.write("Parsers produced different review texts")
+                return
+        self.stdout.write("Both parsers produced identical review texts")
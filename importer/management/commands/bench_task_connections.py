@@ -0,0 +1,103 @@
+import copy
+import importlib.util
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.utils import ConnectionHandler
+
+from reviews.models import Review
+
+MODES = ("none", "persistent", "psycopg")
+BENCH_ALIAS = "bench"
+
+
+def mode_settings(settings_dict, mode, pool_size):
+    settings_dict = copy.deepcopy(settings_dict)
+    options = settings_dict.setdefault("OPTIONS", {})
+    options.pop("pool", None)
+    settings_dict.update({"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False})
+
+    if mode == "persistent":
+        settings_dict.update({"CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True})
+    elif mode == "psycopg":
+        from psycopg_pool import ConnectionPool
+
+        options["pool"] = {
+            "min_size": pool_size,
+            "max_size": pool_size,
+            "timeout": 30,
+            "check": ConnectionPool.check_connection,
+        }
+    return settings_dict
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[int(fraction * (len(ordered) - 1))] if ordered else 0.0
+
+
+class Command(BaseCommand):
+    help = "Measure tasks/sec and latency of a post-processing task's database round trip per connection mode"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--pool-size", type=int, default=10)
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+
+    def handle(self, *args, **options):
+        review_ids = list(Review.objects.order_by().values_list("id", flat=True)[:1000]) or [0]
+
+        for mode in options["modes"]:
+            if mode == "psycopg" and (
+                connection.vendor != "postgresql" or importlib.util.find_spec("psycopg_pool") is None
+            ):
+                self.stdout.write(f"{mode:<10} skipped: pooling needs PostgreSQL with psycopg 3")
+                continue
+
+            tasks_per_second, latencies = self.run(mode, review_ids, options)
+            self.stdout.write(
+                f"{mode:<10} {tasks_per_second:8.0f} tasks/sec  "
+                f"p50 {percentile(latencies, 0.5) * 1000:7.2f} ms  "
+                f"p99 {percentile(latencies, 0.99) * 1000:7.2f} ms"
+            )
+
+    def run(self, mode, review_ids, options):
+        handler = ConnectionHandler({
+            "default": settings.DATABASES["default"],
+            BENCH_ALIAS: mode_settings(settings.DATABASES["default"], mode, options["pool_size"]),
+        })
+        review_table = Review._meta.db_table
+        slots = threading.Semaphore(options["concurrency"])
+        latencies = []
+
+        def task(review_id):
+            try:
+                started = time.perf_counter()
+                bench_connection = handler[BENCH_ALIAS]
+                with bench_connection.cursor() as cursor:
+                    cursor.execute(f"SELECT id, text FROM {review_table} WHERE id = %s", [review_id])
+                    cursor.fetchone()
+                bench_connection.close_if_unusable_or_obsolete()
+                latencies.append(time.perf_counter() - started)
+            finally:
+                slots.release()
+
+        started = time.perf_counter()
+        threads = []
+        for number in range(options["tasks"]):
+            slots.acquire()
+            thread = threading.Thread(target=task, args=(review_ids[number % len(review_ids)],))
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if mode == "psycopg":
+            handler[BENCH_ALIAS].close_pool()
+        handler.close_all()
+        return options["tasks"] / elapsed, latencies
@@ -0,0 +1,29 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from importer.bulk import POSTPROCESSING_BATCH_SIZE
+from importer.tasks import process_reviews_batch
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    help = "Enqueue post-processing for reviews that were never classified"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-minutes", type=int, default=60)
+        parser.add_argument("--batch-size", type=int, default=POSTPROCESSING_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        created_before = timezone.now() - datetime.timedelta(minutes=options["older_than_minutes"])
+        pending = Review.objects.pending().filter(created_at__lt=created_before).order_by("id")
+
+        enqueued = 0
+        last_id = 0
+        while batch := list(pending.filter(id__gt=last_id).values_list("id", flat=True)[:options["batch_size"]]):
+            process_reviews_batch.delay(batch)
+            enqueued += len(batch)
+            last_id = batch[-1]
+
+        self.stdout.write(f"Enqueued {enqueued} pending reviews")
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from review_analyser.profiling import PERCENTILES, percentile
+from review_analyser.tracing import read_spans, review_latencies, stage_report
+
+
+class Command(BaseCommand):
+    help = "Report per-stage durations and import-to-fully-processed latency per review from exported spans"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--input", default=settings.TRACING_LOG_FILE, help="JSON lines file with spans")
+        parser.add_argument("--slowest", type=int, default=10)
+
+    def handle(self, *args, **options):
+        if not options["input"]:
+            raise CommandError("--input is required when TRACING_LOG_FILE is not set")
+
+        try:
+            with open(options["input"], encoding="utf-8") as fileobj:
+                spans = read_spans(fileobj)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{'stage':<40} {'count':>7} {'errors':>7}" + "".join(
+            f" {f'p{rank} ms':>10}" for rank in PERCENTILES
+        ))
+        for row in stage_report(spans):
+            self.stdout.write(f"{row['stage']:<40} {row['count']:>7} {row['errors']:>7}" + "".join(
+                f" {row[f'p{rank}']:>10.2f}" for rank in PERCENTILES
+            ))
+
+        reviews = review_latencies(spans)
+        if not reviews:
+            self.stdout.write("No traced reviews")
+            return
+
+        latencies = [review["latency_ms"] for review in reviews.values()]
+        failed = sum(1 for review in reviews.values() if review["failed"])
+        self.stdout.write(
+            f"\nImport to fully processed: {len(reviews)} reviews, {failed} with failed stages, "
+            + ", ".join(f"p{rank} {percentile(latencies, rank):.2f} ms" for rank in PERCENTILES)
+        )
+
+        slowest = sorted(reviews.items(), key=lambda item: item[1]["latency_ms"], reverse=True)
+        for review_id, review in slowest[:options["slowest"]]:
+            failed_stages = f"  failed: {', '.join(review['failed'])}" if review["failed"] else ""
+            self.stdout.write(f"  review {review_id}: {review['latency_ms']:.2f} ms{failed_stages}")
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from importer.bulk import BulkReviewLoader, CHUNK_SIZE, FILE_FORMATS, detect_file_format, iter_file_rows
+from reviews.models import Institution
+
+
+class Command(BaseCommand):
+    help = "Load reviews from a CSV, JSONL or XLSX file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--institution-id", type=int, required=True)
+        parser.add_argument("--source", required=True)
+        parser.add_argument("--format", choices=FILE_FORMATS)
+        parser.add_argument("--text-column", default="text")
+        parser.add_argument("--date-column", default="date")
+        parser.add_argument("--external-id-column", default="external_id")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument("--link-near-duplicates", action="store_true")
+        parser.add_argument("--no-postprocessing", action="store_true")
+
+    def handle(self, *args, **options):
+        try:
+            institution = Institution.objects.get(pk=options["institution_id"])
+        except Institution.DoesNotExist:
+            raise CommandError("Institution is not found")
+
+        file_format = options["format"] or detect_file_format(options["path"])
+        if file_format is None:
+            raise CommandError("Unable to detect file format, pass --format")
+
+        loader = BulkReviewLoader(
+            institution,
+            source=options["source"],
+            text_column=options["text_column"],
+            date_column=options["date_column"],
+            external_id_column=options["external_id_column"],
+            chunk_size=options["chunk_size"],
+            link_duplicates=options["link_near_duplicates"],
+            enqueue_postprocessing=not options["no_postprocessing"],
+        )
+
+        with open(options["path"], "rb") as fileobj:
+            loader.load(iter_file_rows(fileobj, file_format))
+
+        self.stdout.write(
+            f"Imported {loader.imported_count} reviews, skipped {loader.skipped_count} duplicates "
+            f"and {loader.invalid_count} invalid rows out of {loader.total_processed}"
+        )
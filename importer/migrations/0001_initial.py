@@ -0,0 +1,120 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def create_cursors_from_reviews(apps, schema_editor):
+    Review = apps.get_model("reviews", "Review")
+    ImportCursor = apps.get_model("importer", "ImportCursor")
+
+    rows = (
+        Review.objects.order_by()
+        .values("institution_id", "source")
+        .annotate(last_reviewed_at=Max("reviewed_at"), total=Count("id"))
+    )
+    ImportCursor.objects.bulk_create(
+        ImportCursor(
+            institution_id=row["institution_id"],
+            source=row["source"],
+            last_reviewed_at=row["last_reviewed_at"],
+            total_imported=row["total"],
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("reviews", "0011_review_source_external_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportCursor",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(max_length=64, verbose_name="Источник отзывов"),
+                ),
+                (
+                    "last_external_id",
+                    models.CharField(
+                        blank=True,
+                        max_length=255,
+                        null=True,
+                        verbose_name="Идентификатор последнего отзыва",
+                    ),
+                ),
+                (
+                    "last_reviewed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Дата последнего отзыва"
+                    ),
+                ),
+                (
+                    "last_run_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Дата последнего импорта"
+                    ),
+                ),
+                (
+                    "fetched_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Получено при последнем импорте"
+                    ),
+                ),
+                (
+                    "imported_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Сохранено при последнем импорте"
+                    ),
+                ),
+                (
+                    "skipped_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Пропущено при последнем импорте"
+                    ),
+                ),
+                (
+                    "total_imported",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Всего сохранено"
+                    ),
+                ),
+                (
+                    "institution",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="import_cursors",
+                        to="reviews.institution",
+                        verbose_name="Учреждение",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Курсор импорта",
+                "verbose_name_plural": "Курсоры импорта",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("institution", "source"),
+                        name="import_cursor_unique_institution_source",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(create_cursors_from_reviews, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,38 @@
 from django.db import models
 
-# Create your models here.
+from reviews.models import Institution
+
+
+class ImportCursor(models.Model):
+    institution = models.ForeignKey(
+        Institution,
+        on_delete=models.CASCADE,
+        related_name="import_cursors",
+        verbose_name="Учреждение"
+    )
+    source = models.CharField(max_length=64, verbose_name="Источник отзывов")
+    last_external_id = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        verbose_name="Идентификатор последнего отзыва"
+    )
+    last_reviewed_at = models.DateTimeField(null=True, blank=True, verbose_name="Дата последнего отзыва")
+    last_run_at = models.DateTimeField(null=True, blank=True, verbose_name="Дата последнего импорта")
+    fetched_count = models.PositiveIntegerField(default=0, verbose_name="Получено при последнем импорте")
+    imported_count = models.PositiveIntegerField(default=0, verbose_name="Сохранено при последнем импорте")
+    skipped_count = models.PositiveIntegerField(default=0, verbose_name="Пропущено при последнем импорте")
+    total_imported = models.PositiveBigIntegerField(default=0, verbose_name="Всего сохранено")
+
+    class Meta:
+        verbose_name = "Курсор импорта"
+        verbose_name_plural = "Курсоры импорта"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["institution", "source"],
+                name="import_cursor_unique_institution_source",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.institution} - {self.source}"
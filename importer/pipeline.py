@@ -0,0 +1,236 @@
+from array import array
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from review_analyser.tracing import span
+from reviews.cache import REVIEWS_SCOPE, bump_version
+from reviews.indexing import mark_reviews_dirty
+from reviews.models import Review, ReviewSignatureBand, review_text_hash
+from review_processor.near_duplicates import (
+    minhash, pack_signature, unpack_signature, lsh_buckets, similarity, SIMILARITY_THRESHOLD,
+)
+from .models import ImportCursor
+
+
+def lock_institution_reviews(institution_id):
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [institution_id])
+
+
+def save_reviews(institution, reviews_data, source, text_key, date_key, link_duplicates=True):
+    candidates = {}
+    external_ids = set()
+
+    with span("dedup", source=source, received=len(reviews_data)) as dedup:
+        for data in reviews_data:
+            text = data[text_key]
+            if not text:
+                continue
+
+            text_hash = review_text_hash(text)
+            external_id = data.get("external_id")
+            if text_hash in candidates or (external_id and external_id in external_ids):
+                continue
+            if external_id:
+                external_ids.add(external_id)
+
+            signature = minhash(text)
+            candidates[text_hash] = Review(
+                institution=institution,
+                text=text,
+                text_hash=text_hash,
+                minhash=pack_signature(signature) if signature else None,
+                source=source,
+                source_external_id=external_id,
+                reviewed_at=data[date_key],
+            )
+        dedup.set_attribute("candidates", len(candidates))
+
+    created_reviews = []
+    if candidates:
+        with span("insert", source=source, candidates=len(candidates)) as insert, transaction.atomic():
+            lock_institution_reviews(institution.pk)
+            existing = Review.objects.filter(institution=institution).filter(
+                Q(text_hash__in=list(candidates)) | Q(source=source, source_external_id__in=list(external_ids))
+            )
+            existing_hashes, existing_external_ids = set(), set()
+            for text_hash, review_source, external_id in existing.values_list(
+                "text_hash", "source", "source_external_id"
+            ):
+                existing_hashes.add(text_hash)
+                if review_source == source and external_id:
+                    existing_external_ids.add(external_id)
+            new_reviews = [
+                review
+                for text_hash, review in candidates.items()
+                if text_hash not in existing_hashes and review.source_external_id not in existing_external_ids
+            ]
+
+            created_ids = [review.pk for review in Review.objects.bulk_create(new_reviews)]
+            created_reviews = list(Review.objects.filter(pk__in=created_ids).with_related().order_by("id"))
+            insert.set_attribute("existing", len(candidates) - len(new_reviews))
+            insert.set_attribute("created", len(created_reviews))
+
+        if created_reviews:
+            if link_duplicates:
+                with span("near_duplicates", reviews=len(created_reviews)) as near_duplicates:
+                    linked = link_near_duplicates(institution, created_reviews)
+                    near_duplicates.set_attribute("linked", len(linked))
+            bump_version(REVIEWS_SCOPE)
+            mark_reviews_dirty(review.id for review in created_reviews)
+
+    skipped_count = len(reviews_data) - len(created_reviews)
+    return created_reviews, skipped_count
+
+
+def link_near_duplicates(institution, reviews):
+    signatures = {
+        review.id: unpack_signature(review.minhash)
+        for review in reviews
+        if review.minhash is not None
+    }
+    if not signatures:
+        return []
+
+    review_buckets = {review_id: lsh_buckets(signature) for review_id, signature in signatures.items()}
+    bucket_index = {}
+    known_signatures = {}
+
+    rows = (
+        ReviewSignatureBand.objects.filter(
+            institution=institution,
+            bucket__in={bucket for buckets in review_buckets.values() for bucket in buckets},
+        )
+        .exclude(review_id__in=signatures.keys())
+        .values_list("band", "bucket", "review_id", "review__canonical_id", "review__minhash")
+    )
+    for band, bucket, review_id, canonical_id, signature in rows:
+        bucket_index.setdefault((band, bucket), set()).add((review_id, canonical_id))
+        if review_id not in known_signatures:
+            known_signatures[review_id] = unpack_signature(signature)
+
+    linked = []
+    bands = []
+    for review in sorted(reviews, key=lambda item: item.id):
+        if review.id not in signatures:
+            continue
+
+        signature = signatures[review.id]
+        buckets = review_buckets[review.id]
+
+        candidates = set()
+        for band, bucket in enumerate(buckets):
+            candidates.update(bucket_index.get((band, bucket), ()))
+
+        best_score, best_match = 0.0, None
+        for candidate_id, canonical_id in sorted(candidates):
+            score = similarity(signature, known_signatures[candidate_id])
+            if score >= SIMILARITY_THRESHOLD and score > best_score:
+                best_score, best_match = score, canonical_id or candidate_id
+
+        if best_match is not None:
+            review.canonical_id = best_match
+            linked.append(review)
+
+        known_signatures[review.id] = signature
+        for band, bucket in enumerate(buckets):
+            bucket_index.setdefault((band, bucket), set()).add((review.id, review.canonical_id))
+            bands.append(ReviewSignatureBand(institution=institution, review=review, band=band, bucket=bucket))
+
+    with transaction.atomic():
+        ReviewSignatureBand.objects.bulk_create(bands)
+        if linked:
+            Review.objects.bulk_update(linked, ["canonical"])
+
+    if linked:
+        bump_version(REVIEWS_SCOPE)
+        mark_reviews_dirty(review.id for review in linked)
+    return linked
+
+
+class ReviewStreamSink:
+    def __init__(self, institution, source, text_key="text", date_key="date", on_created=None, cursor=None):
+        self.institution = institution
+        self.source = source
+        self.text_key = text_key
+        self.date_key = date_key
+        self.on_created = on_created
+        self.cursor = cursor
+
+        self.created_count = 0
+        self.created_ids = array("q")
+        self.skipped_count = 0
+        self.total_processed = 0
+        self.newest = None
+
+    def write_page(self, reviews_data):
+        created, skipped = save_reviews(
+            self.institution,
+            reviews_data,
+            source=self.source,
+            text_key=self.text_key,
+            date_key=self.date_key,
+        )
+
+        self.total_processed += len(reviews_data)
+        self.skipped_count += skipped
+        self.created_count += len(created)
+        self.created_ids.extend(review.id for review in created)
+        for review in created:
+            if self.newest is None or review.reviewed_at > self.newest[0]:
+                self.newest = (review.reviewed_at, review.source_external_id)
+
+        if created and self.on_created:
+            self.on_created(created)
+        return created
+
+    def save_cursor(self):
+        if self.cursor is None:
+            return
+
+        if self.newest and (
+            self.cursor.last_reviewed_at is None
+            or self.newest[0] > self.cursor.last_reviewed_at
+        ):
+            self.cursor.last_reviewed_at, self.cursor.last_external_id = self.newest
+
+        self.cursor.last_run_at = timezone.now()
+        self.cursor.fetched_count = self.total_processed
+        self.cursor.imported_count = self.created_count
+        self.cursor.skipped_count = self.skipped_count
+        self.cursor.total_imported += self.created_count
+        self.cursor.save()
+
+    def consume(self, pages):
+        pages = iter(pages)
+        while True:
+            with span("scrape", source=self.source) as scrape:
+                page = next(pages, None)
+                scrape.set_attribute("reviews", len(page or ()))
+            if page is None:
+                break
+            self.write_page(page)
+        self.save_cursor()
+        return self
+
+    async def aconsume(self, pages):
+        write_page = sync_to_async(self.write_page)
+        pages = aiter(pages)
+        while True:
+            with span("scrape", source=self.source) as scrape:
+                page = await anext(pages, None)
+                scrape.set_attribute("reviews", len(page or ()))
+            if page is None:
+                break
+            await write_page(page)
+        await sync_to_async(self.save_cursor)()
+        return self
+
+
+def get_import_cursor(institution, source):
+    cursor, _ = ImportCursor.objects.get_or_create(institution=institution, source=source)
+    return cursor
@@ -0,0 +1,76 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+import undetected_chromedriver
+
+
+def create_chrome_driver():
+    opts = undetected_chromedriver.ChromeOptions()
+    opts.add_argument('--no-sandbox')
+    opts.add_argument('--disable-dev-shm-usage')
+    opts.add_argument('headless')
+    opts.add_argument('--disable-gpu')
+    return undetected_chromedriver.Chrome(options=opts)
+
+
+class BrowserPool:
+    def __init__(self, factory=create_chrome_driver, max_size: int = 2):
+        self.factory = factory
+        self.max_size = max_size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    @contextmanager
+    def driver(self, timeout: float | None = None):
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No free browser in the pool")
+
+        driver = None
+        reusable = False
+        try:
+            driver = self._take_idle() or self.factory()
+            yield driver
+            reusable = True
+        finally:
+            if driver is not None:
+                if reusable and self._is_alive(driver):
+                    self._idle.put(driver)
+                else:
+                    self._quit(driver)
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._quit(driver)
+
+    def _take_idle(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+
+            if self._is_alive(driver):
+                return driver
+            self._quit(driver)
+
+    @staticmethod
+    def _is_alive(driver) -> bool:
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _quit(driver) -> None:
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
@@ -1,11 +1,11 @@
-from typing import List, Dict
+from typing import List, Dict, Iterator
 
 import json
+import time
 import requests
 
 
-def fetch_reviews_with_pagination(initial_url: str, auth_header: str) -> List[Dict]:
-    extracted_data = []
+def iter_review_pages(initial_url: str, auth_header: str) -> Iterator[List[Dict]]:
     current_url = initial_url
     iteration_count = 0
 
@@ -14,36 +14,47 @@ def fetch_reviews_with_pagination(initial_url: str, auth_header: str) -> List[Di
         'Content-Type': 'application/json'
     }
 
-    while current_url:
-        try:
-            response = requests.get(current_url, headers=headers)
-            response.raise_for_status()
+    with requests.Session() as session:
+        while current_url:
+            try:
+                response = session.get(current_url, headers=headers)
+                response.raise_for_status()
+
+                data = response.json()
 
-            data = response.json()
+                page = []
+                for review in data.get('reviews', []):
+                    extracted_review = {
+                        'date_created': review.get('date_created'),
+                        'text': review.get('text').replace("\n", " "),
+                        'external_id': f"2gis_{review['id']}" if review.get('id') else None,
+                    }
+                    page.append(extracted_review)
 
-            for review in data.get('reviews', []):
-                extracted_review = {
-                    'date_created': review.get('date_created'),
-                    'text': review.get('text').replace("\n", " ")
-                }
-                extracted_data.append(extracted_review)
+                next_link = data.get('meta', {}).get('next_link')
+                current_url = next_link
 
-            next_link = data.get('meta', {}).get('next_link')
-            current_url = next_link
+                iteration_count += 1
 
-            iteration_count += 1
+            except requests.exceptions.RequestException as e:
+                print(f"Request error: {e}")
+                break
+            except json.JSONDecodeError as e:
+                print(f"JSON error: {e}")
+                break
+            except Exception as e:
+                print(f"Unexpected error: {e}")
+                break
 
-            import time
-            time.sleep(1)
+            if page:
+                yield page
 
-        except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-            break
-        except json.JSONDecodeError as e:
-            print(f"JSON error: {e}")
-            break
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            break
+            if current_url:
+                time.sleep(1)
 
+
+def fetch_reviews_with_pagination(initial_url: str, auth_header: str) -> List[Dict]:
+    extracted_data = []
+    for page in iter_review_pages(initial_url, auth_header):
+        extracted_data.extend(page)
     return extracted_data
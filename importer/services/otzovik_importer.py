@@ -1,8 +1,11 @@
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 
 import requests
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 
 HEADERS = {
     "User-Agent": (
@@ -11,55 +14,98 @@ HEADERS = {
         "Chrome/120.0.0.0 Safari/537.36"
     )
 }
+REQUEST_TIMEOUT = 15
+REVIEW_ID_RE = re.compile(r"review_(\d+)")
+PREFETCH_PAGES = 3
 
 
 class OtzovikReviewsParser:
-    def __init__(self, reviews_url: str, from_date: Optional[datetime] = None):
+    def __init__(
+        self,
+        reviews_url: str,
+        from_date: Optional[datetime] = None,
+        prefetch: int = PREFETCH_PAGES,
+        session: Optional[requests.Session] = None,
+    ):
         self.reviews_url = reviews_url.rstrip("/")
         self.from_date = from_date
+        self.prefetch = max(prefetch, 1)
+        self.session = session or requests.Session()
+        self.session.headers.update(HEADERS)
 
     def parse(self) -> List[Dict]:
-        page = 1
         results = []
+        for page_reviews in self.iter_pages():
+            results.extend(page_reviews)
+        return results
 
-        while True:
-            url = f"{self.reviews_url}/?page={page}"
-            response = requests.get(url, headers=HEADERS, timeout=15)
-
-            if response.status_code != 200:
-                break
-
-            soup = BeautifulSoup(response.text, "html.parser")
-            reviews = soup.select(".item-right")
-
-            if not reviews:
-                break
-
-            for review in reviews:
-                parsed = self._parse_review(review)
-
-                if not parsed:
-                    continue
+    def iter_pages(self) -> Iterator[List[Dict]]:
+        executor = ThreadPoolExecutor(max_workers=self.prefetch)
+        pending = deque()
+        next_page = 1
 
-                if self.from_date and parsed["date"] <= self.from_date:
-                    return results
+        try:
+            while True:
+                while len(pending) < self.prefetch:
+                    pending.append(executor.submit(self._fetch_page, next_page))
+                    next_page += 1
+
+                html = pending.popleft().result()
+                if html is None:
+                    return
+
+                reviews = self.parse_page(html)
+                if reviews is None:
+                    return
+
+                page_results = []
+                reached_from_date = False
+                for parsed in reviews:
+                    if self.from_date and parsed["date"] <= self.from_date:
+                        reached_from_date = True
+                        break
+                    page_results.append(parsed)
+
+                if page_results:
+                    yield page_results
+
+                if reached_from_date:
+                    return
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def parse_page(self, html: str) -> Optional[List[Dict]]:
+        tree = LexborHTMLParser(html)
+        reviews = tree.css(".item-right")
+
+        if not reviews:
+            return None
 
+        results = []
+        for review in reviews:
+            parsed = self._parse_review(review)
+            if parsed:
                 results.append(parsed)
+        return results
 
-            page += 1
+    def _fetch_page(self, page: int) -> Optional[str]:
+        url = f"{self.reviews_url}/?page={page}"
+        response = self.session.get(url, timeout=REQUEST_TIMEOUT)
 
-        return results
+        if response.status_code != 200:
+            return None
+        return response.text
 
     def _parse_review(self, review) -> Optional[Dict]:
-        text_block = review.select_one(".review-teaser")
-        date_block = review.select_one(".review-postdate")
+        text_block = review.css_first(".review-teaser")
+        date_block = review.css_first(".review-postdate")
 
         if not text_block or not date_block:
             return None
 
-        text = text_block.get_text(strip=True)
+        text = text_block.text(strip=True)
 
-        date_iso = date_block.get("content")
+        date_iso = date_block.attributes.get("content")
         if not date_iso:
             return None
 
@@ -68,9 +114,13 @@ class OtzovikReviewsParser:
         except ValueError:
             return None
 
+        title_link = review.css_first("a.review-title")
+        review_id = REVIEW_ID_RE.search(title_link.attributes.get("href") or "") if title_link else None
+
         return {
             "text": text,
-            "date": date
+            "date": date,
+            "external_id": f"otzovik_{review_id.group(1)}" if review_id else None,
         }
 
     @staticmethod
@@ -10,7 +10,6 @@ class TelegramCommentsParser:
     def __init__(self):
         self.api_id = settings.TELEGRAM_API_ID
         self.api_hash = settings.TELEGRAM_API_HASH
-        self.comments_data = []
 
     async def _get_channel_entity(self, client, channel_username):
         channel = await client.get_entity(channel_username)
@@ -19,6 +18,8 @@ class TelegramCommentsParser:
         return channel
 
     async def _process_message_thread(self, client, channel, message, since_dt):
+        comments = []
+
         async for comment in client.iter_messages(
             channel,
             reply_to=message.id,
@@ -28,16 +29,17 @@ class TelegramCommentsParser:
                 continue
 
             if since_dt and comment.date <= since_dt:
-                return
+                break
 
-            self.comments_data.append({
+            comments.append({
                 "text": comment.text.strip(),
                 "date": comment.date,
+                "external_id": f"tg_{message.id}_{comment.id}",
             })
 
-    async def collect_comments(self, channel_username: str, since_dt: datetime | None):
-        self.comments_data = []
+        return comments
 
+    async def iter_comment_pages(self, channel_username: str, since_dt: datetime | None):
         async with TelegramClient(
             session="django_telegram_session",
             api_id=self.api_id,
@@ -52,14 +54,20 @@ class TelegramCommentsParser:
                 reverse=True,
             ):
                 if message.replies and message.replies.replies > 0:
-                    await self._process_message_thread(
+                    comments = await self._process_message_thread(
                         client,
                         channel,
                         message,
                         since_dt,
                     )
+                    if comments:
+                        yield comments
 
-        return self.comments_data
+    async def collect_comments(self, channel_username: str, since_dt: datetime | None):
+        comments_data = []
+        async for comments in self.iter_comment_pages(channel_username, since_dt):
+            comments_data.extend(comments)
+        return comments_data
 
 
 parser = TelegramCommentsParser()
@@ -114,15 +114,21 @@ class VKReviewsParser:
 
         return comments
 
-    async def parse(self):
+    async def iter_pages(self):
         posts = await self.fetch_posts_until_date()
-        result = []
 
         for post in posts:
             if post.get("comments", {}).get("count", 0) == 0:
                 continue
 
             post_comments = await self.fetch_comments(post["id"])
+            if post_comments:
+                yield post_comments
+
+    async def parse(self):
+        result = []
+
+        async for post_comments in self.iter_pages():
             result.extend(post_comments)
 
         return result
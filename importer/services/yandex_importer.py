@@ -1,25 +1,76 @@
 import datetime
-import time
+from typing import Iterator, List, Optional
 
+from django.conf import settings
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
-import undetected_chromedriver
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from importer.services.browser_pool import BrowserPool
+
+YANDEX_REVIEWS_URL = 'https://yandex.ru/maps/org/{}/reviews/'
+REVIEW_CARD_CLASS = "business-reviews-card-view__review"
+PAGE_LOAD_TIMEOUT = 15
+SCROLL_TIMEOUT = 5
+REVIEWS_PAGE_SIZE = 20
 
 
 class YandexParser:
-    def __init__(self, driver):
+    def __init__(
+        self,
+        driver,
+        since_dt: Optional[datetime.datetime] = None,
+        page_load_timeout: float = PAGE_LOAD_TIMEOUT,
+        scroll_timeout: float = SCROLL_TIMEOUT,
+    ):
         self.driver = driver
+        self.since_dt = since_dt
+        self.page_load_timeout = page_load_timeout
+        self.scroll_timeout = scroll_timeout
+
+    def __count_cards(self, driver) -> int:
+        return len(driver.find_elements(By.CLASS_NAME, REVIEW_CARD_CLASS))
+
+    def __iter_cards(self) -> Iterator:
+        processed = 0
+
+        while True:
+            elements = self.driver.find_elements(By.CLASS_NAME, REVIEW_CARD_CLASS)
+            for elem in elements[processed:]:
+                yield elem
+
+            processed = len(elements)
+            if not processed:
+                return
 
-    def __scroll_to_bottom(self, elem) -> None:
-        self.driver.execute_script(
-            "arguments[0].scrollIntoView();",
-            elem
-        )
-        time.sleep(1)
-        new_elem = self.driver.find_elements(By.CLASS_NAME, "business-reviews-card-view__review")[-1]
-        if elem == new_elem:
-            return
-        self.__scroll_to_bottom(new_elem)
+            self.driver.execute_script(
+                "arguments[0].scrollIntoView();",
+                elements[-1]
+            )
+            try:
+                WebDriverWait(self.driver, self.scroll_timeout).until(
+                    lambda driver: self.__count_cards(driver) > processed
+                )
+            except TimeoutException:
+                return
+
+    def __sort_by_newest(self) -> bool:
+        try:
+            self.driver.find_element(By.CLASS_NAME, "rating-ranking-view").click()
+            option = WebDriverWait(self.driver, self.scroll_timeout).until(
+                expected_conditions.element_to_be_clickable((
+                    By.XPATH,
+                    "//div[contains(@class, 'rating-ranking-view__popup-line')][contains(., 'По новизне')]",
+                ))
+            )
+            option.click()
+            WebDriverWait(self.driver, self.scroll_timeout).until(
+                expected_conditions.presence_of_element_located((By.CLASS_NAME, REVIEW_CARD_CLASS))
+            )
+            return True
+        except (NoSuchElementException, TimeoutException):
+            return False
 
     def __get_item_data(self, elem):
         try:
@@ -37,56 +88,82 @@ class YandexParser:
             "date": date
         }
 
-    def __get_reviews_data(self) -> list:
-        reviews = []
-        elements = self.driver.find_elements(By.CLASS_NAME, "business-reviews-card-view__review")
-        if len(elements) > 1:
-            self.__scroll_to_bottom(elements[-1])
-            elements = self.driver.find_elements(By.CLASS_NAME, "business-reviews-card-view__review")
-            for elem in elements:
-                reviews.append(self.__get_item_data(elem))
-        return reviews
+    @staticmethod
+    def __parse_date(raw: Optional[str]) -> Optional[datetime.datetime]:
+        if not raw:
+            return None
+        try:
+            return datetime.datetime.fromisoformat(raw)
+        except ValueError:
+            return None
+
+    def iter_reviews(self) -> Iterator[dict]:
+        stop_at_since_dt = self.since_dt is not None and self.__sort_by_newest()
+
+        for elem in self.__iter_cards():
+            item = self.__get_item_data(elem)
+            date = self.__parse_date(item["date"])
+
+            if stop_at_since_dt and date and date <= self.since_dt:
+                return
+
+            yield item
 
     def __isinstance_page(self):
         try:
             xpath_name = ".//h1[@class='orgpage-header-view__header']"
-            name = self.driver.find_element(By.XPATH, xpath_name).text
+            WebDriverWait(self.driver, self.page_load_timeout).until(
+                expected_conditions.presence_of_element_located((By.XPATH, xpath_name))
+            )
             return True
-        except NoSuchElementException:
+        except TimeoutException:
             return False
 
+    def iter_review_pages(self, page_size: int = REVIEWS_PAGE_SIZE) -> Iterator[List[dict]]:
+        if not self.__isinstance_page():
+            raise ValueError('Страница не найдена')
+
+        page = []
+        for item in self.iter_reviews():
+            page.append(item)
+            if len(page) >= page_size:
+                yield page
+                page = []
+
+        if page:
+            yield page
+
     def parse_reviews(self) -> dict:
         if not self.__isinstance_page():
             return {'error': 'Страница не найдена'}
-        return {'company_reviews': self.__get_reviews_data()}
+        return {'company_reviews': list(self.iter_reviews())}
 
 
 class YandexReviewsImporter:
-    def __open_page(self, yandex_id: int):
-        url: str = 'https://yandex.ru/maps/org/{}/reviews/'.format(str(yandex_id))
-        opts = undetected_chromedriver.ChromeOptions()
-        opts.add_argument('--no-sandbox')
-        opts.add_argument('--disable-dev-shm-usage')
-        opts.add_argument('headless')
-        opts.add_argument('--disable-gpu')
-        driver = undetected_chromedriver.Chrome(options=opts)
-        parser = YandexParser(driver=driver)
-        driver.get(url)
-        return parser
-
-    def parse_reviews(self, yandex_id: int):
-        result = {}
-        page = self.__open_page(yandex_id)
-        time.sleep(4)
+    def __init__(self, pool: Optional[BrowserPool] = None, reviews_url: str = YANDEX_REVIEWS_URL):
+        self._pool = pool
+        self.reviews_url = reviews_url
 
-        try:
-            result = page.parse_reviews()
-        except Exception as e:
-            print(e)
-            return result
-        finally:
-            page.driver.close()
-            page.driver.quit()
-            return result
+    @property
+    def pool(self) -> BrowserPool:
+        if self._pool is None:
+            self._pool = BrowserPool(max_size=settings.YANDEX_BROWSER_POOL_SIZE)
+        return self._pool
+
+    def iter_review_pages(
+        self,
+        yandex_id: int,
+        since_dt: Optional[datetime.datetime] = None,
+        page_size: int = REVIEWS_PAGE_SIZE,
+    ) -> Iterator[List[dict]]:
+        with self.pool.driver() as driver:
+            driver.get(self.reviews_url.format(str(yandex_id)))
+            parser = YandexParser(driver=driver, since_dt=since_dt)
+            yield from parser.iter_review_pages(page_size=page_size)
+
+    def parse_reviews(self, yandex_id: int, since_dt: Optional[datetime.datetime] = None):
+        with self.pool.driver() as driver:
+            driver.get(self.reviews_url.format(str(yandex_id)))
+            return YandexParser(driver=driver, since_dt=since_dt).parse_reviews()
 
 yandex_reviews_importer = YandexReviewsImporter()
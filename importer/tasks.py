@@ -1,93 +1,168 @@
+import logging
+
 from celery import shared_task
+from django.db.models import Q
 
+from review_analyser.tracing import span
+from reviews.analytics import track_daily_stats
+from reviews.aspects import sync_review_aspects
+from reviews.cache import REVIEWS_SCOPE, bump_version
+from reviews.indexing import mark_reviews_dirty
 from reviews.models import Review, Event
 from review_processor.event_comparator import event_comparator
 from review_processor.aspect_extractor import aspect_extractor
 from review_processor.review_classifier import review_classifier
 from review_processor.profanity_wrapper import get_wrapped_prof_words
 
+logger = logging.getLogger(__name__)
+
+INHERITED_FIELDS = ["event", "sentiment", "confidence", "positive_aspects", "negative_aspects"]
+
+
+def propagate_to_duplicates(review, fields):
+    duplicates = Review.objects.filter(canonical=review)
+    duplicate_ids = list(duplicates.values_list("id", flat=True))
+    if duplicate_ids:
+        duplicates.update(**{field: getattr(review, field) for field in fields})
+        bump_version(REVIEWS_SCOPE)
+        mark_reviews_dirty(duplicate_ids)
+
 
 @shared_task
 def extract_aspects_for_review(review_id: int):
-    try:
-        review = Review.objects.get(id=review_id)
-
-        if not review.text:
-            review.positive_aspects = []
-            review.negative_aspects = []
-            review.save()
-            return
+    with span("inference.aspects", review_id=review_id) as current:
+        try:
+            review = Review.objects.get(id=review_id)
 
-        positive_aspects, negative_aspects = aspect_extractor.extract_aspects(review.text)
+            if not review.text:
+                review.positive_aspects = []
+                review.negative_aspects = []
+                review.save()
+                sync_review_aspects([review])
+                return
 
-        review.positive_aspects = positive_aspects
-        review.negative_aspects = negative_aspects
-        review.save()
+            positive_aspects, negative_aspects = aspect_extractor.extract_aspects(review.text)
 
-        print(f"Review {review_id} was processed")
+            review.positive_aspects = positive_aspects
+            review.negative_aspects = negative_aspects
+            review.save()
+            propagate_to_duplicates(review, ["positive_aspects", "negative_aspects"])
+            sync_review_aspects(Review.objects.filter(Q(pk=review.pk) | Q(canonical=review)))
 
-    except Review.DoesNotExist:
-        print(f"Review {review_id} is not found")
-    except Exception as e:
-        print(f"Error with review {review_id}: {str(e)}")
+        except Review.DoesNotExist:
+            current.fail("Review is not found")
+            logger.warning("Review %s is not found", review_id)
+        except Exception as e:
+            current.fail(e)
+            logger.exception("Error with review %s", review_id)
 
 
 @shared_task
 def compare_review_with_event(review_id: int):
-    try:
-        review = Review.objects.get(id=review_id)
-        if not review:
-            return
+    with span("inference.event", review_id=review_id) as current:
+        try:
+            review = Review.objects.get(id=review_id)
+            if not review:
+                return
+
+            events = list(Event.objects.all())
+            event_index = event_comparator.build_event_index(events_list=events)
+
+            event_id = event_comparator.match_review_to_event(
+                review_text=review.text, event_index=event_index
+            )
+            current.set_attribute("event_id", event_id)
+            with track_daily_stats(review):
+                review.event = Event.objects.get(id=event_id)
+                review.save()
+                propagate_to_duplicates(review, ["event"])
+
+        except Review.DoesNotExist:
+            current.fail("Review is not found")
+            logger.warning("Review %s is not found", review_id)
+        except Exception as e:
+            current.fail(e)
+            logger.exception("Error with review %s", review_id)
 
-        events = list(Event.objects.all())
-        event_index = event_comparator.build_event_index(events_list=events)
 
-        event_id = event_comparator.match_review_to_event(
-            review_text=review.text, event_index=event_index
-        )
-        review.event = Event.objects.get(id=event_id)
-        review.save()
+@shared_task
+def classify_review_sentiment(review_id: int):
+    with span("inference.sentiment", review_id=review_id) as current:
+        try:
+            review = Review.objects.get(id=review_id)
+            if not review:
+                return
+
+            cls_result = review_classifier.predict(text=review.text)
+            with track_daily_stats(review):
+                if abs(cls_result['probabilities']['negative'] - cls_result['probabilities']['positive']) < 0.15:
+                    review.sentiment = 'neutral'
+                else:
+                    review.sentiment = cls_result['sentiment']
+                    review.confidence = cls_result['confidence']
+                review.save()
+                propagate_to_duplicates(review, ["sentiment", "confidence"])
+
+        except Review.DoesNotExist:
+            current.fail("Review is not found")
+            logger.warning("Review %s is not found", review_id)
+        except Exception as e:
+            current.fail(e)
+            logger.exception("Error with review %s", review_id)
 
-        print(f"Review {review_id} was processed, compared event ID: {event_id}")
 
-    except Review.DoesNotExist:
-        print(f"Review {review_id} is not found")
-    except Exception as e:
-        print(f"Error with review {review_id}: {str(e)}")
+@shared_task
+def wrap_profanity(review_id: int):
+    with span("profanity", review_id=review_id) as current:
+        try:
+            review = Review.objects.get(id=review_id)
+            if not review:
+                return
 
+            review.text = get_wrapped_prof_words(review.text)
+            # The hash identifies the imported text, so re-imports still match it after masking.
+            review.save(rehash=False)
 
-@shared_task
-def classify_review_sentiment(review_id: int):
-    try:
-        review = Review.objects.get(id=review_id)
-        if not review:
-            return
+        except Review.DoesNotExist:
+            current.fail("Review is not found")
+            logger.warning("Review %s is not found", review_id)
+        except Exception as e:
+            current.fail(e)
+            logger.exception("Error with review %s", review_id)
 
-        cls_result = review_classifier.predict(text=review.text)
-        if abs(cls_result['probabilities']['negative'] - cls_result['probabilities']['positive']) < 0.15:
-            review.sentiment = 'neutral'
-        else:
-            review.sentiment = cls_result['sentiment']
-            review.confidence = cls_result['confidence']
-        review.save()
 
-    except Review.DoesNotExist:
-        print(f"Review {review_id} is not found")
-    except Exception as e:
-        print(f"Error with review {review_id}: {str(e)}")
+@shared_task
+def inherit_canonical_results(review_id: int):
+    with span("inherit", review_id=review_id) as current:
+        try:
+            review = Review.objects.select_related("canonical").get(id=review_id)
+            if not review.canonical:
+                return
+
+            for field in INHERITED_FIELDS:
+                setattr(review, field, getattr(review.canonical, field))
+            review.save(update_fields=INHERITED_FIELDS)
+            sync_review_aspects([review])
+
+        except Review.DoesNotExist:
+            current.fail("Review is not found")
+            logger.warning("Review %s is not found", review_id)
+        except Exception as e:
+            current.fail(e)
+            logger.exception("Error with review %s", review_id)
 
 
 @shared_task
-def wrap_profanity(review_id: int):
-    try:
-        review = Review.objects.get(id=review_id)
-        if not review:
-            return
-
-        review.text = get_wrapped_prof_words(review.text)
-        review.save()
-
-    except Review.DoesNotExist:
-        print(f"Review {review_id} is not found")
-    except Exception as e:
-        print(f"Error with review {review_id}: {str(e)}")
+def process_reviews_batch(review_ids: list):
+    reviews = Review.objects.filter(id__in=review_ids).values_list("id", "canonical_id")
+
+    for review_id, canonical_id in reviews:
+        if canonical_id:
+            inherit_canonical_results(review_id)
+            wrap_profanity(review_id)
+            continue
+
+        compare_review_with_event(review_id)
+        classify_review_sentiment(review_id)
+        extract_aspects_for_review(review_id)
+        wrap_profanity(review_id)
@@ -1,3 +1,672 @@
-from django.test import TestCase
+import datetime
+import functools
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from openpyxl import Workbook
+from rest_framework import status
+from rest_framework.test import APIClient
+from selenium.common.exceptions import WebDriverException
+
+from review_analyser import tracing
+from reviews.indexing import get_index_queue
+from reviews.models import Event, Institution, Review, ReviewAspect, ReviewDailyStats
+from reviews.serializers import ReviewSerializer
+from reviews.testing import QueryBudgetMixin
+from review_processor.near_duplicates import minhash, similarity
+from .bulk import BulkReviewLoader, iter_file_rows
+from .management.commands.bench_task_connections import mode_settings
+from .models import ImportCursor
+from .pipeline import ReviewStreamSink, get_import_cursor
+from .tasks import classify_review_sentiment, extract_aspects_for_review
+from .views import BaseReviewsImportView
+from .services.browser_pool import BrowserPool
+from .services.otzovik_importer import OtzovikReviewsParser
+from .services.yandex_importer import YandexReviewsImporter
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+class FakeResponse:
+    def __init__(self, status_code, text=""):
+        self.status_code = status_code
+        self.text = text
+
+
+class FakeSession:
+    def __init__(self, pages):
+        self.pages = pages
+        self.headers = {}
+        self.requested_urls = []
+
+    def get(self, url, timeout=None):
+        self.requested_urls.append(url)
+        page = int(url.rsplit("=", 1)[-1])
+        if page not in self.pages:
+            return FakeResponse(404)
+        return FakeResponse(200, self.pages[page])
+
+
+class OtzovikParserTests(SimpleTestCase):
+    def setUp(self):
+        self.pages = {
+            page: (FIXTURES_DIR / "otzovik" / f"page_{page}.html").read_text(encoding="utf-8")
+            for page in (1, 2)
+        }
+
+    def test_parse_page(self):
+        parser = OtzovikReviewsParser(reviews_url="https://otzovik.com/reviews/teatr/")
+        reviews = parser.parse_page(self.pages[1])
+
+        self.assertEqual(len(reviews), 20)
+        self.assertEqual(reviews[0]["external_id"], "otzovik_10100")
+        self.assertTrue(reviews[0]["text"].endswith("Подробнее"))
+        self.assertEqual(
+            reviews[0]["date"],
+            datetime.datetime(2025, 11, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=5))),
+        )
+
+    def test_parse_all_pages(self):
+        session = FakeSession(self.pages)
+        parser = OtzovikReviewsParser(reviews_url="https://otzovik.com/reviews/teatr/", session=session)
+
+        reviews = parser.parse()
+
+        self.assertEqual(len(reviews), 40)
+        self.assertIn("https://otzovik.com/reviews/teatr/?page=3", session.requested_urls)
+
+    def test_parse_stops_at_from_date(self):
+        session = FakeSession(self.pages)
+        from_date = datetime.datetime(2025, 11, 1, tzinfo=datetime.timezone.utc)
+        parser = OtzovikReviewsParser(
+            reviews_url="https://otzovik.com/reviews/teatr/",
+            from_date=from_date,
+            session=session,
+        )
+
+        pages = list(parser.iter_pages())
+
+        self.assertEqual(len(pages), 1)
+        self.assertTrue(all(review["date"] > from_date for review in pages[0]))
+
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise WebDriverException("browser is gone")
+        return "about:blank"
+
+    def quit(self):
+        self.quit_called = True
+
+
+class BrowserPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.created = []
+        self.pool = BrowserPool(factory=self.create_driver, max_size=2)
+
+    def create_driver(self):
+        driver = FakeDriver()
+        self.created.append(driver)
+        return driver
+
+    def test_driver_is_reused(self):
+        with self.pool.driver() as first:
+            pass
+        with self.pool.driver() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertEqual(len(self.created), 1)
+
+    def test_dead_driver_is_replaced(self):
+        with self.pool.driver() as first:
+            first.alive = False
+        with self.pool.driver() as second:
+            pass
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.quit_called)
+
+    def test_driver_is_discarded_after_error(self):
+        with self.assertRaises(ValueError):
+            with self.pool.driver() as driver:
+                raise ValueError("parse failed")
+
+        self.assertTrue(driver.quit_called)
+
+    def test_pool_size_is_bounded(self):
+        with self.pool.driver(), self.pool.driver():
+            with self.assertRaises(TimeoutError):
+                with self.pool.driver(timeout=0.01):
+                    pass
+
+
+def find_chrome():
+    return next(
+        (path for path in map(shutil.which, ("google-chrome", "chromium", "chromium-browser")) if path),
+        None,
+    )
+
+
+class YandexImporterErrorTests(SimpleTestCase):
+    def test_driver_failures_are_raised(self):
+        pool = BrowserPool(factory=mock.Mock(side_effect=WebDriverException("chrome crashed")), max_size=1)
+
+        with self.assertRaises(WebDriverException):
+            YandexReviewsImporter(pool=pool).parse_reviews(yandex_id=1)
+        with self.assertRaises(WebDriverException):
+            list(YandexReviewsImporter(pool=pool).iter_review_pages(yandex_id=1))
+
+
+@skipUnless(find_chrome(), "Chrome is not installed")
+class YandexImporterTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        handler = functools.partial(
+            SimpleHTTPRequestHandler,
+            directory=str(FIXTURES_DIR / "yandex"),
+        )
+        handler.log_message = lambda *args: None
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+        from selenium import webdriver
+
+        def create_driver():
+            opts = webdriver.ChromeOptions()
+            opts.binary_location = find_chrome()
+            opts.add_argument("--headless=new")
+            opts.add_argument("--no-sandbox")
+            return webdriver.Chrome(options=opts)
+
+        cls.pool = BrowserPool(factory=create_driver, max_size=1)
+        cls.importer = YandexReviewsImporter(
+            pool=cls.pool,
+            reviews_url=f"http://127.0.0.1:{cls.server.server_port}/reviews.html?org={{}}",
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_all_reviews_are_loaded_by_scrolling(self):
+        result = self.importer.parse_reviews(yandex_id=1)
+
+        self.assertEqual(len(result["company_reviews"]), 23)
+
+    def test_scrolling_stops_at_since_dt(self):
+        since_dt = datetime.datetime(2025, 11, 21, tzinfo=datetime.timezone.utc)
+
+        result = self.importer.parse_reviews(yandex_id=1, since_dt=since_dt)
+
+        self.assertEqual(
+            [review["text"] for review in result["company_reviews"]],
+            [f"Отзыв номер {i}" for i in range(5)],
+        )
+
+
+class ReviewStreamSinkTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        self.reviewed_at = datetime.datetime(2025, 10, 3, tzinfo=datetime.timezone.utc)
+        Review.objects.create(
+            institution=self.institution,
+            text="Старый отзыв",
+            source="VK",
+            reviewed_at=self.reviewed_at,
+        )
+        self.dispatched = []
+
+    def make_page(self, *texts):
+        return [{"text": text, "date": self.reviewed_at} for text in texts]
+
+    def make_sink(self):
+        return ReviewStreamSink(self.institution, source="VK", on_created=self.dispatched.append)
+
+    def test_pages_are_saved_and_dispatched_one_by_one(self):
+        pages = [
+            self.make_page("Первый", "Старый отзыв"),
+            self.make_page("Второй", "Первый"),
+        ]
+
+        sink = self.make_sink().consume(pages)
+
+        self.assertEqual([[review.text for review in batch] for batch in self.dispatched], [["Первый"], ["Второй"]])
+        self.assertEqual(sink.skipped_count, 2)
+        self.assertEqual(sink.total_processed, 4)
+        self.assertEqual(Review.objects.filter(institution=self.institution).count(), 3)
+
+    @mock.patch("importer.views.IMPORTED_REVIEWS_PAGE_SIZE", 2)
+    def test_imported_reviews_are_streamed_from_created_ids(self):
+        sink = self.make_sink().consume([self.make_page("Первый", "Второй", "Старый отзыв"), self.make_page("Третий")])
+
+        response = BaseReviewsImportView().response_sink(sink)
+        data = json.loads(b"".join(response.streaming_content))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(list(sink.created_ids), [review.id for batch in self.dispatched for review in batch])
+        self.assertEqual(data["message"], "Successfully imported 3 reviews, skipped 1 duplicates")
+        self.assertEqual([review["text"] for review in data["imported_reviews"]], ["Первый", "Второй", "Третий"])
+        self.assertEqual([review["institution"] for review in data["imported_reviews"]], [self.institution.id] * 3)
+        self.assertEqual(data["total_processed"], 4)
+
+    def test_duplicates_are_matched_by_normalized_text(self):
+        sink = self.make_sink().consume([self.make_page("  старый   ОТЗЫВ ", "Новый", "новый")])
+
+        self.assertEqual([[review.text for review in batch] for batch in self.dispatched], [["Новый"]])
+        self.assertEqual(sink.skipped_count, 2)
+
+    def test_duplicates_are_matched_by_external_id(self):
+        page = [{"text": "Первый", "date": self.reviewed_at, "external_id": "vk_1_1"}]
+        self.make_sink().consume([page])
+
+        edited = [{"text": "Первый, исправленный", "date": self.reviewed_at, "external_id": "vk_1_1"}]
+        sink = self.make_sink().consume([edited])
+
+        self.assertEqual(sink.created_count, 0)
+        self.assertEqual(sink.skipped_count, 1)
+
+    def test_duplicates_are_matched_across_review_dates(self):
+        self.make_sink().consume([[{"text": "Первый", "date": self.reviewed_at, "external_id": "vk_1_1"}]])
+
+        later = self.reviewed_at + datetime.timedelta(days=40)
+        sink = self.make_sink().consume([[
+            {"text": "Старый отзыв", "date": later},
+            {"text": "Первый, исправленный", "date": later, "external_id": "vk_1_1"},
+        ]])
+
+        self.assertEqual(sink.created_count, 0)
+        self.assertEqual(sink.skipped_count, 2)
+
+    def test_cursor_tracks_newest_review(self):
+        cursor = get_import_cursor(self.institution, "VK")
+        newest = self.reviewed_at + datetime.timedelta(days=1)
+        pages = [[
+            {"text": "Первый", "date": self.reviewed_at, "external_id": "vk_1_1"},
+            {"text": "Второй", "date": newest, "external_id": "vk_1_2"},
+            {"text": "Старый отзыв", "date": newest, "external_id": "vk_1_3"},
+        ]]
+
+        ReviewStreamSink(self.institution, source="VK", cursor=cursor).consume(pages)
+
+        cursor = ImportCursor.objects.get(institution=self.institution, source="VK")
+        self.assertEqual(cursor.last_reviewed_at, newest)
+        self.assertEqual(cursor.last_external_id, "vk_1_2")
+        self.assertEqual((cursor.fetched_count, cursor.imported_count, cursor.skipped_count), (3, 2, 1))
+        self.assertEqual(cursor.total_imported, 2)
+
+    def test_created_reviews_serialize_without_extra_queries(self):
+        self.make_sink().consume([self.make_page(*(f"Отзыв {number}" for number in range(20)))])
+
+        with self.assertQueryBudget(0):
+            ReviewSerializer(self.dispatched[0], many=True).data
+
+    def test_async_pages(self):
+        async def pages():
+            yield self.make_page("Первый")
+            yield self.make_page("Второй")
+
+        sink = async_to_sync(self.make_sink().aconsume)(pages())
+
+        self.assertEqual(sink.created_count, 2)
+        self.assertEqual(len(self.dispatched), 2)
+
+
+NEAR_DUPLICATE_TEXTS = [
+    "Были на спектакле всей семьёй, актёры играли замечательно, но в зале было очень душно и кондиционеры не работали весь вечер.",
+    "Были на спектакле всей семьей, актеры играли замечательно! Но в зале было очень душно, кондиционеры не работали весь вечер",
+    "Отличный концерт, звук прекрасный, места удобные, персонал вежливый, обязательно придём ещё раз с друзьями.",
+]
+
+
+class NearDuplicateTests(TestCase):
+    def setUp(self):
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        self.reviewed_at = datetime.datetime(2025, 10, 3, tzinfo=datetime.timezone.utc)
+
+    def import_texts(self, source, *texts):
+        page = [{"text": text, "date": self.reviewed_at} for text in texts]
+        created = []
+        ReviewStreamSink(self.institution, source=source, on_created=created.extend).consume([page])
+        return created
+
+    def test_minhash_similarity(self):
+        first, second, other = (minhash(text) for text in NEAR_DUPLICATE_TEXTS)
+
+        self.assertGreater(similarity(first, second), 0.7)
+        self.assertLess(similarity(first, other), 0.3)
+        self.assertIsNone(minhash("Всё понравилось"))
+
+    def test_near_duplicates_are_linked_across_sources(self):
+        canonical, other = self.import_texts("2GIS", NEAR_DUPLICATE_TEXTS[0], NEAR_DUPLICATE_TEXTS[2])
+        [duplicate] = self.import_texts("VK", NEAR_DUPLICATE_TEXTS[1])
+
+        self.assertEqual(duplicate.canonical_id, canonical.id)
+        self.assertIsNone(Review.objects.get(pk=other.pk).canonical_id)
+
+    def test_near_duplicates_are_linked_within_one_page(self):
+        canonical, duplicate = self.import_texts("VK", NEAR_DUPLICATE_TEXTS[0], NEAR_DUPLICATE_TEXTS[1])
+
+        self.assertIsNone(canonical.canonical_id)
+        self.assertEqual(Review.objects.get(pk=duplicate.pk).canonical_id, canonical.id)
+
+    @mock.patch("importer.tasks.aspect_extractor")
+    def test_aspect_extraction_fills_review_aspects_for_duplicates(self, extractor):
+        extractor.extract_aspects.return_value = (["актёры"], ["кондиционер"])
+        self.import_texts("2GIS", NEAR_DUPLICATE_TEXTS[0])
+        [duplicate] = self.import_texts("VK", NEAR_DUPLICATE_TEXTS[1])
+
+        extract_aspects_for_review(duplicate.canonical_id)
+
+        self.assertEqual(
+            sorted(ReviewAspect.objects.values_list("review__source", "aspect__name", "polarity")),
+            [
+                ("2GIS", "актёры", "positive"), ("2GIS", "кондиционер", "negative"),
+                ("VK", "актёры", "positive"), ("VK", "кондиционер", "negative"),
+            ],
+        )
+
+    @mock.patch("importer.tasks.review_classifier")
+    def test_classification_does_not_count_duplicates_in_daily_stats(self, classifier):
+        classifier.predict.return_value = {
+            "sentiment": "negative",
+            "confidence": 0.8,
+            "probabilities": {"negative": 0.8, "positive": 0.1},
+        }
+        self.import_texts("2GIS", NEAR_DUPLICATE_TEXTS[0])
+        [duplicate] = self.import_texts("VK", NEAR_DUPLICATE_TEXTS[1])
+
+        classify_review_sentiment(duplicate.canonical_id)
+
+        stats = ReviewDailyStats.objects.filter(institution=self.institution).order_by("source")
+        self.assertEqual(
+            [(row.source, row.date, row.negative_count, row.confidence_count) for row in stats],
+            [("2GIS", self.reviewed_at.date(), 1, 1)],
+        )
+
+    @mock.patch("importer.tasks.aspect_extractor")
+    def test_bulk_writes_are_queued_for_indexing(self, extractor):
+        extractor.extract_aspects.return_value = (["актёры"], [])
+        queue = get_index_queue()
+        queue.clear()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            canonical, other = self.import_texts("2GIS", NEAR_DUPLICATE_TEXTS[0], NEAR_DUPLICATE_TEXTS[2])
+        [duplicate] = self.import_texts("VK", NEAR_DUPLICATE_TEXTS[1])
+        self.assertEqual({review_id for review_id, _ in queue.pop(10)}, {canonical.id, other.id})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with mock.patch.object(Review, "save"):
+                extract_aspects_for_review(canonical.id)
+        self.assertEqual([review_id for review_id, _ in queue.pop(10)], [duplicate.id])
+
+
+class BulkReviewLoaderTests(TestCase):
+    def setUp(self):
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        Review.objects.create(
+            institution=self.institution,
+            text="Старый отзыв",
+            source="Опрос",
+            reviewed_at=datetime.datetime(2025, 10, 3, tzinfo=datetime.timezone.utc),
+        )
+
+    def load(self, fileobj, file_format):
+        loader = BulkReviewLoader(self.institution, source="Опрос", chunk_size=2, enqueue_postprocessing=False)
+        return loader.load(iter_file_rows(fileobj, file_format))
+
+    def test_load_csv(self):
+        content = (
+            "text,date\n"
+            "Первый,2025-10-01\n"
+            "Старый отзыв,2025-10-02\n"
+            "Второй,2025-10-03T12:00:00+05:00\n"
+            "Первый,2025-10-04\n"
+            ",2025-10-05\n"
+            "Без даты,\n"
+        ).encode("utf-8")
+
+        loader = self.load(io.BytesIO(content), "csv")
+
+        self.assertEqual(loader.total_processed, 6)
+        self.assertEqual(loader.imported_count, 2)
+        self.assertEqual(loader.skipped_count, 2)
+        self.assertEqual(loader.invalid_count, 2)
+        self.assertEqual(Review.objects.filter(source="Опрос").count(), 3)
+
+    def test_load_jsonl(self):
+        content = (
+            '{"text": "Первый", "date": "2025-10-01", "external_id": 7}\n'
+            '{"text": "Второй", "date": "2025-10-02", "external_id": 7}\n'
+        ).encode("utf-8")
+
+        loader = self.load(io.BytesIO(content), "jsonl")
+
+        self.assertEqual(loader.imported_count, 1)
+        self.assertEqual(Review.objects.get(text="Первый").source_external_id, "7")
+
+    def test_load_xlsx(self):
+        workbook = Workbook()
+        workbook.active.append(["text", "date"])
+        workbook.active.append(["Первый", datetime.datetime(2025, 10, 1, 18, 30)])
+        workbook.active.append(["Второй", datetime.date(2025, 10, 2)])
+        content = io.BytesIO()
+        workbook.save(content)
+        content.seek(0)
+
+        loader = self.load(content, "xlsx")
+
+        self.assertEqual(loader.imported_count, 2)
+
+    def test_near_duplicates_are_linked_only_on_request(self):
+        rows = [{"text": text, "date": "2025-10-01"} for text in NEAR_DUPLICATE_TEXTS[:2]]
+
+        BulkReviewLoader(self.institution, source="Опрос", enqueue_postprocessing=False).load(rows)
+        self.assertFalse(Review.objects.filter(canonical__isnull=False).exists())
+
+        Review.objects.filter(text__in=NEAR_DUPLICATE_TEXTS).delete()
+        BulkReviewLoader(
+            self.institution, source="Опрос", link_duplicates=True, enqueue_postprocessing=False
+        ).load(rows)
+        self.assertEqual(Review.objects.get(text=NEAR_DUPLICATE_TEXTS[1]).canonical.text, NEAR_DUPLICATE_TEXTS[0])
+
+
+class FileReviewsImportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        self.url = reverse("import-file-reviews")
+
+    @mock.patch("importer.bulk.process_reviews_batch.delay")
+    def test_import_file(self, delay):
+        upload = SimpleUploadedFile("survey.csv", "text,date\nПервый,2025-10-01\nВторой,2025-10-02\n".encode("utf-8"))
+
+        response = self.client.post(
+            self.url,
+            {"institution_id": self.institution.id, "source": "Опрос", "file": upload},
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["imported_count"], 2)
+        delay.assert_called_once()
+        self.assertEqual(len(delay.call_args.args[0]), 2)
+
+    def test_import_file_requires_source(self):
+        upload = SimpleUploadedFile("survey.csv", b"text,date\n")
+
+        response = self.client.post(
+            self.url,
+            {"institution_id": self.institution.id, "file": upload},
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class EnqueuePendingReviewsTests(TestCase):
+    @mock.patch("importer.management.commands.enqueue_pending_reviews.process_reviews_batch.delay")
+    def test_only_old_unclassified_canonical_reviews_are_enqueued(self, delay):
+        institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        reviewed_at = datetime.datetime(2025, 10, 3, tzinfo=datetime.timezone.utc)
+        pending = [
+            Review.objects.create(institution=institution, text=f"Отзыв {number}", source="VK", reviewed_at=reviewed_at)
+            for number in range(3)
+        ]
+        Review.objects.create(
+            institution=institution, text="Готовый", source="VK", sentiment="positive", reviewed_at=reviewed_at
+        )
+        Review.objects.create(
+            institution=institution, text="Дубликат", source="VK", canonical=pending[0], reviewed_at=reviewed_at
+        )
+        Review.objects.filter(pk__in=[review.pk for review in pending[:2]]).update(
+            created_at=reviewed_at - datetime.timedelta(days=1)
+        )
+
+        out = io.StringIO()
+        call_command("enqueue_pending_reviews", "--batch-size", "1", stdout=out)
+
+        self.assertEqual([call.args[0] for call in delay.call_args_list], [[pending[0].pk], [pending[1].pk]])
+        self.assertIn("Enqueued 2 pending reviews", out.getvalue())
+
+
+class TaskConnectionSettingsTests(SimpleTestCase):
+    def test_mode_settings(self):
+        base = {"ENGINE": "django.db.backends.postgresql", "NAME": "reviews", "OPTIONS": {"pool": True}}
+
+        self.assertEqual(mode_settings(base, "none", 5)["CONN_MAX_AGE"], 0)
+        self.assertNotIn("pool", mode_settings(base, "none", 5)["OPTIONS"])
+        persistent = mode_settings(base, "persistent", 5)
+        self.assertEqual((persistent["CONN_MAX_AGE"], persistent["CONN_HEALTH_CHECKS"]), (600, True))
+        self.assertEqual(base["OPTIONS"], {"pool": True})
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+    def named(self, name):
+        return [span_data for span_data in self.spans if span_data["name"] == name]
+
+
+@override_settings(TRACING_ENABLED=True)
+class ImportTracingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tracing", email="tracing@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        self.exporter = RecordingExporter()
+        patcher = mock.patch("review_analyser.tracing.get_span_exporter", return_value=self.exporter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch("importer.bulk.process_reviews_batch.delay")
+    def test_import_stages_share_the_request_trace(self, delay):
+        upload = SimpleUploadedFile("survey.csv", "text,date\nПервый,2025-10-01\nВторой,2025-10-02\n".encode("utf-8"))
+
+        self.client.post(
+            reverse("import-file-reviews"),
+            {"institution_id": self.institution.id, "source": "Опрос", "file": upload},
+            format="multipart",
+        )
+
+        [root] = self.exporter.named("import")
+        self.assertIsNone(root["parent_id"])
+        self.assertEqual(root["attributes"]["status_code"], status.HTTP_201_CREATED)
+        self.assertEqual({span_data["trace_id"] for span_data in self.exporter.spans}, {root["trace_id"]})
+        self.assertEqual(self.exporter.named("insert")[0]["attributes"]["created"], 2)
+        self.assertEqual(self.exporter.named("dedup")[0]["parent_id"], root["span_id"])
+
+    @mock.patch("importer.tasks.review_classifier")
+    def test_task_continues_the_publishing_trace(self, classifier):
+        classifier.predict.side_effect = RuntimeError("model is not loaded")
+        review = Review.objects.create(
+            institution=self.institution,
+            text="Отзыв",
+            source="VK",
+            reviewed_at=datetime.datetime(2025, 10, 3, tzinfo=datetime.timezone.utc),
+        )
+
+        headers = {}
+        with tracing.span("import") as root:
+            tracing.inject_trace_headers(headers=headers)
+
+        task = SimpleNamespace(name="importer.tasks.classify_review_sentiment", request=SimpleNamespace(**headers))
+        tracing.start_task_span(task_id="task-1", task=task, args=(review.id,))
+        with self.assertLogs("importer.tasks", "ERROR"):
+            classify_review_sentiment(review.id)
+        tracing.end_task_span(task_id="task-1", state="SUCCESS")
+
+        [task_span] = self.exporter.named(f"task {task.name}")
+        [inference] = self.exporter.named("inference.sentiment")
+        self.assertEqual((task_span["trace_id"], task_span["parent_id"]), (root.trace_id, root.span_id))
+        self.assertEqual(task_span["attributes"]["review_id"], review.id)
+        self.assertGreaterEqual(task_span["attributes"]["queue_ms"], 0)
+        self.assertEqual(inference["parent_id"], task_span["span_id"])
+        self.assertEqual((inference["status"], inference["error"]), ("error", "RuntimeError: model is not loaded"))
+
+    def test_latency_report(self):
+        spans = [
+            {"trace_id": "a", "span_id": "1", "parent_id": None, "name": "import", "start": 100.0, "end": 101.0},
+            {"trace_id": "a", "span_id": "2", "parent_id": "1", "name": "inference.sentiment",
+             "start": 102.0, "end": 103.5, "attributes": {"review_id": 7}},
+            {"trace_id": "a", "span_id": "3", "parent_id": "1", "name": "inference.event",
+             "start": 102.0, "end": 102.5, "status": "error", "attributes": {"review_id": 8}},
+            {"trace_id": "b", "span_id": "4", "parent_id": None, "name": "index",
+             "start": 104.0, "end": 105.0, "attributes": {"review_ids": [7]}},
+        ]
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as fileobj:
+            fileobj.write("worker started\n")
+            for span_data in spans:
+                span_data.setdefault("status", "ok")
+                span_data.setdefault("attributes", {})
+                span_data["duration_ms"] = (span_data["end"] - span_data["start"]) * 1000
+                fileobj.write(json.dumps(span_data) + "\n")
+        self.addCleanup(os.remove, fileobj.name)
+
+        latencies = tracing.review_latencies(spans)
+        self.assertEqual(latencies[7]["latency_ms"], 5000)
+        self.assertEqual(latencies[8]["failed"], ["inference.event"])
+        self.assertEqual(latencies[8]["latency_ms"], 2500)
+
+        out = io.StringIO()
+        call_command("import_latency_report", "--input", fileobj.name, stdout=out)
+        self.assertIn("Import to fully processed: 2 reviews, 1 with failed stages", out.getvalue())
+        self.assertIn("review 7: 5000.00 ms", out.getvalue())
@@ -7,4 +7,5 @@ urlpatterns = [
     path('import-tg-reviews/', views.TelegramReviews.as_view(), name='import_tg_reviews'),
     path('import-vk-reviews/', views.VKReviews.as_view(), name='import-vk-reviews'),
     path('import-otzovik-reviews/', views.OtzovikReviews.as_view(), name='import-otzovik-reviews'),
+    path('import-file-reviews/', views.FileReviews.as_view(), name='import-file-reviews'),
 ]
@@ -1,52 +1,37 @@
-import asyncio
-
-from django.db.models import Max
+import orjson
+from asgiref.sync import async_to_sync
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from django.db import transaction
 from django.conf import settings
+from django.http import StreamingHttpResponse
 
+from review_analyser.tracing import current_span, span
 from reviews.models import Institution, Review
-from reviews.serializers import ReviewSerializer
-from importer.services.gis_importer import fetch_reviews_with_pagination
+from reviews.serializers import serialize_reviews
+from importer.services.gis_importer import iter_review_pages
 from importer.services.yandex_importer import yandex_reviews_importer
-from importer.services.telegram_importer import parse_telegram_comments
+from importer.services.telegram_importer import parser as telegram_parser
 from importer.services.vk_importer import VKReviewsParser
 from importer.services.otzovik_importer import OtzovikReviewsParser
-from .tasks import extract_aspects_for_review, compare_review_with_event, classify_review_sentiment, wrap_profanity
-
-
-def save_reviews(institution, reviews_data, source, text_key, date_key):
-    existing_texts = set(
-        Review.objects.filter(
-            institution=institution
-        ).values_list("text", flat=True)
-    )
-
-    new_reviews = []
-    skipped_count = 0
-
-    for data in reviews_data:
-        text = data[text_key]
-        if text in existing_texts:
-            skipped_count += 1
-            continue
+from .bulk import BulkReviewLoader, detect_file_format, iter_file_rows
+from .pipeline import ReviewStreamSink, get_import_cursor
+from .tasks import (
+    extract_aspects_for_review, compare_review_with_event, classify_review_sentiment, wrap_profanity,
+    inherit_canonical_results,
+)
 
-        new_reviews.append(
-            Review(
-                institution=institution,
-                text=text,
-                source=source,
-                reviewed_at=data[date_key],
-            )
-        )
+IMPORTED_REVIEWS_PAGE_SIZE = 500
 
-    with transaction.atomic():
-        created_reviews = Review.objects.bulk_create(new_reviews)
 
-    return created_reviews, skipped_count
+def stream_import_response(message, review_ids, total_processed):
+    yield orjson.dumps({"message": message})[:-1] + b',"imported_reviews":['
+    for start in range(0, len(review_ids), IMPORTED_REVIEWS_PAGE_SIZE):
+        page = Review.objects.filter(pk__in=review_ids[start:start + IMPORTED_REVIEWS_PAGE_SIZE])
+        rows = serialize_reviews(page.with_related().order_by("id"))
+        yield (b"," if start else b"") + b",".join(orjson.dumps(row) for row in rows)
+    yield b'],"total_processed":' + orjson.dumps(total_processed) + b"}"
 
 
 class BaseReviewsImportView(APIView):
@@ -54,30 +39,51 @@ class BaseReviewsImportView(APIView):
     text_key = "text"
     date_key = "date"
 
+    def dispatch(self, request, *args, **kwargs):
+        with span("import", view=type(self).__name__, source=self.source_name) as current:
+            response = super().dispatch(request, *args, **kwargs)
+            current.set_attribute("status_code", response.status_code)
+            return response
+
     def get_institution(self, institution_id):
         try:
             return Institution.objects.get(pk=institution_id)
         except Institution.DoesNotExist:
             return None
 
+    def get_cursor(self, institution):
+        return get_import_cursor(institution, self.source_name)
+
+    def create_sink(self, institution, cursor=None):
+        return ReviewStreamSink(
+            institution,
+            source=self.source_name,
+            text_key=self.text_key,
+            date_key=self.date_key,
+            on_created=self.run_postprocessing,
+            cursor=cursor or self.get_cursor(institution),
+        )
+
     def run_postprocessing(self, reviews):
         for review in reviews:
+            if review.canonical_id:
+                inherit_canonical_results.delay(review.id)
+                wrap_profanity.delay(review.id)
+                continue
+
             compare_review_with_event.delay(review.id)
             classify_review_sentiment.delay(review.id)
             extract_aspects_for_review.delay(review.id)
             wrap_profanity.delay(review.id)
 
-    def response_ok(self, reviews, skipped_count, total_processed):
-        serializer = ReviewSerializer(reviews, many=True)
-        return Response(
-            {
-                "message": (
-                    f"Successfully imported {len(reviews)} reviews, "
-                    f"skipped {skipped_count} duplicates"
-                ),
-                "imported_reviews": serializer.data,
-                "total_processed": total_processed,
-            },
+    def response_sink(self, sink):
+        message = (
+            f"Successfully imported {sink.created_count} reviews, "
+            f"skipped {sink.skipped_count} duplicates"
+        )
+        return StreamingHttpResponse(
+            stream_import_response(message, sink.created_ids, sink.total_processed),
+            content_type="application/json",
             status=status.HTTP_201_CREATED,
         )
 
@@ -87,6 +93,15 @@ class BaseReviewsImportView(APIView):
             status=status.HTTP_404_NOT_FOUND,
         )
 
+    def response_error(self, error):
+        active = current_span()
+        if active is not None:
+            active.fail(error)
+        return Response(
+            {"error": f"Error occurred: {str(error)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
 
 class GISReviews(BaseReviewsImportView):
     source_name = "2GIS"
@@ -105,32 +120,16 @@ class GISReviews(BaseReviewsImportView):
         )
 
         try:
-            reviews_data = fetch_reviews_with_pagination(
-                initial_url=url,
-                auth_header=f"Bearer {settings.GIS_AUTH_TOKEN}",
-            )
-
-            created, skipped = save_reviews(
-                institution,
-                reviews_data,
-                source=self.source_name,
-                text_key=self.text_key,
-                date_key=self.date_key,
-            )
-
-            self.run_postprocessing(created)
-
-            return self.response_ok(
-                created,
-                skipped,
-                total_processed=len(reviews_data),
+            sink = self.create_sink(institution).consume(
+                iter_review_pages(
+                    initial_url=url,
+                    auth_header=f"Bearer {settings.GIS_AUTH_TOKEN}",
+                )
             )
+            return self.response_sink(sink)
 
         except Exception as e:
-            return Response(
-                {"error": f"Error occurred: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+            return self.response_error(e)
 
 
 class YandexReviews(BaseReviewsImportView):
@@ -142,32 +141,19 @@ class YandexReviews(BaseReviewsImportView):
             return self.response_not_found()
 
         yandex_id = int(institution.yandex_map_link.split("/")[-1])
+        cursor = self.get_cursor(institution)
 
         try:
-            data = yandex_reviews_importer.parse_reviews(yandex_id=yandex_id)
-            reviews = data["company_reviews"]
-
-            created, skipped = save_reviews(
-                institution,
-                reviews,
-                source=self.source_name,
-                text_key=self.text_key,
-                date_key=self.date_key,
-            )
-
-            self.run_postprocessing(created)
-
-            return self.response_ok(
-                created,
-                skipped,
-                total_processed=len(reviews),
+            sink = self.create_sink(institution, cursor).consume(
+                yandex_reviews_importer.iter_review_pages(
+                    yandex_id=yandex_id,
+                    since_dt=cursor.last_reviewed_at,
+                )
             )
+            return self.response_sink(sink)
 
         except Exception as e:
-            return Response(
-                {"error": f"Error occurred: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+            return self.response_error(e)
 
 
 class TelegramReviews(BaseReviewsImportView):
@@ -179,43 +165,19 @@ class TelegramReviews(BaseReviewsImportView):
             return self.response_not_found()
 
         tg_channel = institution.telegram_link.split("/")[-1]
-
-        last_review_dt = (
-            Review.objects.filter(
-                institution=institution,
-                source=self.source_name,
-            )
-            .aggregate(last_date=Max("reviewed_at"))
-            ["last_date"]
-        )
+        cursor = self.get_cursor(institution)
 
         try:
-            reviews = parse_telegram_comments(
-                channel_username=tg_channel,
-                since_dt=last_review_dt,
-            )
-
-            created, skipped = save_reviews(
-                institution,
-                reviews,
-                source=self.source_name,
-                text_key="text",
-                date_key="date",
-            )
-
-            self.run_postprocessing(created)
-
-            return self.response_ok(
-                created,
-                skipped,
-                total_processed=len(reviews),
+            sink = async_to_sync(self.create_sink(institution, cursor).aconsume)(
+                telegram_parser.iter_comment_pages(
+                    channel_username=tg_channel,
+                    since_dt=cursor.last_reviewed_at,
+                )
             )
+            return self.response_sink(sink)
 
         except Exception as e:
-            return Response(
-                {"error": f"Error occurred: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+            return self.response_error(e)
 
 
 class VKReviews(BaseReviewsImportView):
@@ -227,46 +189,22 @@ class VKReviews(BaseReviewsImportView):
             return self.response_not_found()
 
         vk_group_id = institution.vk_link.split("/")[-1]
-
-        last_review_dt = (
-            Review.objects.filter(
-                institution=institution,
-                source=self.source_name,
-            )
-            .aggregate(last_date=Max("reviewed_at"))
-            ["last_date"]
-        )
+        cursor = self.get_cursor(institution)
 
         try:
             parser = VKReviewsParser(
                 group_id=vk_group_id,
                 token=settings.VK_USER_TOKEN,
-                from_date=last_review_dt,
+                from_date=cursor.last_reviewed_at,
             )
 
-            reviews_data = asyncio.run(parser.parse())
-
-            created, skipped = save_reviews(
-                institution,
-                reviews_data,
-                source=self.source_name,
-                text_key="text",
-                date_key="date",
-            )
-
-            self.run_postprocessing(created)
-
-            return self.response_ok(
-                created,
-                skipped,
-                total_processed=len(reviews_data),
+            sink = async_to_sync(self.create_sink(institution, cursor).aconsume)(
+                parser.iter_pages()
             )
+            return self.response_sink(sink)
 
         except Exception as e:
-            return Response(
-                {"error": f"Error occurred: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+            return self.response_error(e)
 
 
 class OtzovikReviews(BaseReviewsImportView):
@@ -278,40 +216,62 @@ class OtzovikReviews(BaseReviewsImportView):
             return self.response_not_found()
 
         otzovik_url = institution.otzovik_link
-        last_review_dt = (
-            Review.objects.filter(
-                institution=institution,
-                source=self.source_name,
-            )
-            .aggregate(last_date=Max("reviewed_at"))
-            ["last_date"]
-        )
+        cursor = self.get_cursor(institution)
 
         try:
             parser = OtzovikReviewsParser(
                 reviews_url=otzovik_url,
-                from_date=last_review_dt
+                from_date=cursor.last_reviewed_at
             )
-            reviews_data = parser.parse()
+            sink = self.create_sink(institution, cursor).consume(parser.iter_pages())
+            return self.response_sink(sink)
 
-            created, skipped = save_reviews(
-                institution,
-                reviews_data,
-                source=self.source_name,
-                text_key="text",
-                date_key="date",
-            )
+        except Exception as e:
+            return self.response_error(e)
 
-            self.run_postprocessing(created)
 
-            return self.response_ok(
-                created,
-                skipped,
-                total_processed=len(reviews_data),
+class FileReviews(BaseReviewsImportView):
+    def post(self, request):
+        institution = self.get_institution(request.data.get("institution_id"))
+        if not institution:
+            return self.response_not_found()
+
+        uploaded = request.FILES.get("file")
+        source = request.data.get("source")
+        if not uploaded or not source:
+            return Response(
+                {"error": "Both file and source are required"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        except Exception as e:
+        file_format = request.data.get("format") or detect_file_format(uploaded.name)
+        if file_format is None:
             return Response(
-                {"error": f"Error occurred: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                {"error": "Unsupported file format"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
+
+        try:
+            loader = BulkReviewLoader(
+                institution,
+                source=source,
+                text_column=request.data.get("text_column", "text"),
+                date_column=request.data.get("date_column", "date"),
+            ).load(iter_file_rows(uploaded.file, file_format))
+
+            return Response(
+                {
+                    "message": (
+                        f"Successfully imported {loader.imported_count} reviews, "
+                        f"skipped {loader.skipped_count} duplicates"
+                    ),
+                    "imported_count": loader.imported_count,
+                    "skipped_count": loader.skipped_count,
+                    "invalid_count": loader.invalid_count,
+                    "total_processed": loader.total_processed,
+                },
+                status=status.HTTP_201_CREATED,
+            )
+
+        except Exception as e:
+            return self.response_error(e)
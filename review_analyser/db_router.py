@@ -0,0 +1,104 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY_PIN_KEY_PREFIX = "db-primary-pin"
+
+_read_database = ContextVar("read_database", default=None)
+
+
+def current_read_database() -> Optional[str]:
+    return _read_database.get()
+
+
+@contextmanager
+def reading_from(alias: Optional[str]):
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+def _pin_key(user) -> str:
+    return f"{PRIMARY_PIN_KEY_PREFIX}:{user.pk}"
+
+
+def pin_to_primary(user) -> None:
+    if settings.READ_REPLICA_DATABASE:
+        cache.set(_pin_key(user), True, settings.READ_YOUR_WRITES_SECONDS)
+
+
+def read_database_for(user) -> Optional[str]:
+    if not settings.READ_REPLICA_DATABASE:
+        return None
+    if user is not None and user.is_authenticated and cache.get(_pin_key(user)):
+        return None
+    return settings.READ_REPLICA_DATABASE
+
+
+def _iter_reading_from(iterator, alias):
+    iterator = iter(iterator)
+    while True:
+        with reading_from(alias):
+            chunk = next(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def use_read_replica(view_method):
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        alias = read_database_for(request.user)
+        request.read_database = alias
+        with reading_from(alias):
+            response = view_method(self, request, *args, **kwargs)
+        if alias and response.streaming:
+            response.streaming_content = _iter_reading_from(response.streaming_content, alias)
+        return response
+    return wrapper
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_database.get()
+        if alias and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        if _read_database.get():
+            _read_database.set(None)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == settings.READ_REPLICA_DATABASE:
+            return False
+        return None
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, "user", None)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            pin_to_primary(user)
+        return response
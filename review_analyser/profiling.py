@@ -0,0 +1,224 @@
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from typing import Dict, List
+
+import redis
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+PROFILE_KEY_PREFIX = "request-profile"
+PROFILE_ENDPOINTS_KEY = f"{PROFILE_KEY_PREFIX}:endpoints"
+PROFILE_METRICS = ("total_ms", "db_ms", "serialization_ms", "queries", "response_bytes")
+PERCENTILES = (50, 95, 99)
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = defaultdict(lambda: [0, 0.0])
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            statement = self.statements[sql]
+            statement[0] += 1
+            statement[1] += elapsed
+
+    def top(self, limit: int) -> List[Dict]:
+        statements = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {"sql": sql, "count": count, "ms": round(seconds * 1000, 2)}
+            for sql, (count, seconds) in statements
+        ]
+
+
+class LocalProfileStore:
+    def __init__(self, window: int):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def add(self, endpoint: str, sample: Dict) -> None:
+        with self._lock:
+            self._samples[endpoint].append(sample)
+
+    def samples(self) -> Dict[str, List[Dict]]:
+        with self._lock:
+            return {endpoint: list(samples) for endpoint, samples in self._samples.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+class RedisProfileStore:
+    def __init__(self, url: str, window: int):
+        self.client = redis.Redis.from_url(url)
+        self.window = window
+
+    def _key(self, endpoint: str) -> str:
+        return f"{PROFILE_KEY_PREFIX}:{endpoint}"
+
+    def add(self, endpoint: str, sample: Dict) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.sadd(PROFILE_ENDPOINTS_KEY, endpoint)
+        pipeline.lpush(self._key(endpoint), json.dumps(sample))
+        pipeline.ltrim(self._key(endpoint), 0, self.window - 1)
+        pipeline.execute()
+
+    def samples(self) -> Dict[str, List[Dict]]:
+        endpoints = sorted(member.decode() for member in self.client.smembers(PROFILE_ENDPOINTS_KEY))
+        pipeline = self.client.pipeline(transaction=False)
+        for endpoint in endpoints:
+            pipeline.lrange(self._key(endpoint), 0, -1)
+        return {
+            endpoint: [json.loads(sample) for sample in samples]
+            for endpoint, samples in zip(endpoints, pipeline.execute())
+        }
+
+    def clear(self) -> None:
+        endpoints = [member.decode() for member in self.client.smembers(PROFILE_ENDPOINTS_KEY)]
+        self.client.delete(PROFILE_ENDPOINTS_KEY, *(self._key(endpoint) for endpoint in endpoints))
+
+
+_store = None
+
+
+def get_profile_store():
+    global _store
+    if _store is None:
+        url = settings.REQUEST_PROFILING_STORE_URL
+        window = settings.REQUEST_PROFILING_WINDOW
+        _store = RedisProfileStore(url, window) if url else LocalProfileStore(window)
+    return _store
+
+
+def percentile(values: List[float], rank: int) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(math.ceil(rank / 100 * len(ordered)) - 1, 0)]
+
+
+def endpoint_report(samples: Dict[str, List[Dict]], sort: str = "total_ms") -> List[Dict]:
+    report = []
+    for endpoint, endpoint_samples in samples.items():
+        row = {"endpoint": endpoint, "count": len(endpoint_samples)}
+        for metric in PROFILE_METRICS:
+            values = [sample[metric] for sample in endpoint_samples if sample.get(metric) is not None]
+            row[metric] = {f"p{rank}": percentile(values, rank) for rank in PERCENTILES}
+        report.append(row)
+    return sorted(report, key=lambda row: row[sort]["p95"], reverse=True)
+
+
+class RequestProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.REQUEST_PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        queries = QueryRecorder()
+        request.profile_serialization_seconds = 0.0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(queries))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        self.record(request, response, queries, elapsed)
+        return response
+
+    def process_template_response(self, request, response):
+        if not hasattr(request, "profile_serialization_seconds"):
+            return response
+
+        render = response.render
+
+        def timed_render():
+            started = time.perf_counter()
+            try:
+                return render()
+            finally:
+                request.profile_serialization_seconds += time.perf_counter() - started
+
+        response.render = timed_render
+        return response
+
+    def record(self, request, response, queries, elapsed):
+        match = request.resolver_match
+        if match is None:
+            return
+
+        endpoint = f"{request.method} /{match.route}"
+        sample = {
+            "status": response.status_code,
+            "total_ms": round(elapsed * 1000, 2),
+            "db_ms": round(queries.seconds * 1000, 2),
+            "serialization_ms": round(request.profile_serialization_seconds * 1000, 2),
+            "queries": queries.count,
+            "response_bytes": None if response.streaming else len(response.content),
+        }
+        try:
+            get_profile_store().add(endpoint, sample)
+        except redis.RedisError:
+            logger.warning("Could not store the request profile of %s", endpoint, exc_info=True)
+
+        if sample["total_ms"] >= settings.REQUEST_PROFILING_SLOW_MS:
+            top_queries = "\n".join(
+                f"  {query['ms']:.2f} ms x{query['count']}: {query['sql']}"
+                for query in queries.top(settings.REQUEST_PROFILING_TOP_QUERIES)
+            )
+            logger.warning(
+                "Slow request %s %s: %.2f ms, %d queries in %.2f ms, serialization %.2f ms, %s bytes\n%s",
+                request.method,
+                request.get_full_path(),
+                sample["total_ms"],
+                sample["queries"],
+                sample["db_ms"],
+                sample["serialization_ms"],
+                sample["response_bytes"],
+                top_queries,
+            )
+
+
+class RequestProfileReport(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        sort = request.query_params.get("sort", "total_ms")
+        if sort not in PROFILE_METRICS:
+            return Response({"error": f"Invalid sort: {sort}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "enabled": settings.REQUEST_PROFILING_ENABLED,
+            "sample_rate": settings.REQUEST_PROFILING_SAMPLE_RATE,
+            "window": settings.REQUEST_PROFILING_WINDOW,
+            "endpoints": endpoint_report(get_profile_store().samples(), sort=sort),
+        })
+
+    def delete(self, request):
+        get_profile_store().clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
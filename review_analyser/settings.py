@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 from datetime import timedelta
+from celery.schedules import crontab
 from decouple import config
 
 # Build paths inside the project like this: BASE_DIR / "subdir".
@@ -53,11 +54,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "review_analyser.profiling.RequestProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "review_analyser.db_router.ReadYourWritesMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -101,6 +104,53 @@ DATABASES = {
     }
 }
 
+DB_REPLICA_HOST = config("DB_REPLICA_HOST", default="")
+if DB_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": config("DB_REPLICA_NAME", default=DATABASES["default"]["NAME"]),
+        "HOST": DB_REPLICA_HOST,
+        "PORT": config("DB_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+READ_REPLICA_DATABASE = "replica" if DB_REPLICA_HOST else None
+READ_YOUR_WRITES_SECONDS = config("READ_YOUR_WRITES_SECONDS", default=10, cast=int)
+READ_REPLICA_MAX_LAG_SECONDS = config("READ_REPLICA_MAX_LAG_SECONDS", default=10, cast=int)
+REPLICA_RESPONSE_CACHE_TIMEOUT = config("REPLICA_RESPONSE_CACHE_TIMEOUT", default=30, cast=int)
+DATABASE_ROUTERS = ["review_analyser.db_router.ReadReplicaRouter"]
+
+# "persistent" keeps one connection per thread for DB_CONN_MAX_AGE seconds. That is only safe
+# for sync or threaded web workers: every greenlet of a `-P gevent` Celery worker would hold its
+# own connection, so use "psycopg" or "pgbouncer" there.
+DB_POOL_MODE = config("DB_POOL_MODE", default="none")
+DB_CONN_MAX_AGE = config("DB_CONN_MAX_AGE", default=60, cast=int)
+
+for database in DATABASES.values():
+    if DB_POOL_MODE == "psycopg":
+        from psycopg_pool import ConnectionPool
+
+        database["OPTIONS"] = {
+            "pool": {
+                "min_size": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+                "max_size": config("DB_POOL_MAX_SIZE", default=20, cast=int),
+                "timeout": config("DB_POOL_TIMEOUT", default=10, cast=int),
+                "check": ConnectionPool.check_connection,
+            },
+        }
+    elif DB_POOL_MODE == "pgbouncer":
+        database.update({
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "DISABLE_SERVER_SIDE_CURSORS": True,
+            "OPTIONS": {"prepare_threshold": None},
+        })
+    elif DB_POOL_MODE == "persistent":
+        database.update({
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+        })
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -151,6 +201,10 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "reviews.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
 }
 
 # JWT Settings
@@ -181,6 +235,29 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Yekaterinburg'
 
 
+REDIS_CACHE_URL = config("REDIS_CACHE_URL", default="")
+
+if REDIS_CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# A process-local cache never sees version bumps made by Celery workers,
+# so API responses are only cached when the cache is shared.
+RESPONSE_CACHE_ENABLED = bool(REDIS_CACHE_URL)
+
+RESPONSE_CACHE_TIMEOUT = config("RESPONSE_CACHE_TIMEOUT", default=300, cast=int)
+
+
 GIS_KEY = config("GIS_KEY")
 GIS_AUTH_TOKEN = config("GIS_AUTH_TOKEN")
 
@@ -189,6 +266,8 @@ TELEGRAM_API_HASH = config("TELEGRAM_API_HASH")
 
 VK_USER_TOKEN = config("VK_USER_TOKEN")
 
+YANDEX_BROWSER_POOL_SIZE = config("YANDEX_BROWSER_POOL_SIZE", default=2, cast=int)
+
 OPENSEARCH_DSL = {
     'default': {
         'hosts': [
@@ -206,3 +285,56 @@ OPENSEARCH_DSL = {
         'verify_certs': False,
     }
 }
+OPENSEARCH_DSL_AUTOSYNC = False
+
+REVIEW_INDEX_QUEUE_URL = config("REVIEW_INDEX_QUEUE_URL", default="")
+REVIEW_INDEX_BATCH_SIZE = config("REVIEW_INDEX_BATCH_SIZE", default=500, cast=int)
+REVIEW_INDEX_FLUSH_INTERVAL = config("REVIEW_INDEX_FLUSH_INTERVAL", default=5, cast=int)
+
+REVIEW_EMBEDDING_BACKEND = config("REVIEW_EMBEDDING_BACKEND", default="sentence-transformers")
+REVIEW_EMBEDDING_MODEL = config("REVIEW_EMBEDDING_MODEL", default="all-MiniLM-L6-v2")
+REVIEW_EMBEDDING_DIMENSION = config("REVIEW_EMBEDDING_DIMENSION", default=384, cast=int)
+REVIEW_SEMANTIC_LEXICAL_WEIGHT = config("REVIEW_SEMANTIC_LEXICAL_WEIGHT", default=0.3, cast=float)
+QUERY_EMBEDDING_CACHE_TIMEOUT = config("QUERY_EMBEDDING_CACHE_TIMEOUT", default=86400, cast=int)
+
+REVIEW_PARTITION_INTERVAL = config("REVIEW_PARTITION_INTERVAL", default="month")
+REVIEW_PARTITIONS_AHEAD = config("REVIEW_PARTITIONS_AHEAD", default=3, cast=int)
+
+REQUEST_PROFILING_ENABLED = config("REQUEST_PROFILING_ENABLED", default=False, cast=bool)
+REQUEST_PROFILING_SAMPLE_RATE = config("REQUEST_PROFILING_SAMPLE_RATE", default=0.05, cast=float)
+REQUEST_PROFILING_SLOW_MS = config("REQUEST_PROFILING_SLOW_MS", default=1000, cast=int)
+REQUEST_PROFILING_TOP_QUERIES = config("REQUEST_PROFILING_TOP_QUERIES", default=5, cast=int)
+REQUEST_PROFILING_WINDOW = config("REQUEST_PROFILING_WINDOW", default=500, cast=int)
+REQUEST_PROFILING_STORE_URL = config("REQUEST_PROFILING_STORE_URL", default="")
+
+TRACING_ENABLED = config("TRACING_ENABLED", default=False, cast=bool)
+TRACING_EXPORTER = config("TRACING_EXPORTER", default="log")
+TRACING_COLLECTOR_URL = config("TRACING_COLLECTOR_URL", default="")
+TRACING_LOG_FILE = config("TRACING_LOG_FILE", default="")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"span": {"format": "%(message)s"}},
+    "handlers": {
+        "spans": (
+            {"class": "logging.handlers.WatchedFileHandler", "filename": TRACING_LOG_FILE, "formatter": "span"}
+            if TRACING_LOG_FILE
+            else {"class": "logging.StreamHandler", "formatter": "span"}
+        ),
+    },
+    "loggers": {
+        "review_analyser.tracing.spans": {"handlers": ["spans"], "level": "INFO", "propagate": False},
+    },
+}
+
+CELERY_BEAT_SCHEDULE = {
+    "flush-review-index": {
+        "task": "reviews.tasks.flush_review_index",
+        "schedule": REVIEW_INDEX_FLUSH_INTERVAL,
+    },
+    "maintain-review-partitions": {
+        "task": "reviews.tasks.maintain_review_partitions",
+        "schedule": crontab(hour=3, minute=0),
+    },
+}
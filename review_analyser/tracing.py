@@ -0,0 +1,265 @@
+import json
+import logging
+import re
+import secrets
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.conf import settings
+
+from .profiling import PERCENTILES, percentile
+
+logger = logging.getLogger(__name__)
+span_logger = logging.getLogger(f"{__name__}.spans")
+
+TRACEPARENT_HEADER = "traceparent"
+PUBLISHED_AT_HEADER = "published_at"
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+COLLECTOR_TIMEOUT = 2
+
+_current_span = ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, root=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.root = root or self
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.error = None
+        self.start = time.time()
+        self.end = None
+        self.finished = []
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def fail(self, error) -> None:
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error)
+
+    def finish(self) -> None:
+        self.end = time.time()
+        self.root.finished.append(self)
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "end": self.end,
+            "duration_ms": round((self.end - self.start) * 1000, 2),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class LogSpanExporter:
+    def export(self, spans: List[Dict]) -> None:
+        for span_data in spans:
+            span_logger.info(json.dumps(span_data, ensure_ascii=False, default=str))
+
+
+class CollectorSpanExporter:
+    def __init__(self, url: str):
+        self.url = url
+        self.session = requests.Session()
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Dict]) -> None:
+        payload = json.dumps({"spans": spans}, ensure_ascii=False, default=str)
+        try:
+            with self._lock:
+                self.session.post(
+                    self.url,
+                    data=payload.encode(),
+                    headers={"Content-Type": "application/json"},
+                    timeout=COLLECTOR_TIMEOUT,
+                ).raise_for_status()
+        except requests.RequestException:
+            logger.warning("Could not export %d spans to %s", len(spans), self.url, exc_info=True)
+
+
+_exporter = None
+
+
+def get_span_exporter():
+    global _exporter
+    if _exporter is None:
+        if settings.TRACING_EXPORTER == "collector":
+            _exporter = CollectorSpanExporter(settings.TRACING_COLLECTOR_URL)
+        else:
+            _exporter = LogSpanExporter()
+    return _exporter
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    match = TRACEPARENT_RE.match(value or "")
+    return match.groups() if match else None
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_traceparent() -> Optional[str]:
+    active = _current_span.get()
+    return active.traceparent if active else None
+
+
+def start_span(name: str, traceparent: Optional[str] = None, **attributes) -> Span:
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(name, parent.trace_id, parent.span_id, parent.root, attributes)
+
+    remote = parse_traceparent(traceparent)
+    if remote is not None:
+        return Span(name, remote[0], remote[1], attributes=attributes)
+    return Span(name, secrets.token_hex(16), attributes=attributes)
+
+
+def end_span(active: Span) -> None:
+    active.finish()
+    if active.root is active:
+        get_span_exporter().export([finished.to_dict() for finished in active.finished])
+
+
+@contextmanager
+def span(name: str, traceparent: Optional[str] = None, **attributes):
+    if not settings.TRACING_ENABLED:
+        yield Span(name, "", attributes=attributes)
+        return
+
+    active = start_span(name, traceparent, **attributes)
+    token = _current_span.set(active)
+    try:
+        yield active
+    except BaseException as e:
+        active.fail(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        end_span(active)
+
+
+@before_task_publish.connect
+def inject_trace_headers(headers=None, **kwargs):
+    traceparent = current_traceparent()
+    if headers is not None and traceparent:
+        headers[TRACEPARENT_HEADER] = traceparent
+        headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+_task_spans = {}
+
+
+@task_prerun.connect
+def start_task_span(task_id=None, task=None, args=None, **kwargs):
+    if not settings.TRACING_ENABLED:
+        return
+
+    request = task.request
+    active = start_span(f"task {task.name}", getattr(request, TRACEPARENT_HEADER, None), task_id=task_id)
+    published_at = getattr(request, PUBLISHED_AT_HEADER, None)
+    if published_at:
+        active.set_attribute("queue_ms", round((active.start - published_at) * 1000, 2))
+    if args and len(args) == 1 and isinstance(args[0], int):
+        active.set_attribute("review_id", args[0])
+    _task_spans[task_id] = (active, _current_span.set(active))
+
+
+@task_postrun.connect
+def end_task_span(task_id=None, state=None, **kwargs):
+    entry = _task_spans.pop(task_id, None)
+    if entry is None:
+        return
+
+    active, token = entry
+    if state and state != "SUCCESS":
+        active.fail(state)
+    _current_span.reset(token)
+    end_span(active)
+
+
+def read_spans(lines) -> List[Dict]:
+    spans = []
+    for line in lines:
+        try:
+            span_data = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(span_data, dict) and "trace_id" in span_data:
+            spans.append(span_data)
+    return spans
+
+
+def stage_report(spans: List[Dict]) -> List[Dict]:
+    durations, errors = defaultdict(list), defaultdict(int)
+    for span_data in spans:
+        durations[span_data["name"]].append(span_data["duration_ms"])
+        if span_data["status"] != "ok":
+            errors[span_data["name"]] += 1
+        queue_ms = span_data["attributes"].get("queue_ms")
+        if queue_ms is not None:
+            durations["queue"].append(queue_ms)
+
+    return sorted(
+        (
+            {
+                "stage": name,
+                "count": len(values),
+                "errors": errors[name],
+                **{f"p{rank}": percentile(values, rank) for rank in PERCENTILES},
+            }
+            for name, values in durations.items()
+        ),
+        key=lambda row: row["p95"],
+        reverse=True,
+    )
+
+
+def review_latencies(spans: List[Dict]) -> Dict[int, Dict]:
+    import_started = {
+        span_data["trace_id"]: span_data["start"]
+        for span_data in spans
+        if span_data["name"] == "import" and span_data["parent_id"] is None
+    }
+
+    reviews = {}
+    for span_data in spans:
+        review_id = span_data["attributes"].get("review_id")
+        started = import_started.get(span_data["trace_id"])
+        if review_id is None or started is None:
+            continue
+
+        review = reviews.setdefault(review_id, {"started": started, "processed": started, "failed": []})
+        review["processed"] = max(review["processed"], span_data["end"])
+        if span_data["status"] != "ok":
+            review["failed"].append(span_data["name"])
+
+    for span_data in spans:
+        if span_data["name"] != "index":
+            continue
+        for review_id in span_data["attributes"].get("review_ids", ()):
+            if review_id in reviews and span_data["status"] == "ok":
+                reviews[review_id]["processed"] = max(reviews[review_id]["processed"], span_data["end"])
+
+    for review in reviews.values():
+        review["latency_ms"] = round((review["processed"] - review["started"]) * 1000, 2)
+    return reviews
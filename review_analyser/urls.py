@@ -18,8 +18,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from .profiling import RequestProfileReport
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/profiling/requests/', RequestProfileReport.as_view(), name='request-profiling'),
     path('api/auth/', include('accounts.urls')),
     path('api/', include('reviews.urls')),
     path('api/', include('importer.urls')),
@@ -0,0 +1,76 @@
+import hashlib
+import math
+import re
+from functools import lru_cache
+from typing import List, Sequence
+
+from django.conf import settings
+
+WORD_RE = re.compile(r"\w+")
+ENCODE_BATCH_SIZE = 64
+
+
+@lru_cache(maxsize=None)
+def load_sentence_model(model_name: str):
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name)
+
+
+class SentenceEmbedder:
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        vectors = load_sentence_model(self.model_name).encode(
+            list(texts),
+            batch_size=ENCODE_BATCH_SIZE,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
+        return vectors.tolist()
+
+
+class HashingEmbedder:
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    def _features(self, text: str) -> List[str]:
+        features = []
+        for word in WORD_RE.findall((text or "").casefold().replace("ё", "е")):
+            features.append(word)
+            padded = f"#{word}#"
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dimension
+            for feature in self._features(text):
+                value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+                vector[value % self.dimension] += 1.0 if value >> 63 else -1.0
+
+            norm = math.sqrt(sum(component * component for component in vector))
+            if norm:
+                vectors.append([component / norm for component in vector])
+            else:
+                vectors.append([1.0] + [0.0] * (self.dimension - 1))
+        return vectors
+
+
+@lru_cache(maxsize=None)
+def _build_embedder(backend: str, model_name: str, dimension: int):
+    if backend == "hashing":
+        return HashingEmbedder(dimension)
+    return SentenceEmbedder(model_name)
+
+
+def get_review_embedder():
+    return _build_embedder(
+        settings.REVIEW_EMBEDDING_BACKEND,
+        settings.REVIEW_EMBEDDING_MODEL,
+        settings.REVIEW_EMBEDDING_DIMENSION,
+    )
@@ -4,16 +4,16 @@ from typing import List
 import numpy as np
 import pymorphy3
 from nltk.corpus import stopwords
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 
 from reviews.models import Event
+from .embeddings import load_sentence_model
 
 
 class EventComparator:
     def __init__(self):
         self.morph = pymorphy3.MorphAnalyzer()
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model = load_sentence_model('all-MiniLM-L6-v2')
         self.stop_words = set(stopwords.words('russian') + stopwords.words('english') + ['спектакль', 'концерт'])
 
     def preprocess_text(self, text: str) -> List[str]:
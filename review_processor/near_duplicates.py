@@ -0,0 +1,68 @@
+import hashlib
+import random
+import re
+import struct
+from typing import List, Optional
+
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+SIMILARITY_THRESHOLD = 0.7
+MIN_WORDS = 8
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+SIGNATURE_FORMAT = f"<{MINHASH_PERMUTATIONS}I"
+
+WORD_RE = re.compile(r"\w+")
+
+_random = random.Random(20240601)
+PERMUTATIONS = [
+    (_random.randrange(1, MERSENNE_PRIME), _random.randrange(0, MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def _features(text: str) -> set:
+    return set(WORD_RE.findall((text or "").casefold().replace("ё", "е")))
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def minhash(text: str) -> Optional[List[int]]:
+    features = _features(text)
+    if len(features) < MIN_WORDS:
+        return None
+
+    hashes = [_feature_hash(feature) for feature in features]
+    return [
+        min((a * value + b) % MERSENNE_PRIME for value in hashes) & MAX_HASH
+        for a, b in PERMUTATIONS
+    ]
+
+
+def pack_signature(signature: List[int]) -> bytes:
+    return struct.pack(SIGNATURE_FORMAT, *signature)
+
+
+def unpack_signature(data: bytes) -> List[int]:
+    return list(struct.unpack(SIGNATURE_FORMAT, bytes(data)))
+
+
+def lsh_buckets(signature: List[int]) -> List[int]:
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = hashlib.blake2b(struct.pack(f"<{LSH_ROWS}I", *rows), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "big", signed=True))
+    return buckets
+
+
+def similarity(first: List[int], second: List[int]) -> float:
+    return sum(a == b for a, b in zip(first, second)) / MINHASH_PERMUTATIONS
+
+
+def is_near_duplicate(first: List[int], second: List[int]) -> bool:
+    return similarity(first, second) >= SIMILARITY_THRESHOLD
@@ -0,0 +1,115 @@
+import datetime
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import Review, ReviewDailyStats
+
+STATS_BUCKETS = {
+    "day": F,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+STATS_GROUP_COLUMNS = {
+    "institution": "institution_id",
+    "event": "event_id",
+    "source": "source",
+}
+
+SENTIMENT_COUNTS = {
+    "positive_count": Count("id", filter=Q(sentiment="positive")),
+    "negative_count": Count("id", filter=Q(sentiment="negative")),
+    "neutral_count": Count("id", filter=Q(sentiment="neutral")),
+    "confidence_sum": Sum("confidence"),
+    "confidence_count": Count("confidence"),
+}
+
+
+def review_stats_keys(reviews) -> set:
+    return {
+        (institution_id, event_id, source, timezone.localdate(reviewed_at))
+        for institution_id, event_id, source, reviewed_at in reviews.values_list(
+            "institution_id", "event_id", "source", "reviewed_at"
+        )
+    }
+
+
+def refresh_daily_stats(keys) -> None:
+    for institution_id, event_id, source, date in keys:
+        day_start = timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+        counts = Review.objects.filter(
+            institution_id=institution_id,
+            event_id=event_id,
+            source=source,
+            sentiment__isnull=False,
+            canonical__isnull=True,
+            reviewed_at__gte=day_start,
+            reviewed_at__lt=day_start + datetime.timedelta(days=1),
+        ).aggregate(**SENTIMENT_COUNTS)
+        counts["confidence_sum"] = counts["confidence_sum"] or 0.0
+
+        lookup = {"institution_id": institution_id, "event_id": event_id, "source": source, "date": date}
+        if counts["positive_count"] or counts["negative_count"] or counts["neutral_count"]:
+            ReviewDailyStats.objects.update_or_create(**lookup, defaults=counts)
+        else:
+            ReviewDailyStats.objects.filter(**lookup).delete()
+
+
+@contextmanager
+def track_daily_stats(review):
+    reviews = Review.objects.filter(Q(pk=review.pk) | Q(canonical_id=review.pk))
+    keys = review_stats_keys(reviews)
+    yield
+    refresh_daily_stats(keys | review_stats_keys(reviews))
+
+
+def daily_stats_rows(reviews):
+    return (
+        reviews.filter(sentiment__isnull=False, canonical__isnull=True)
+        .annotate(date=TruncDate("reviewed_at"))
+        .order_by()
+        .values("institution_id", "event_id", "source", "date")
+        .annotate(**SENTIMENT_COUNTS)
+    )
+
+
+def rebuild_daily_stats() -> int:
+    with transaction.atomic():
+        ReviewDailyStats.objects.all().delete()
+        created = ReviewDailyStats.objects.bulk_create(
+            [
+                ReviewDailyStats(**{**row, "confidence_sum": row["confidence_sum"] or 0.0})
+                for row in daily_stats_rows(Review.objects.all())
+            ],
+            batch_size=1000,
+        )
+    return len(created)
+
+
+def sentiment_timeline(stats, bucket="day", group_by=None) -> list:
+    columns = ["period"] + ([STATS_GROUP_COLUMNS[group_by]] if group_by else [])
+
+    rows = (
+        stats.annotate(period=STATS_BUCKETS[bucket]("date"))
+        .order_by()
+        .values(*columns)
+        .annotate(
+            positive=Sum("positive_count"),
+            negative=Sum("negative_count"),
+            neutral=Sum("neutral_count"),
+            confidence_sum=Sum("confidence_sum"),
+            confidence_count=Sum("confidence_count"),
+        )
+        .order_by(*columns)
+    )
+
+    results = []
+    for row in rows:
+        confidence_sum, confidence_count = row.pop("confidence_sum"), row.pop("confidence_count")
+        row["total"] = row["positive"] + row["negative"] + row["neutral"]
+        row["mean_confidence"] = confidence_sum / confidence_count if confidence_count else None
+        results.append(row)
+    return results
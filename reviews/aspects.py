@@ -0,0 +1,63 @@
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Aspect, ReviewAspect
+
+ASPECT_NAME_LENGTH = Aspect._meta.get_field("name").max_length
+DEFAULT_TOP_ASPECTS = 10
+MAX_TOP_ASPECTS = 100
+
+
+def normalize_aspect_name(name) -> str:
+    return " ".join(str(name or "").split())[:ASPECT_NAME_LENGTH]
+
+
+def get_aspect_ids(names) -> dict:
+    names = {name for name in names if name}
+    if not names:
+        return {}
+
+    Aspect.objects.bulk_create([Aspect(name=name) for name in names], ignore_conflicts=True)
+    return dict(Aspect.objects.filter(name__in=names).values_list("name", "id"))
+
+
+def review_aspect_pairs(review) -> set:
+    return {
+        (normalize_aspect_name(name), polarity)
+        for polarity, names in (("positive", review.positive_aspects), ("negative", review.negative_aspects))
+        for name in names or []
+        if normalize_aspect_name(name)
+    }
+
+
+def sync_review_aspects(reviews) -> int:
+    pairs = {review.pk: review_aspect_pairs(review) for review in reviews}
+    if not pairs:
+        return 0
+
+    with transaction.atomic():
+        aspect_ids = get_aspect_ids(name for review_pairs in pairs.values() for name, _ in review_pairs)
+        ReviewAspect.objects.filter(review_id__in=pairs.keys()).delete()
+        created = ReviewAspect.objects.bulk_create([
+            ReviewAspect(review_id=review_id, aspect_id=aspect_ids[name], polarity=polarity)
+            for review_id, review_pairs in pairs.items()
+            for name, polarity in review_pairs
+        ])
+    return len(created)
+
+
+def top_aspects(review_aspects, polarity=None, limit=DEFAULT_TOP_ASPECTS) -> list:
+    review_aspects = review_aspects.filter(review__canonical__isnull=True)
+    if polarity:
+        review_aspects = review_aspects.filter(polarity=polarity)
+
+    rows = (
+        review_aspects.order_by()
+        .values("aspect__name", "polarity")
+        .annotate(count=Count("id"))
+        .order_by("-count", "aspect__name", "polarity")[:limit]
+    )
+    return [
+        {"aspect": row["aspect__name"], "polarity": row["polarity"], "count": row["count"]}
+        for row in rows
+    ]
@@ -0,0 +1,124 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+INSTITUTIONS_SCOPE = "institutions"
+EVENTS_SCOPE = "events"
+REVIEWS_SCOPE = "reviews"
+
+VERSION_KEY_PREFIX = "response-version"
+RECENT_BUMP_KEY_PREFIX = "response-version-bumped"
+RESPONSE_KEY_PREFIX = "response"
+
+
+def _version_key(scope: str) -> str:
+    return f"{VERSION_KEY_PREFIX}:{scope}"
+
+
+def _initial_version() -> int:
+    return time.time_ns() // 1000
+
+
+def get_versions(scopes) -> list:
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(*scopes) -> None:
+    transaction.on_commit(lambda: _bump_versions(scopes))
+
+
+def _recent_bump_key(scope: str) -> str:
+    return f"{RECENT_BUMP_KEY_PREFIX}:{scope}"
+
+
+def _bump_versions(scopes) -> None:
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_version(), timeout=None)
+    if settings.READ_REPLICA_DATABASE:
+        cache.set_many(
+            {_recent_bump_key(scope): True for scope in scopes}, settings.READ_REPLICA_MAX_LAG_SECONDS
+        )
+
+
+def bumped_recently(scopes) -> bool:
+    return bool(cache.get_many([_recent_bump_key(scope) for scope in scopes]))
+
+
+def response_cache_key(request, scopes) -> str:
+    versions = ".".join(str(version) for version in get_versions(scopes))
+    user = request.user.pk if request.user and request.user.is_authenticated else "anon"
+    params = "&".join(
+        f"{name}={value}"
+        for name in sorted(request.query_params)
+        for value in request.query_params.getlist(name)
+    )
+    digest = hashlib.sha1(f"{request.path}?{params}|{user}|{versions}".encode("utf-8")).hexdigest()
+    return f"{RESPONSE_KEY_PREFIX}:{digest}"
+
+
+def check_response_cache(app_configs, **kwargs):
+    if settings.RESPONSE_CACHE_ENABLED:
+        return []
+    return [
+        checks.Warning(
+            "API responses are not cached: REDIS_CACHE_URL is not set.",
+            hint="Set REDIS_CACHE_URL so that web and Celery workers share the cache.",
+            id="reviews.W001",
+        )
+    ]
+
+
+def _etag_matches(request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match", "")
+    return header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))
+
+
+def cache_response(*scopes):
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if not settings.RESPONSE_CACHE_ENABLED:
+                return view_method(self, request, *args, **kwargs)
+
+            key = response_cache_key(request, scopes)
+            etag = f'"{key.rsplit(":", 1)[-1]}"'
+            if _etag_matches(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+            data = cache.get(key)
+            if data is None:
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                if getattr(request, "read_database", None):
+                    # A lagging replica may not have the write behind the latest bump yet,
+                    # so its pages are not cached right after one and expire sooner otherwise.
+                    if bumped_recently(scopes):
+                        return response
+                    cache.set(key, response.data, settings.REPLICA_RESPONSE_CACHE_TIMEOUT)
+                else:
+                    cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+            else:
+                response = Response(data)
+
+            response["ETag"] = etag
+            return response
+        return wrapper
+    return decorator
@@ -1,20 +1,78 @@
-from django_opensearch_dsl import Document
+from django.conf import settings
+from django_opensearch_dsl import Document, fields
 from django_opensearch_dsl.registries import registry
 
-from .models import Review
+from review_processor.embeddings import get_review_embedder
+from .models import Event, Institution, Review
+
+KNN_METHOD = {"name": "hnsw", "space_type": "cosinesimil", "engine": "lucene"}
+
+
+class KnnVectorField(fields.DODField):
+    name = "knn_vector"
 
 
 @registry.register_document
 class ReviewDocument(Document):
+    institution = fields.IntegerField(attr="institution_id")
+    institution_name = fields.KeywordField(attr="institution.name")
+    event = fields.IntegerField(attr="event_id")
+    event_name = fields.KeywordField(attr="event.name")
+    canonical = fields.IntegerField(attr="canonical_id")
+    sentiment = fields.KeywordField()
+    source = fields.KeywordField()
+    source_external_id = fields.KeywordField()
+    positive_aspects = fields.KeywordField()
+    negative_aspects = fields.KeywordField()
+    aspects = fields.NestedField(properties={
+        'name': fields.KeywordField(),
+        'polarity': fields.KeywordField(),
+    })
+    text_embedding = KnnVectorField(dimension=settings.REVIEW_EMBEDDING_DIMENSION, method=KNN_METHOD)
+
     class Index:
         name = 'reviews'
         settings = {
             'number_of_shards': 1,
-            'number_of_replicas': 0
+            'number_of_replicas': 0,
+            'knn': True,
         }
         auto_refresh = False
 
     class Django:
         model = Review
-        fields = ['text']
+        fields = ['id', 'text', 'confidence', 'reviewed_at', 'created_at']
+        related_models = [Institution, Event]
         queryset_pagination = 5000
+
+    def get_queryset(self, *args, **kwargs):
+        return super().get_queryset(*args, **kwargs).with_related()
+
+    def get_instances_from_related(self, related_instance):
+        return related_instance.reviews.with_related()
+
+    def prepare_positive_aspects(self, instance):
+        return list(instance.positive_aspects or [])
+
+    def prepare_negative_aspects(self, instance):
+        return list(instance.negative_aspects or [])
+
+    def prepare_aspects(self, instance):
+        return [
+            {'name': name, 'polarity': polarity}
+            for polarity, names in (('positive', instance.positive_aspects), ('negative', instance.negative_aspects))
+            for name in dict.fromkeys(names or [])
+        ]
+
+    def prepare_text_embedding(self, instance):
+        embedding = getattr(instance, 'text_embedding', None)
+        if embedding is None:
+            [embedding] = get_review_embedder().embed([instance.text])
+        return embedding
+
+    @staticmethod
+    def attach_text_embeddings(reviews):
+        embeddings = get_review_embedder().embed([review.text for review in reviews])
+        for review, embedding in zip(reviews, embeddings):
+            review.text_embedding = embedding
+        return reviews
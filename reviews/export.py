@@ -0,0 +1,94 @@
+import csv
+import tempfile
+
+import xlsxwriter
+from django.utils import timezone
+
+from .serializers import review_rows
+
+EXPORT_FORMATS = ("csv", "xlsx")
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_COLUMNS = [
+    ("id", "ID"),
+    ("institution_name", "Учреждение"),
+    ("event_name", "Мероприятие"),
+    ("source", "Источник"),
+    ("reviewed_at", "Дата отзыва"),
+    ("sentiment", "Тональность"),
+    ("confidence", "Уверенность"),
+    ("positive_aspects", "Позитивные аспекты"),
+    ("negative_aspects", "Негативные аспекты"),
+    ("text", "Текст отзыва"),
+]
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def export_filename(export_format: str) -> str:
+    return f"reviews_{timezone.localtime():%Y%m%d_%H%M%S}.{export_format}"
+
+
+def format_export_value(column, value):
+    if column.endswith("_aspects"):
+        return "; ".join(value or [])
+    if column == "reviewed_at":
+        return timezone.localtime(value).strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def iter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    rows = review_rows(queryset.order_by("-reviewed_at", "-id")).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield [format_export_value(column, row[column]) for column, _ in EXPORT_COLUMNS]
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def escape_csv_value(value):
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    yield "\ufeff" + writer.writerow([title for _, title in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow([escape_csv_value(value) for value in row])
+
+
+def write_csv(rows, fileobj) -> int:
+    written = -1
+    for written, line in enumerate(stream_csv(rows)):
+        fileobj.write(line)
+    return written
+
+
+def write_xlsx(rows, fileobj) -> int:
+    workbook = xlsxwriter.Workbook(fileobj, {
+        "constant_memory": True,
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+    })
+    worksheet = workbook.add_worksheet("Отзывы")
+    header_format = workbook.add_format({"bold": True})
+
+    worksheet.write_row(0, 0, [title for _, title in EXPORT_COLUMNS], header_format)
+    written = 0
+    for written, row in enumerate(rows, start=1):
+        worksheet.write_row(written, 0, row)
+    workbook.close()
+    return written
+
+
+def export_xlsx_file(rows):
+    output = tempfile.TemporaryFile()
+    write_xlsx(rows, output)
+    output.seek(0)
+    return output
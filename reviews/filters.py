@@ -0,0 +1,99 @@
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from opensearchpy import Q
+
+REVIEW_FILTER_PARAMS = ("institution", "event", "source", "sentiment", "date_from", "date_to")
+
+
+def _parse_id(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name}: {value}")
+
+
+def _parse_moment(value, name, end_of_day=False):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f"Invalid {name}: {value}")
+        parsed = datetime.datetime.combine(date, datetime.time.max if end_of_day else datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def filter_reviews(queryset, params, prefix=""):
+    if params.get("institution"):
+        queryset = queryset.filter(**{
+            f"{prefix}institution_id": _parse_id(params["institution"], "institution"),
+        })
+    if params.get("event"):
+        queryset = queryset.filter(**{f"{prefix}event_id": _parse_id(params["event"], "event")})
+    if params.get("source"):
+        queryset = queryset.filter(**{f"{prefix}source": params["source"]})
+    if params.get("sentiment"):
+        queryset = queryset.filter(**{f"{prefix}sentiment": params["sentiment"]})
+    if params.get("date_from"):
+        queryset = queryset.filter(**{
+            f"{prefix}reviewed_at__gte": _parse_moment(params["date_from"], "date_from"),
+        })
+    if params.get("date_to"):
+        queryset = queryset.filter(**{
+            f"{prefix}reviewed_at__lte": _parse_moment(params["date_to"], "date_to", end_of_day=True),
+        })
+    return queryset
+
+
+def _parse_day(value, name):
+    parsed = parse_date(value)
+    if parsed is None:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(f"Invalid {name}: {value}")
+        parsed = timezone.localdate(parsed) if timezone.is_aware(parsed) else parsed.date()
+    return parsed
+
+
+def filter_daily_stats(queryset, params):
+    if params.get("institution"):
+        queryset = queryset.filter(institution_id=_parse_id(params["institution"], "institution"))
+    if params.get("event"):
+        queryset = queryset.filter(event_id=_parse_id(params["event"], "event"))
+    if params.get("source"):
+        queryset = queryset.filter(source=params["source"])
+    if params.get("date_from"):
+        queryset = queryset.filter(date__gte=_parse_day(params["date_from"], "date_from"))
+    if params.get("date_to"):
+        queryset = queryset.filter(date__lte=_parse_day(params["date_to"], "date_to"))
+    return queryset
+
+
+def review_search_filters(params):
+    filters = []
+    if params.get("institution"):
+        filters.append(Q("term", institution=_parse_id(params["institution"], "institution")))
+    if params.get("event"):
+        filters.append(Q("term", event=_parse_id(params["event"], "event")))
+    if params.get("source"):
+        filters.append(Q("term", source=params["source"]))
+    if params.get("sentiment"):
+        filters.append(Q("term", sentiment=params["sentiment"]))
+
+    reviewed_at = {}
+    if params.get("date_from"):
+        reviewed_at["gte"] = _parse_moment(params["date_from"], "date_from").isoformat()
+    if params.get("date_to"):
+        reviewed_at["lte"] = _parse_moment(params["date_to"], "date_to", end_of_day=True).isoformat()
+    if reviewed_at:
+        filters.append(Q("range", reviewed_at=reviewed_at))
+    return filters
+
+
+def filter_review_search(search, params):
+    for clause in review_search_filters(params):
+        search = search.filter(clause)
+    return search
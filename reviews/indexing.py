@@ -0,0 +1,319 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from review_analyser.tracing import span
+from .cache import REVIEWS_SCOPE, bump_version
+from .documents import ReviewDocument
+from .models import Review
+from .search import put_hybrid_search_pipeline
+
+INDEX_QUEUE_KEY = "review-index:dirty"
+FLUSH_SCHEDULED_KEY = "review-index:flush-scheduled"
+REINDEX_TARGET_KEY = "review-index:reindex-target"
+ENQUEUE_CHUNK_SIZE = 5000
+
+REINDEX_WORKERS = 4
+REINDEX_BATCH_SIZE = 2000
+REINDEX_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": 0}
+
+
+class ReviewIndexingError(Exception):
+    def __init__(self, failed_ids):
+        self.failed_ids = failed_ids
+        super().__init__(f"Failed to index {len(failed_ids)} reviews")
+
+
+class LocalIndexQueue:
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def add(self, review_ids: Iterable[int], marked_at: float) -> None:
+        with self._lock:
+            for review_id in review_ids:
+                self._pending.setdefault(int(review_id), marked_at)
+
+    def requeue(self, entries: List[Tuple[int, float]]) -> None:
+        with self._lock:
+            for review_id, marked_at in entries:
+                current = self._pending.get(review_id)
+                self._pending[review_id] = marked_at if current is None else min(current, marked_at)
+
+    def pop(self, count: int) -> List[Tuple[int, float]]:
+        with self._lock:
+            entries = sorted(self._pending.items(), key=lambda entry: (entry[1], entry[0]))[:count]
+            for review_id, _ in entries:
+                del self._pending[review_id]
+        return entries
+
+    def size(self) -> int:
+        return len(self._pending)
+
+    def oldest(self) -> Optional[float]:
+        return min(self._pending.values(), default=None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending.clear()
+
+
+class RedisIndexQueue:
+    def __init__(self, url: str, key: str = INDEX_QUEUE_KEY):
+        self.client = redis.Redis.from_url(url)
+        self.key = key
+
+    def add(self, review_ids: Iterable[int], marked_at: float) -> None:
+        mapping = {str(review_id): marked_at for review_id in review_ids}
+        if mapping:
+            self.client.zadd(self.key, mapping, nx=True)
+
+    def requeue(self, entries: List[Tuple[int, float]]) -> None:
+        if entries:
+            self.client.zadd(self.key, {str(review_id): marked_at for review_id, marked_at in entries}, lt=True)
+
+    def pop(self, count: int) -> List[Tuple[int, float]]:
+        return [(int(member), score) for member, score in self.client.zpopmin(self.key, count)]
+
+    def size(self) -> int:
+        return self.client.zcard(self.key)
+
+    def oldest(self) -> Optional[float]:
+        entries = self.client.zrange(self.key, 0, 0, withscores=True)
+        return entries[0][1] if entries else None
+
+    def clear(self) -> None:
+        self.client.delete(self.key)
+
+
+_queues = {}
+
+
+def get_index_queue(key: str = INDEX_QUEUE_KEY):
+    if key not in _queues:
+        url = settings.REVIEW_INDEX_QUEUE_URL
+        _queues[key] = RedisIndexQueue(url, key) if url else LocalIndexQueue()
+    return _queues[key]
+
+
+def catch_up_queue_key(index: str) -> str:
+    return f"review-index:catch-up:{index}"
+
+
+def mark_reviews_dirty(review_ids: Iterable[int]) -> None:
+    review_ids = list(review_ids)
+    if review_ids:
+        transaction.on_commit(lambda: _enqueue_reviews(review_ids))
+
+
+def _enqueue_reviews(review_ids: List[int]) -> None:
+    queue = get_index_queue()
+    marked_at = time.time()
+    review_ids = iter(review_ids)
+    while chunk := list(islice(review_ids, ENQUEUE_CHUNK_SIZE)):
+        queue.add(chunk, marked_at)
+
+    if queue.size() >= settings.REVIEW_INDEX_BATCH_SIZE and cache.add(
+        FLUSH_SCHEDULED_KEY, True, settings.REVIEW_INDEX_FLUSH_INTERVAL
+    ):
+        from .tasks import flush_review_index
+
+        flush_review_index.delay()
+
+
+def index_queue_stats() -> Dict:
+    queue = get_index_queue()
+    oldest = queue.oldest()
+    return {
+        "pending": queue.size(),
+        "lag_seconds": round(max(time.time() - oldest, 0.0), 3) if oldest is not None else 0.0,
+    }
+
+
+def _failed_review_ids(errors) -> List[int]:
+    failed = []
+    for error in errors:
+        op_type, result = next(iter(error.items()))
+        if op_type == "delete" and result.get("status") == 404:
+            continue
+        failed.append(int(result["_id"]))
+    return failed
+
+
+def _index_actions(document, reviews, index: str) -> List[Dict]:
+    return [
+        {"_op_type": "index", "_index": index, "_id": review.pk, "_source": document.prepare(review)}
+        for review in document.attach_text_embeddings(list(reviews))
+    ]
+
+
+def index_reviews(review_ids: List[int], index: Optional[str] = None) -> List[int]:
+    index = index or ReviewDocument.Index.name
+    document = ReviewDocument()
+    reviews = document.get_queryset().filter(id__in=review_ids)
+    actions = _index_actions(document, reviews, index)
+    indexed = {action["_id"] for action in actions}
+    actions.extend(
+        {"_op_type": "delete", "_index": index, "_id": review_id}
+        for review_id in review_ids
+        if review_id not in indexed
+    )
+
+    _, errors = document.bulk(actions, raise_on_error=False, chunk_size=len(actions))
+    return _failed_review_ids(errors)
+
+
+def flush_index_queue(
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+    queue=None,
+    index: Optional[str] = None,
+) -> Dict:
+    if queue is None:
+        queue = get_index_queue()
+        reindex_target = cache.get(REINDEX_TARGET_KEY)
+        cache.delete(FLUSH_SCHEDULED_KEY)
+    else:
+        reindex_target = None
+    batch_size = batch_size or settings.REVIEW_INDEX_BATCH_SIZE
+
+    flushed, batches, lag = 0, 0, 0.0
+    while max_batches is None or batches < max_batches:
+        entries = queue.pop(batch_size)
+        if not entries:
+            break
+        batches += 1
+        review_ids = [review_id for review_id, _ in entries]
+        if reindex_target:
+            get_index_queue(catch_up_queue_key(reindex_target)).add(review_ids, time.time())
+
+        with span("index", reviews=len(review_ids), review_ids=review_ids):
+            try:
+                failed_ids = set(index_reviews(review_ids, index))
+            except Exception:
+                queue.requeue(entries)
+                raise
+
+            if failed_ids:
+                queue.requeue([entry for entry in entries if entry[0] in failed_ids])
+                if flushed or len(failed_ids) < len(entries):
+                    bump_version(REVIEWS_SCOPE)
+                raise ReviewIndexingError(sorted(failed_ids))
+
+        flushed += len(entries)
+        lag = max(lag, time.time() - min(marked_at for _, marked_at in entries))
+
+    if flushed:
+        bump_version(REVIEWS_SCOPE)
+    return {"indexed": flushed, "batches": batches, "lag_seconds": round(lag, 3)}
+
+
+def new_index_name() -> str:
+    return f"{ReviewDocument.Index.name}-{timezone.now():%Y%m%d%H%M%S}"
+
+
+def review_id_slices(workers: int) -> List[Tuple[int, int]]:
+    bounds = Review.objects.aggregate(first=Min("id"), last=Max("id"))
+    if bounds["first"] is None:
+        return []
+
+    step = (bounds["last"] - bounds["first"]) // workers + 1
+    return [
+        (first_id, min(first_id + step - 1, bounds["last"]))
+        for first_id in range(bounds["first"], bounds["last"] + 1, step)
+    ]
+
+
+def index_review_slice(index: str, first_id: int, last_id: int, batch_size: int = REINDEX_BATCH_SIZE) -> int:
+    document = ReviewDocument()
+    queryset = document.get_queryset().filter(id__gte=first_id, id__lte=last_id).order_by("id")
+    indexed, last_seen = 0, first_id - 1
+    while batch := list(queryset.filter(id__gt=last_seen)[:batch_size]):
+        document.bulk(_index_actions(document, batch, index), chunk_size=len(batch))
+        indexed += len(batch)
+        last_seen = batch[-1].id
+    return indexed
+
+
+def _index_review_slice_in_thread(index: str, first_id: int, last_id: int, batch_size: int) -> int:
+    try:
+        return index_review_slice(index, first_id, last_id, batch_size)
+    finally:
+        connection.close()
+
+
+def switch_review_alias(client, index: str) -> List[str]:
+    alias = ReviewDocument.Index.name
+    actions = [{"add": {"index": index, "alias": alias}}]
+    replaced = []
+    if client.indices.exists_alias(name=alias):
+        replaced = list(client.indices.get_alias(name=alias))
+        actions = [{"remove": {"index": name, "alias": alias}} for name in replaced] + actions
+    elif client.indices.exists(index=alias):
+        actions.append({"remove_index": {"index": alias}})
+
+    client.indices.update_aliases(body={"actions": actions})
+    return replaced
+
+
+def reindex_reviews(
+    workers: int = REINDEX_WORKERS,
+    batch_size: int = REINDEX_BATCH_SIZE,
+    keep_old: bool = False,
+) -> Dict:
+    client = ReviewDocument._get_connection()
+    put_hybrid_search_pipeline(client)
+    index = new_index_name()
+    body = ReviewDocument._index.to_dict()
+    body["settings"] = {**body.get("settings", {}), **REINDEX_SETTINGS}
+    client.indices.create(index=index, body=body)
+
+    catch_up = get_index_queue(catch_up_queue_key(index))
+    cache.set(REINDEX_TARGET_KEY, index, None)
+    try:
+        started = time.perf_counter()
+        slices = review_id_slices(workers)
+        if workers > 1 and len(slices) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                indexed = sum(executor.map(
+                    lambda bounds: _index_review_slice_in_thread(index, *bounds, batch_size), slices
+                ))
+        else:
+            indexed = sum(index_review_slice(index, *bounds, batch_size) for bounds in slices)
+        elapsed = time.perf_counter() - started
+
+        client.indices.put_settings(index=index, body={
+            "refresh_interval": None,
+            "number_of_replicas": ReviewDocument.Index.settings["number_of_replicas"],
+        })
+        client.indices.refresh(index=index)
+        flush_index_queue(queue=catch_up, index=index)
+        replaced = switch_review_alias(client, index)
+    except Exception:
+        cache.delete(REINDEX_TARGET_KEY)
+        catch_up.clear()
+        client.indices.delete(index=index, ignore_unavailable=True)
+        raise
+
+    cache.delete(REINDEX_TARGET_KEY)
+    flush_index_queue(queue=catch_up)
+    if replaced and not keep_old:
+        client.indices.delete(index=",".join(replaced), ignore_unavailable=True)
+    bump_version(REVIEWS_SCOPE)
+
+    return {
+        "index": index,
+        "indexed": indexed,
+        "seconds": round(elapsed, 3),
+        "docs_per_second": round(indexed / elapsed) if elapsed else indexed,
+        "replaced": replaced,
+    }
@@ -0,0 +1,95 @@
+import datetime
+import gzip
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.dateparse import parse_date
+
+from reviews.analytics import refresh_daily_stats, review_stats_keys
+from reviews.cache import REVIEWS_SCOPE, bump_version
+from reviews.documents import ReviewDocument
+from reviews.indexing import mark_reviews_dirty
+from reviews.models import Review, ReviewAspect, ReviewSignatureBand
+from reviews.partitions import REVIEW_TABLE, detach_review_partition, is_partitioned, review_partitions
+
+
+def copy_table_to(cursor, table, fileobj):
+    copy_sql = f"COPY (SELECT * FROM {table} ORDER BY id) TO STDOUT WITH (FORMAT csv, HEADER)"
+    raw_cursor = cursor.cursor
+    if hasattr(raw_cursor, "copy_expert"):
+        raw_cursor.copy_expert(copy_sql, fileobj)
+    else:
+        with raw_cursor.copy(copy_sql) as copy:
+            for data in copy:
+                fileobj.write(data)
+
+
+class Command(BaseCommand):
+    help = "Export closed review partitions to gzipped CSV files, then detach and drop them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--before", required=True, help="Archive partitions that end on or before this date")
+        parser.add_argument("--output-dir", required=True)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            raise CommandError("The reviews table is not partitioned")
+
+        before = parse_date(options["before"])
+        if before is None:
+            raise CommandError("--before must be a date in YYYY-MM-DD format")
+        before = datetime.datetime.combine(before, datetime.time(), tzinfo=datetime.timezone.utc)
+
+        partitions = [
+            partition for partition in review_partitions()
+            if partition["end"] is not None and partition["end"] <= before
+        ]
+        if not partitions:
+            self.stdout.write("No partitions to archive")
+            return
+
+        os.makedirs(options["output_dir"], exist_ok=True)
+        for partition in partitions:
+            if options["dry_run"]:
+                self.stdout.write(f"Would archive {partition['name']} (~{partition['rows']} reviews)")
+                continue
+
+            archived = self.archive(partition, options["output_dir"])
+            self.stdout.write(f"Archived {archived} reviews from {partition['name']}")
+
+    def archive(self, partition, output_dir):
+        quote = connection.ops.quote_name
+        name = quote(partition["name"])
+        path = os.path.join(output_dir, f"{partition['name']}.csv.gz")
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {name} IN SHARE MODE")
+            with gzip.open(path, "wb") as fileobj:
+                copy_table_to(cursor, name, fileobj)
+
+            cursor.execute(f"SELECT COUNT(*) FROM {name}")
+            archived = cursor.fetchone()[0]
+            for model in (ReviewAspect, ReviewSignatureBand):
+                cursor.execute(
+                    f"DELETE FROM {quote(model._meta.db_table)} WHERE review_id IN (SELECT id FROM {name})"
+                )
+            cursor.execute(
+                f"UPDATE {quote(REVIEW_TABLE)} SET canonical_id = NULL "
+                f"WHERE canonical_id IN (SELECT id FROM {name}) "
+                "AND (reviewed_at < %s OR reviewed_at >= %s) RETURNING id",
+                [partition["start"], partition["end"]],
+            )
+            promoted_ids = [row[0] for row in cursor.fetchall()]
+            mark_reviews_dirty(promoted_ids)
+            refresh_daily_stats(review_stats_keys(Review.objects.filter(pk__in=promoted_ids)))
+
+            detach_review_partition(partition["name"])
+            cursor.execute(f"DROP TABLE {name}")
+            bump_version(REVIEWS_SCOPE)
+
+        ReviewDocument.search().filter(
+            "range", reviewed_at={"gte": partition["start"].isoformat(), "lt": partition["end"].isoformat()}
+        ).params(conflicts="proceed").delete()
+        return archived
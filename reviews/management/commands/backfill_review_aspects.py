@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from reviews.aspects import sync_review_aspects
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    help = "Fill the Aspect and ReviewAspect tables from the JSON aspect lists of existing reviews"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        processed_count = 0
+        linked_count = 0
+        last_id = 0
+
+        while True:
+            batch = list(
+                Review.objects.filter(id__gt=last_id)
+                .only("id", "positive_aspects", "negative_aspects")
+                .order_by("id")[:options["batch_size"]]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            linked_count += sync_review_aspects(batch)
+            processed_count += len(batch)
+
+        self.stdout.write(f"Processed {processed_count} reviews, stored {linked_count} review aspects")
@@ -0,0 +1,232 @@
+import datetime
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from reviews.analytics import SENTIMENT_COUNTS
+from reviews.filters import filter_reviews
+from reviews.models import Event, Institution, Review
+from reviews.pagination import encode_cursor, page_queryset
+from reviews.partitions import ensure_review_partitions, is_partitioned, partition_parents
+from reviews.serializers import review_rows
+
+SOURCES = ["yandex", "2gis", "vk", "telegram", "otzovik"]
+SENTIMENTS = ["positive", "negative", "neutral"]
+SEED_BATCH_SIZE = 10000
+PENDING_RATIO = 0.02
+DUPLICATE_EVERY = 25
+BATCH_SIZE = 200
+PRIMARY_KEY_INDEX = f"{Review._meta.db_table}_pkey"
+SMALL_SCAN_ROWS = 1000
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def check_plan(explain_output, expected_indexes, allow_sort=True, parents=None, max_partitions=None):
+    plan = json.loads(explain_output) if isinstance(explain_output, str) else explain_output
+    parents = parents or {}
+    nodes = list(plan_nodes(plan[0]["Plan"]))
+    indexes = sorted({parents.get(node["Index Name"], node["Index Name"]) for node in nodes if "Index Name" in node})
+    review_scans = [
+        node for node in nodes
+        if parents.get(node.get("Relation Name"), node.get("Relation Name")) == Review._meta.db_table
+    ]
+
+    problems = []
+    if not set(expected_indexes) & set(indexes):
+        problems.append(f"expected {' or '.join(expected_indexes)}")
+    if any(
+        node["Node Type"] == "Seq Scan"
+        and node.get("Actual Rows", SMALL_SCAN_ROWS) + node.get("Rows Removed by Filter", 0) >= SMALL_SCAN_ROWS
+        for node in review_scans
+    ):
+        problems.append(f"sequential scan on {Review._meta.db_table}")
+    if not allow_sort and any(node["Node Type"] in ("Sort", "Incremental Sort") for node in nodes):
+        problems.append("explicit sort")
+    partitions = {node["Relation Name"] for node in review_scans}
+    if max_partitions is not None and len(partitions) > max_partitions:
+        problems.append(f"scanned {len(partitions)} partitions")
+    return plan[0].get("Execution Time"), indexes, problems
+
+
+def review_queries(sample, canonical_id):
+    institution = str(sample.institution_id)
+    day_start = timezone.localtime(sample.reviewed_at).replace(hour=0, minute=0, second=0, microsecond=0)
+    list_filters = [
+        ("", {}, ["review_reviewed_at_idx"]),
+        (" by institution", {"institution": institution}, ["review_institution_list_idx"]),
+        (" by event", {"event": str(sample.event_id or 0)}, ["review_event_list_idx"]),
+        (" by source", {"source": sample.source}, ["review_source_list_idx", "review_reviewed_at_idx"]),
+        (
+            " by sentiment",
+            {"sentiment": sample.sentiment or "positive"},
+            ["review_sentiment_list_idx", "review_reviewed_at_idx"],
+        ),
+        (
+            " by institution and period",
+            {"institution": institution, "date_from": "2024-03-01", "date_to": "2024-03-31"},
+            ["review_institution_list_idx"],
+        ),
+    ]
+
+    queries = []
+    for suffix, params, indexes in list_filters:
+        reviews = review_rows(filter_reviews(Review.objects.all(), params))
+        max_partitions = 1 if "date_from" in params else None
+        queries.append((f"review list{suffix}", page_queryset(reviews), indexes, False, max_partitions))
+        queries.append((
+            f"review list{suffix}, next page",
+            page_queryset(reviews, cursor=encode_cursor(sample)),
+            indexes,
+            False,
+            max_partitions,
+        ))
+
+    queries.extend([
+        ("review detail", Review.objects.with_related().filter(pk=sample.pk), [PRIMARY_KEY_INDEX], True, None),
+        (
+            "post-processing batch",
+            Review.objects.filter(id__in=range(sample.pk, sample.pk + BATCH_SIZE))
+            .values_list("id", "canonical_id"),
+            [PRIMARY_KEY_INDEX],
+            True,
+            None,
+        ),
+        (
+            "import re-select",
+            Review.objects.filter(
+                institution_id=sample.institution_id,
+                text_hash__in=[sample.text_hash],
+                created_at__gte=sample.created_at,
+            ).with_related(),
+            ["review_unique_institution_text_hash"],
+            True,
+            None,
+        ),
+        (
+            "duplicates of a review",
+            Review.objects.filter(canonical_id=canonical_id).values_list("id", flat=True),
+            ["review_duplicates_idx"],
+            True,
+            None,
+        ),
+        (
+            "pending reviews",
+            Review.objects.pending().filter(created_at__lt=timezone.now(), id__gt=0)
+            .order_by("id").values_list("id", flat=True)[:BATCH_SIZE],
+            ["review_pending_idx"],
+            False,
+            None,
+        ),
+        (
+            "daily stats refresh",
+            Review.objects.filter(
+                institution_id=sample.institution_id,
+                event_id=sample.event_id,
+                source=sample.source,
+                sentiment__isnull=False,
+                reviewed_at__gte=day_start,
+                reviewed_at__lt=day_start + datetime.timedelta(days=1),
+            ).order_by().values("institution_id").annotate(**SENTIMENT_COUNTS),
+            ["review_institution_list_idx", "review_event_list_idx"],
+            True,
+            None,
+        ),
+    ])
+    return queries
+
+
+class Command(BaseCommand):
+    help = "Seed synthetic reviews and check EXPLAIN plans of the app's review queries (rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000000)
+        parser.add_argument("--institutions", type=int, default=50)
+        parser.add_argument("--events", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--keep", action="store_true")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Query plans can only be checked on PostgreSQL")
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            self.seed(options)
+            self.stdout.write(f"Seeded {options['rows']} reviews in {time.perf_counter() - started:.1f}s")
+
+            sample = Review.objects.order_by("id")[options["rows"] // 2]
+            canonical_id = (
+                Review.objects.filter(canonical__isnull=False).values_list("canonical_id", flat=True).last()
+                or sample.pk
+            )
+
+            parents = partition_parents() if is_partitioned() else {}
+            failures = []
+            for name, queryset, expected_indexes, allow_sort, max_partitions in review_queries(sample, canonical_id):
+                timings = []
+                for _ in range(options["repeat"]):
+                    elapsed, indexes, problems = check_plan(
+                        queryset.explain(format="json", analyze=True),
+                        expected_indexes,
+                        allow_sort,
+                        parents,
+                        max_partitions,
+                    )
+                    timings.append(elapsed)
+                self.stdout.write(
+                    f"{'FAIL' if problems else 'OK':4} {name:<45} {min(timings):9.2f} ms  "
+                    f"{', '.join(indexes) or '-'}{'  (' + '; '.join(problems) + ')' if problems else ''}"
+                )
+                if problems:
+                    failures.append(name)
+
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"Query plan regressions: {', '.join(failures)}")
+
+    def seed(self, options):
+        rng = random.Random(42)
+        start_date = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+        institutions = Institution.objects.bulk_create(
+            [Institution(name=f"Бенчмарк {number}", address="-") for number in range(options["institutions"])]
+        )
+        events = Event.objects.bulk_create(
+            [Event(name=f"Мероприятие {number}", date=start_date) for number in range(options["events"])]
+        )
+        step = datetime.timedelta(days=730) / max(options["rows"], 1)
+        ensure_review_partitions(since=start_date)
+
+        for offset in range(0, options["rows"], SEED_BATCH_SIZE):
+            Review.objects.bulk_create([
+                Review(
+                    institution=rng.choice(institutions),
+                    event=rng.choice(events) if rng.random() < 0.6 else None,
+                    text=f"Отзыв номер {number}",
+                    text_hash=f"{number:064x}",
+                    sentiment=None if rng.random() < PENDING_RATIO else rng.choice(SENTIMENTS),
+                    confidence=round(rng.uniform(0.34, 1.0), 4),
+                    source=rng.choice(SOURCES),
+                    reviewed_at=start_date + step * number,
+                )
+                for number in range(offset, min(offset + SEED_BATCH_SIZE, options["rows"]))
+            ])
+
+        review_table = Review._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {review_table} SET canonical_id = id - 1 "
+                f"WHERE institution_id = ANY(%s) AND id %% {DUPLICATE_EVERY} = 0",
+                [[institution.pk for institution in institutions]],
+            )
+            cursor.execute(f"ANALYZE {review_table}")
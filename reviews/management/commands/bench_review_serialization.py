@@ -0,0 +1,78 @@
+import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from reviews.models import Event, Institution, Review
+from reviews.renderers import ORJSONRenderer
+from reviews.serializers import ReviewSerializer, review_rows, serialize_review_rows
+
+SENTIMENTS = ["positive", "negative", "neutral", None]
+
+
+class Command(BaseCommand):
+    help = "Compare ReviewSerializer with the values() fast path on synthetic reviews (rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        start_date = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+        with transaction.atomic():
+            institutions = [
+                Institution.objects.create(name=f"Театр {number}", address="-") for number in range(20)
+            ]
+            events = [
+                Event.objects.create(name=f"Мероприятие {number}", date=start_date) for number in range(50)
+            ]
+            Review.objects.bulk_create(
+                [
+                    Review(
+                        institution=rng.choice(institutions),
+                        event=rng.choice(events + [None]),
+                        text=f"Отзыв номер {number}: «спектакль понравился»",
+                        text_hash=f"{number:064x}",
+                        sentiment=rng.choice(SENTIMENTS),
+                        confidence=round(rng.uniform(0.34, 1.0), 4),
+                        positive_aspects=["актёры", "звук"][:rng.randrange(3)],
+                        negative_aspects=["буфет"][:rng.randrange(2)],
+                        source=rng.choice(["yandex", "2gis", "vk"]),
+                        reviewed_at=start_date + datetime.timedelta(minutes=number, microseconds=number),
+                    )
+                    for number in range(options["rows"])
+                ],
+                batch_size=2000,
+            )
+            queryset = Review.objects.filter(institution__in=institutions).order_by("-reviewed_at", "-id")
+
+            serializer_result = self.measure(options["repeat"], lambda: JSONRenderer().render(
+                ReviewSerializer(queryset.with_related(), many=True).data
+            ))
+            fast_result = self.measure(options["repeat"], lambda: ORJSONRenderer().render(
+                serialize_review_rows(review_rows(queryset))
+            ))
+
+            transaction.set_rollback(True)
+
+        (serializer_time, serializer_body), (fast_time, fast_body) = serializer_result, fast_result
+        self.stdout.write(f"ReviewSerializer + JSONRenderer: {serializer_time * 1000:.0f} ms")
+        self.stdout.write(f"values() + ORJSONRenderer: {fast_time * 1000:.0f} ms")
+        self.stdout.write(
+            f"Speedup: {serializer_time / fast_time:.1f}x, identical output: {serializer_body == fast_body}"
+        )
+
+    @staticmethod
+    def measure(repeat, render):
+        best, body = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = render()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, body
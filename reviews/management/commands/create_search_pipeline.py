@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reviews.search import HYBRID_SEARCH_PIPELINE, put_hybrid_search_pipeline
+
+
+class Command(BaseCommand):
+    help = "Create or update the search pipeline used by semantic review search"
+
+    def handle(self, *args, **options):
+        put_hybrid_search_pipeline()
+        self.stdout.write(f"Search pipeline {HYBRID_SEARCH_PIPELINE} is up to date")
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from review_analyser.db_router import reading_from
+from reviews.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, iter_export_rows, write_csv, write_xlsx
+from reviews.filters import REVIEW_FILTER_PARAMS, filter_reviews
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    help = "Export reviews to a CSV or XLSX file, streaming rows from a server-side cursor"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output")
+        parser.add_argument("--format", choices=EXPORT_FORMATS)
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+        for param in REVIEW_FILTER_PARAMS:
+            parser.add_argument(f"--{param.replace('_', '-')}", dest=param)
+
+    def handle(self, *args, **options):
+        export_format = options["format"] or options["output"].rsplit(".", 1)[-1].lower()
+        if export_format not in EXPORT_FORMATS:
+            raise CommandError(f"Unsupported export format: {export_format}")
+
+        try:
+            reviews = filter_reviews(Review.objects.all(), options)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        rows = iter_export_rows(reviews, chunk_size=options["chunk_size"])
+        with reading_from(settings.READ_REPLICA_DATABASE):
+            if export_format == "xlsx":
+                with open(options["output"], "wb") as fileobj:
+                    written = write_xlsx(rows, fileobj)
+            else:
+                with open(options["output"], "w", encoding="utf-8", newline="") as fileobj:
+                    written = write_csv(rows, fileobj)
+
+        self.stdout.write(f"Exported {written} reviews to {options['output']}")
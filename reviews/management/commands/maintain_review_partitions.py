@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reviews.partitions import (
+    PARTITION_INTERVALS, ensure_review_partitions, freeze_review_partitions, is_partitioned, partition_start,
+    review_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = "Create upcoming review partitions and optionally freeze closed ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", choices=PARTITION_INTERVALS)
+        parser.add_argument("--ahead", type=int)
+        parser.add_argument("--freeze", action="store_true", help="VACUUM FREEZE partitions of past periods")
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            raise CommandError("The reviews table is not partitioned")
+
+        created = ensure_review_partitions(interval=options["interval"], ahead=options["ahead"])
+        if created:
+            self.stdout.write(f"Created partitions: {', '.join(created)}")
+
+        if options["freeze"]:
+            interval = options["interval"] or settings.REVIEW_PARTITION_INTERVAL
+            frozen = freeze_review_partitions(partition_start(timezone.now(), interval))
+            self.stdout.write(f"Froze {len(frozen)} closed partitions")
+
+        for partition in review_partitions():
+            bounds = (
+                f"{partition['start']:%Y-%m-%d} .. {partition['end']:%Y-%m-%d}"
+                if partition["start"] else "default"
+            )
+            self.stdout.write(f"{partition['name']:<28} {bounds:<24} ~{partition['rows']} reviews")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reviews.analytics import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ReviewDailyStats rollup from the reviews table"
+
+    def handle(self, *args, **options):
+        created = rebuild_daily_stats()
+        self.stdout.write(f"Rebuilt {created} daily stats rows")
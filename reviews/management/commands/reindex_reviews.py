@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from reviews.indexing import REINDEX_BATCH_SIZE, REINDEX_WORKERS, reindex_reviews
+
+
+class Command(BaseCommand):
+    help = "Rebuild the reviews search index into a new index and switch the alias to it"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=REINDEX_WORKERS)
+        parser.add_argument("--batch-size", type=int, default=REINDEX_BATCH_SIZE)
+        parser.add_argument("--keep-old", action="store_true")
+
+    def handle(self, *args, **options):
+        result = reindex_reviews(
+            workers=max(options["workers"], 1),
+            batch_size=options["batch_size"],
+            keep_old=options["keep_old"],
+        )
+        self.stdout.write(
+            f"Indexed {result['indexed']} reviews into {result['index']} in {result['seconds']:.2f}s: "
+            f"{result['docs_per_second']} docs/sec"
+        )
+        if result["replaced"]:
+            action = "Kept" if options["keep_old"] else "Deleted"
+            self.stdout.write(f"{action} previous indices: {', '.join(result['replaced'])}")
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:27
+
+import hashlib
+import unicodedata
+
+from django.db import migrations, models
+
+
+def backfill_text_hash(apps, schema_editor):
+    Review = apps.get_model("reviews", "Review")
+
+    batch = []
+    seen_hashes = set()
+    current_institution_id = None
+
+    for review in (
+        Review.objects.order_by("institution_id", "id")
+        .only("id", "institution_id", "text")
+        .iterator(chunk_size=2000)
+    ):
+        if review.institution_id != current_institution_id:
+            current_institution_id = review.institution_id
+            seen_hashes = set()
+
+        text = unicodedata.normalize("NFKC", review.text or "")
+        text_hash = hashlib.sha256(
+            " ".join(text.casefold().split()).encode("utf-8")
+        ).hexdigest()
+
+        if text_hash in seen_hashes:
+            continue
+        seen_hashes.add(text_hash)
+
+        review.text_hash = text_hash
+        batch.append(review)
+        if len(batch) >= 2000:
+            Review.objects.bulk_update(batch, ["text_hash"])
+            batch = []
+
+    if batch:
+        Review.objects.bulk_update(batch, ["text_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0009_review_source"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="review",
+            name="text_hash",
+            field=models.CharField(
+                editable=False,
+                max_length=64,
+                null=True,
+                verbose_name="Хэш нормализованного текста",
+            ),
+        ),
+        migrations.RunPython(backfill_text_hash, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="review",
+            constraint=models.UniqueConstraint(
+                fields=("institution", "text_hash"),
+                name="review_unique_institution_text_hash",
+            ),
+        ),
+    ]
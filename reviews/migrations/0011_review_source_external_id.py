@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0010_review_text_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="review",
+            name="source_external_id",
+            field=models.CharField(
+                blank=True,
+                max_length=255,
+                null=True,
+                verbose_name="Идентификатор отзыва в источнике",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="review",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("source_external_id__isnull", False)),
+                fields=("institution", "source", "source_external_id"),
+                name="review_unique_source_external_id",
+            ),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0011_review_source_external_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="review",
+            name="canonical",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Заполняется, если отзыв является почти полным дубликатом другого отзыва",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicates",
+                to="reviews.review",
+                verbose_name="Исходный отзыв",
+            ),
+        ),
+        migrations.AddField(
+            model_name="review",
+            name="minhash",
+            field=models.BinaryField(
+                null=True, verbose_name="MinHash-сигнатура текста"
+            ),
+        ),
+        migrations.CreateModel(
+            name="ReviewSignatureBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "band",
+                    models.PositiveSmallIntegerField(verbose_name="Номер полосы LSH"),
+                ),
+                ("bucket", models.BigIntegerField(verbose_name="Корзина LSH")),
+                (
+                    "institution",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="reviews.institution",
+                        verbose_name="Учреждение",
+                    ),
+                ),
+                (
+                    "review",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="signature_bands",
+                        to="reviews.review",
+                        verbose_name="Отзыв",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Полоса LSH-индекса",
+                "verbose_name_plural": "Полосы LSH-индекса",
+                "indexes": [
+                    models.Index(
+                        fields=["institution", "bucket"], name="review_band_bucket_idx"
+                    )
+                ],
+            },
+        ),
+    ]
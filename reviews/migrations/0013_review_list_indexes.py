@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0012_review_near_duplicates"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["-reviewed_at", "-id"], name="review_reviewed_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["institution", "-reviewed_at", "-id"],
+                name="review_institution_list_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["event", "-reviewed_at", "-id"], name="review_event_list_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["source", "-reviewed_at", "-id"], name="review_source_list_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["sentiment", "-reviewed_at", "-id"],
+                name="review_sentiment_list_idx",
+            ),
+        ),
+    ]
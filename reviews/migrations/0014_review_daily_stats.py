@@ -0,0 +1,135 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def build_daily_stats(apps, schema_editor):
+    Review = apps.get_model("reviews", "Review")
+    ReviewDailyStats = apps.get_model("reviews", "ReviewDailyStats")
+
+    rows = (
+        Review.objects.filter(sentiment__isnull=False)
+        .annotate(date=TruncDate("reviewed_at"))
+        .order_by()
+        .values("institution_id", "event_id", "source", "date")
+        .annotate(
+            positive_count=Count("id", filter=Q(sentiment="positive")),
+            negative_count=Count("id", filter=Q(sentiment="negative")),
+            neutral_count=Count("id", filter=Q(sentiment="neutral")),
+            confidence_sum=Sum("confidence"),
+            confidence_count=Count("confidence"),
+        )
+    )
+    ReviewDailyStats.objects.bulk_create(
+        (
+            ReviewDailyStats(**{**row, "confidence_sum": row["confidence_sum"] or 0.0})
+            for row in rows
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0013_review_list_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReviewDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(max_length=64, verbose_name="Источник отзывов"),
+                ),
+                ("date", models.DateField(verbose_name="Дата")),
+                (
+                    "positive_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Положительных отзывов"
+                    ),
+                ),
+                (
+                    "negative_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Отрицательных отзывов"
+                    ),
+                ),
+                (
+                    "neutral_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Нейтральных отзывов"
+                    ),
+                ),
+                (
+                    "confidence_sum",
+                    models.FloatField(
+                        default=0.0, verbose_name="Сумма уверенности модели"
+                    ),
+                ),
+                (
+                    "confidence_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Отзывов с уверенностью модели"
+                    ),
+                ),
+                (
+                    "event",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="reviews.event",
+                        verbose_name="Мероприятие",
+                    ),
+                ),
+                (
+                    "institution",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="reviews.institution",
+                        verbose_name="Учреждение",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Дневная статистика отзывов",
+                "verbose_name_plural": "Дневная статистика отзывов",
+                "indexes": [
+                    models.Index(
+                        fields=["institution", "date"],
+                        name="review_stats_inst_date_idx",
+                    ),
+                    models.Index(fields=["date"], name="review_stats_date_idx"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("event__isnull", False)),
+                        fields=("institution", "event", "source", "date"),
+                        name="review_stats_unique_event_day",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("event__isnull", True)),
+                        fields=("institution", "source", "date"),
+                        name="review_stats_unique_day",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(build_daily_stats, migrations.RunPython.noop),
+    ]
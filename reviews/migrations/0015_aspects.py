@@ -0,0 +1,96 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0014_review_daily_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Aspect",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="Аспект"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Аспект",
+                "verbose_name_plural": "Аспекты",
+            },
+        ),
+        migrations.CreateModel(
+            name="ReviewAspect",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "polarity",
+                    models.CharField(
+                        choices=[
+                            ("positive", "Положительный"),
+                            ("negative", "Отрицательный"),
+                        ],
+                        max_length=16,
+                        verbose_name="Тональность аспекта",
+                    ),
+                ),
+                (
+                    "aspect",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="review_links",
+                        to="reviews.aspect",
+                        verbose_name="Аспект",
+                    ),
+                ),
+                (
+                    "review",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="aspect_links",
+                        to="reviews.review",
+                        verbose_name="Отзыв",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Аспект отзыва",
+                "verbose_name_plural": "Аспекты отзывов",
+                "indexes": [
+                    models.Index(
+                        fields=["aspect", "polarity"], name="review_aspect_polarity_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("review", "aspect", "polarity"),
+                        name="review_aspect_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0015_aspects"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                condition=models.Q(("canonical__isnull", False)),
+                fields=["canonical"],
+                name="review_duplicates_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                condition=models.Q(
+                    ("canonical__isnull", True), ("sentiment__isnull", True)
+                ),
+                fields=["id"],
+                name="review_pending_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="review",
+            name="canonical",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                help_text="Заполняется, если отзыв является почти полным дубликатом другого отзыва",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicates",
+                to="reviews.review",
+                verbose_name="Исходный отзыв",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="review",
+            name="event",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="reviews",
+                to="reviews.event",
+                verbose_name="Мероприятие",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="review",
+            name="institution",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reviews",
+                to="reviews.institution",
+                verbose_name="Учреждение",
+            ),
+        ),
+    ]
@@ -0,0 +1,179 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from reviews.partitions import DEFAULT_PARTITION, upcoming_partition_ranges
+
+
+def add_review_keys(schema_editor, Review, primary_key):
+    quote = schema_editor.quote_name
+    table = quote(Review._meta.db_table)
+    schema_editor.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {quote(Review._meta.db_table + '_pkey')} "
+        f"PRIMARY KEY ({', '.join(quote(column) for column in primary_key)})"
+    )
+    for index in Review._meta.indexes:
+        schema_editor.add_index(Review, index)
+    for field in Review._meta.local_fields:
+        if field.remote_field and field.db_constraint:
+            target = field.target_field
+            schema_editor.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {quote(Review._meta.db_table + '_' + field.column + '_fk')} "
+                f"FOREIGN KEY ({quote(field.column)}) "
+                f"REFERENCES {quote(target.model._meta.db_table)} ({quote(target.column)}) "
+                "DEFERRABLE INITIALLY DEFERRED"
+            )
+
+
+def drop_review_keys(schema_editor, Review, table):
+    quote = schema_editor.quote_name
+    for index in Review._meta.indexes:
+        schema_editor.execute(f"DROP INDEX {quote(index.name)}")
+    schema_editor.execute(
+        f"ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(Review._meta.db_table + '_pkey')}"
+    )
+
+
+def partition_review_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    Review = apps.get_model("reviews", "Review")
+    quote = schema_editor.quote_name
+    table = Review._meta.db_table
+    legacy = f"{table}_unpartitioned"
+    sequence = f"{table}_id_seq"
+
+    schema_editor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(legacy)}")
+    drop_review_keys(schema_editor, Review, legacy)
+    schema_editor.execute(f"ALTER TABLE {quote(legacy)} ALTER COLUMN id DROP IDENTITY")
+
+    schema_editor.execute(
+        f"CREATE TABLE {quote(table)} (LIKE {quote(legacy)} INCLUDING DEFAULTS) PARTITION BY RANGE (reviewed_at)"
+    )
+    schema_editor.execute(
+        f"CREATE SEQUENCE {quote(sequence)} OWNED BY {quote(table)}.id"
+    )
+    schema_editor.execute(
+        f"ALTER TABLE {quote(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')"
+    )
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(reviewed_at) FROM {quote(legacy)}")
+        first_reviewed_at = cursor.fetchone()[0]
+    for name, start, end in upcoming_partition_ranges(since=first_reviewed_at):
+        schema_editor.execute(
+            f"CREATE TABLE {quote(name)} PARTITION OF {quote(table)} FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+    schema_editor.execute(
+        f"CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {quote(table)} DEFAULT"
+    )
+
+    schema_editor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(legacy)}")
+    schema_editor.execute(f"DROP TABLE {quote(legacy)}")
+    schema_editor.execute(
+        f"SELECT setval('{sequence}', COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {quote(table)}"
+    )
+    add_review_keys(schema_editor, Review, ["id", "reviewed_at"])
+    schema_editor.execute(f"ANALYZE {quote(table)}")
+
+
+def unpartition_review_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    Review = apps.get_model("reviews", "Review")
+    quote = schema_editor.quote_name
+    table = Review._meta.db_table
+    partitioned = f"{table}_partitioned"
+
+    schema_editor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(partitioned)}")
+    drop_review_keys(schema_editor, Review, partitioned)
+
+    schema_editor.execute(f"CREATE TABLE {quote(table)} (LIKE {quote(partitioned)})")
+    schema_editor.execute(
+        f"INSERT INTO {quote(table)} SELECT * FROM {quote(partitioned)}"
+    )
+    schema_editor.execute(f"DROP TABLE {quote(partitioned)}")
+    schema_editor.execute(
+        f"ALTER TABLE {quote(table)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY"
+    )
+    schema_editor.execute(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+        f"FROM {quote(table)}"
+    )
+    add_review_keys(schema_editor, Review, ["id"])
+    schema_editor.execute(f"ANALYZE {quote(table)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0016_review_access_path_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="review",
+            name="review_unique_institution_text_hash",
+        ),
+        migrations.RemoveConstraint(
+            model_name="review",
+            name="review_unique_source_external_id",
+        ),
+        migrations.AlterField(
+            model_name="review",
+            name="canonical",
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                db_index=False,
+                help_text="Заполняется, если отзыв является почти полным дубликатом другого отзыва",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicates",
+                to="reviews.review",
+                verbose_name="Исходный отзыв",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="reviewaspect",
+            name="review",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="aspect_links",
+                to="reviews.review",
+                verbose_name="Отзыв",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="reviewsignatureband",
+            name="review",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="signature_bands",
+                to="reviews.review",
+                verbose_name="Отзыв",
+            ),
+        ),
+        migrations.RunPython(partition_review_table, unpartition_review_table),
+        migrations.AddConstraint(
+            model_name="review",
+            constraint=models.UniqueConstraint(
+                fields=("institution", "text_hash", "reviewed_at"),
+                name="review_unique_institution_text_hash",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="review",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("source_external_id__isnull", False)),
+                fields=("institution", "source", "source_external_id", "reviewed_at"),
+                name="review_unique_source_external_id",
+            ),
+        ),
+    ]
@@ -1,7 +1,20 @@
+import hashlib
+import unicodedata
+
 from django.db import models
+from django.db.models import DEFERRED
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
+def normalize_review_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "")
+    return " ".join(text.casefold().split())
+
+
+def review_text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_review_text(text).encode("utf-8")).hexdigest()
+
+
 class Institution(models.Model):
     name = models.CharField(max_length=255, verbose_name="Название")
     address = models.TextField(verbose_name="Адрес")
@@ -32,6 +45,14 @@ class Event(models.Model):
         return self.name
 
 
+class ReviewQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related("institution", "event")
+
+    def pending(self):
+        return self.filter(sentiment__isnull=True, canonical__isnull=True)
+
+
 class Review(models.Model):
     TONE_CHOICES = [
         ("positive", "Положительный"),
@@ -43,6 +64,7 @@ class Review(models.Model):
         Institution,
         on_delete=models.CASCADE,
         related_name="reviews",
+        db_index=False,
         verbose_name="Учреждение"
     )
     event = models.ForeignKey(
@@ -51,6 +73,7 @@ class Review(models.Model):
         null=True,
         blank=True,
         related_name="reviews",
+        db_index=False,
         verbose_name="Мероприятие"
     )
     text = models.TextField(verbose_name="Текст отзыва")
@@ -80,13 +103,215 @@ class Review(models.Model):
         max_length=64,
         verbose_name="Источник отзыва"
     )
+    source_external_id = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        verbose_name="Идентификатор отзыва в источнике"
+    )
+    text_hash = models.CharField(
+        max_length=64,
+        null=True,
+        editable=False,
+        verbose_name="Хэш нормализованного текста"
+    )
+    minhash = models.BinaryField(
+        null=True,
+        editable=False,
+        verbose_name="MinHash-сигнатура текста"
+    )
+    canonical = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="duplicates",
+        db_index=False,
+        db_constraint=False,
+        verbose_name="Исходный отзыв",
+        help_text="Заполняется, если отзыв является почти полным дубликатом другого отзыва"
+    )
     reviewed_at = models.DateTimeField(verbose_name="Дата написания отзыва")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
 
+    objects = ReviewQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
         ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["institution", "text_hash", "reviewed_at"],
+                name="review_unique_institution_text_hash",
+            ),
+            models.UniqueConstraint(
+                fields=["institution", "source", "source_external_id", "reviewed_at"],
+                condition=models.Q(source_external_id__isnull=False),
+                name="review_unique_source_external_id",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["-reviewed_at", "-id"], name="review_reviewed_at_idx"),
+            models.Index(fields=["institution", "-reviewed_at", "-id"], name="review_institution_list_idx"),
+            models.Index(fields=["event", "-reviewed_at", "-id"], name="review_event_list_idx"),
+            models.Index(fields=["source", "-reviewed_at", "-id"], name="review_source_list_idx"),
+            models.Index(fields=["sentiment", "-reviewed_at", "-id"], name="review_sentiment_list_idx"),
+            models.Index(
+                fields=["canonical"],
+                condition=models.Q(canonical__isnull=False),
+                name="review_duplicates_idx",
+            ),
+            models.Index(
+                fields=["id"],
+                condition=models.Q(sentiment__isnull=True, canonical__isnull=True),
+                name="review_pending_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Отзыв #{self.id} - {self.sentiment}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_text = instance.__dict__.get("text", DEFERRED)
+        return instance
+
+    def refresh_from_db(self, *args, fields=None, **kwargs):
+        super().refresh_from_db(*args, fields=fields, **kwargs)
+        if fields is None or "text" in fields:
+            self._loaded_text = self.__dict__.get("text", DEFERRED)
+
+    def text_changed(self) -> bool:
+        return "text" in self.__dict__ and self.text != getattr(self, "_loaded_text", DEFERRED)
+
+    def save(self, *args, rehash=True, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if self._state.adding:
+            if self.text_hash is None:
+                self.text_hash = review_text_hash(self.text)
+        elif rehash and self.text_changed() and (update_fields is None or "text" in update_fields):
+            self.text_hash = review_text_hash(self.text)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "text_hash"}
+        super().save(*args, **kwargs)
+        self._loaded_text = self.__dict__.get("text", DEFERRED)
+
+
+class ReviewSignatureBand(models.Model):
+    institution = models.ForeignKey(
+        Institution,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Учреждение"
+    )
+    review = models.ForeignKey(
+        Review,
+        on_delete=models.CASCADE,
+        related_name="signature_bands",
+        db_constraint=False,
+        verbose_name="Отзыв"
+    )
+    band = models.PositiveSmallIntegerField(verbose_name="Номер полосы LSH")
+    bucket = models.BigIntegerField(verbose_name="Корзина LSH")
+
+    class Meta:
+        verbose_name = "Полоса LSH-индекса"
+        verbose_name_plural = "Полосы LSH-индекса"
+        indexes = [
+            models.Index(fields=["institution", "bucket"], name="review_band_bucket_idx"),
+        ]
+
+
+class ReviewDailyStats(models.Model):
+    institution = models.ForeignKey(
+        Institution,
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+        verbose_name="Учреждение"
+    )
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="daily_stats",
+        verbose_name="Мероприятие"
+    )
+    source = models.CharField(max_length=64, verbose_name="Источник отзывов")
+    date = models.DateField(verbose_name="Дата")
+    positive_count = models.PositiveIntegerField(default=0, verbose_name="Положительных отзывов")
+    negative_count = models.PositiveIntegerField(default=0, verbose_name="Отрицательных отзывов")
+    neutral_count = models.PositiveIntegerField(default=0, verbose_name="Нейтральных отзывов")
+    confidence_sum = models.FloatField(default=0.0, verbose_name="Сумма уверенности модели")
+    confidence_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Отзывов с уверенностью модели"
+    )
+
+    class Meta:
+        verbose_name = "Дневная статистика отзывов"
+        verbose_name_plural = "Дневная статистика отзывов"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["institution", "event", "source", "date"],
+                condition=models.Q(event__isnull=False),
+                name="review_stats_unique_event_day",
+            ),
+            models.UniqueConstraint(
+                fields=["institution", "source", "date"],
+                condition=models.Q(event__isnull=True),
+                name="review_stats_unique_day",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["institution", "date"], name="review_stats_inst_date_idx"),
+            models.Index(fields=["date"], name="review_stats_date_idx"),
+        ]
+
+
+class Aspect(models.Model):
+    name = models.CharField(max_length=255, unique=True, verbose_name="Аспект")
+
+    class Meta:
+        verbose_name = "Аспект"
+        verbose_name_plural = "Аспекты"
+
+    def __str__(self):
+        return self.name
+
+
+class ReviewAspect(models.Model):
+    POLARITY_CHOICES = [
+        ("positive", "Положительный"),
+        ("negative", "Отрицательный"),
+    ]
+
+    review = models.ForeignKey(
+        Review,
+        on_delete=models.CASCADE,
+        related_name="aspect_links",
+        db_constraint=False,
+        verbose_name="Отзыв"
+    )
+    aspect = models.ForeignKey(
+        Aspect,
+        on_delete=models.CASCADE,
+        related_name="review_links",
+        verbose_name="Аспект"
+    )
+    polarity = models.CharField(max_length=16, choices=POLARITY_CHOICES, verbose_name="Тональность аспекта")
+
+    class Meta:
+        verbose_name = "Аспект отзыва"
+        verbose_name_plural = "Аспекты отзывов"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["review", "aspect", "polarity"],
+                name="review_aspect_unique",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["aspect", "polarity"], name="review_aspect_polarity_idx"),
+        ]
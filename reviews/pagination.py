@@ -0,0 +1,71 @@
+import base64
+import json
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(review) -> str:
+    if isinstance(review, dict):
+        reviewed_at, pk = review["reviewed_at"], review["id"]
+    else:
+        reviewed_at, pk = review.reviewed_at, review.pk
+    payload = json.dumps([reviewed_at.isoformat(), pk])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    try:
+        reviewed_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        reviewed_at = parse_datetime(reviewed_at)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if reviewed_at is None:
+        raise ValueError("Invalid cursor")
+    return reviewed_at, pk
+
+
+def parse_page_size(value) -> int:
+    if value in (None, ""):
+        return DEFAULT_PAGE_SIZE
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid limit: {value}")
+    if page_size < 1:
+        raise ValueError(f"Invalid limit: {value}")
+    return min(page_size, MAX_PAGE_SIZE)
+
+
+def page_queryset(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    queryset = queryset.order_by("-reviewed_at", "-id")
+    if cursor:
+        reviewed_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(reviewed_at__lte=reviewed_at).filter(
+            Q(reviewed_at__lt=reviewed_at) | Q(reviewed_at=reviewed_at, id__lt=pk)
+        )
+    return queryset[:page_size + 1]
+
+
+def paginate_reviews(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    page = list(page_queryset(queryset, cursor, page_size))
+    next_cursor = encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+    return page[:page_size], next_cursor
+
+
+def estimate_count(queryset) -> int:
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    sql, params = queryset.order_by().values("id").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
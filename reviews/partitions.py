@@ -0,0 +1,153 @@
+import datetime
+import re
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+REVIEW_TABLE = "reviews_review"
+PARTITION_INTERVALS = ("month", "year")
+DEFAULT_PARTITION = f"{REVIEW_TABLE}_default"
+PARTITION_NAME_RE = re.compile(rf"^{REVIEW_TABLE}_(\d{{4}})(?:_(\d{{2}}))?$")
+
+
+def partition_start(moment: datetime.datetime, interval: str) -> datetime.datetime:
+    moment = moment.astimezone(datetime.timezone.utc)
+    month = 1 if interval == "year" else moment.month
+    return datetime.datetime(moment.year, month, 1, tzinfo=datetime.timezone.utc)
+
+
+def next_partition_start(start: datetime.datetime, interval: str) -> datetime.datetime:
+    if interval == "year":
+        return start.replace(year=start.year + 1)
+    return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+
+
+def partition_name(start: datetime.datetime, interval: str) -> str:
+    return f"{REVIEW_TABLE}_{start:%Y}" if interval == "year" else f"{REVIEW_TABLE}_{start:%Y_%m}"
+
+
+def partition_bounds(name: str) -> Optional[Tuple[datetime.datetime, datetime.datetime]]:
+    match = PARTITION_NAME_RE.match(name)
+    if match is None:
+        return None
+
+    year, month = match.groups()
+    start = datetime.datetime(int(year), int(month or 1), 1, tzinfo=datetime.timezone.utc)
+    return start, next_partition_start(start, "month" if month else "year")
+
+
+def partition_ranges(
+    first: datetime.datetime, last: datetime.datetime, interval: str
+) -> List[Tuple[str, datetime.datetime, datetime.datetime]]:
+    ranges = []
+    start = partition_start(first, interval)
+    while start <= last:
+        end = next_partition_start(start, interval)
+        ranges.append((partition_name(start, interval), start, end))
+        start = end
+    return ranges
+
+
+def upcoming_partition_ranges(
+    interval: Optional[str] = None, ahead: Optional[int] = None, since: Optional[datetime.datetime] = None
+) -> List[Tuple[str, datetime.datetime, datetime.datetime]]:
+    interval = interval or settings.REVIEW_PARTITION_INTERVAL
+    ahead = settings.REVIEW_PARTITIONS_AHEAD if ahead is None else ahead
+    last = partition_start(timezone.now(), interval)
+    for _ in range(ahead):
+        last = next_partition_start(last, interval)
+    return partition_ranges(min(since, last) if since else timezone.now(), last, interval)
+
+
+def is_partitioned(using=connection) -> bool:
+    if using.vendor != "postgresql":
+        return False
+
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table JOIN pg_class ON pg_class.oid = partrelid "
+            "WHERE relname = %s AND pg_table_is_visible(pg_class.oid)",
+            [REVIEW_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def review_partitions(using=connection) -> List[Dict]:
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname, GREATEST(child.reltuples, 0)::bigint FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = inhparent JOIN pg_class child ON child.oid = inhrelid "
+            "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)",
+            [REVIEW_TABLE],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, estimated_rows in rows:
+        start, end = partition_bounds(name) or (None, None)
+        partitions.append({"name": name, "start": start, "end": end, "rows": estimated_rows})
+    return sorted(partitions, key=lambda partition: (partition["start"] is None, partition["start"]))
+
+
+def partition_parents(using=connection) -> Dict[str, str]:
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname, parent.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = inhparent JOIN pg_class child ON child.oid = inhrelid"
+        )
+        return dict(cursor.fetchall())
+
+
+def create_review_partition(name: str, start: datetime.datetime, end: datetime.datetime, using=connection) -> None:
+    quote = using.ops.quote_name
+    with transaction.atomic(using=using.alias), using.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {quote(name)} (LIKE {quote(REVIEW_TABLE)} INCLUDING DEFAULTS)")
+        cursor.execute(
+            f"WITH moved AS ("
+            f"DELETE FROM {quote(DEFAULT_PARTITION)} WHERE reviewed_at >= %s AND reviewed_at < %s RETURNING *"
+            f") INSERT INTO {quote(name)} SELECT * FROM moved",
+            [start, end],
+        )
+        cursor.execute(
+            f"ALTER TABLE {quote(REVIEW_TABLE)} ATTACH PARTITION {quote(name)} FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+
+
+def ensure_review_partitions(
+    interval: Optional[str] = None,
+    ahead: Optional[int] = None,
+    since: Optional[datetime.datetime] = None,
+    using=connection,
+) -> List[str]:
+    if not is_partitioned(using):
+        return []
+
+    existing = [partition for partition in review_partitions(using) if partition["start"] is not None]
+    created = []
+    for name, start, end in upcoming_partition_ranges(interval, ahead, since):
+        if any(partition["start"] < end and start < partition["end"] for partition in existing):
+            continue
+        create_review_partition(name, start, end, using)
+        existing.append({"name": name, "start": start, "end": end})
+        created.append(name)
+    return created
+
+
+def detach_review_partition(name: str, using=connection) -> None:
+    quote = using.ops.quote_name
+    with using.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {quote(REVIEW_TABLE)} DETACH PARTITION {quote(name)}")
+
+
+def freeze_review_partitions(before: datetime.datetime, using=connection) -> List[str]:
+    quote = using.ops.quote_name
+    frozen = []
+    with using.cursor() as cursor:
+        for partition in review_partitions(using):
+            if partition["end"] is not None and partition["end"] <= before:
+                cursor.execute(f"VACUUM (FREEZE, ANALYZE) {quote(partition['name'])}")
+                frozen.append(partition["name"])
+    return frozen
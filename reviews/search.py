@@ -0,0 +1,213 @@
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from opensearchpy import Q
+from opensearchpy.exceptions import TransportError
+from opensearchpy.helpers.query import Query
+
+from review_processor.embeddings import get_review_embedder
+from .documents import ReviewDocument
+from .filters import filter_review_search, review_search_filters
+from .serializers import serialize_review_rows
+
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+MAX_SEARCH_WINDOW = 10000
+HIGHLIGHT_FRAGMENT_SIZE = 150
+HIGHLIGHT_FRAGMENTS = 3
+FACET_SIZE = 10
+MAX_FACET_SIZE = 50
+FACET_FIELDS = ["sentiment", "source", "institution", "event"]
+
+SEMANTIC_CANDIDATES = 100
+HYBRID_SEARCH_PIPELINE = "reviews-hybrid"
+QUERY_EMBEDDING_KEY_PREFIX = "query-embedding"
+
+SEARCH_SORT = ["_score", {"reviewed_at": "desc"}, {"id": "desc"}]
+SEARCH_SOURCE_FIELDS = [
+    "id", "institution", "institution_name", "event", "event_name", "canonical", "text", "sentiment",
+    "confidence", "positive_aspects", "negative_aspects", "source", "source_external_id", "reviewed_at",
+    "created_at",
+]
+
+
+class Knn(Query):
+    name = "knn"
+
+
+class Hybrid(Query):
+    name = "hybrid"
+    _param_defs = {"queries": {"type": "query", "multi": True}}
+
+
+def encode_search_cursor(sort_values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(sort_values)).encode("utf-8")).decode("ascii")
+
+
+def decode_search_cursor(cursor: str) -> list:
+    try:
+        sort_values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(sort_values, list) or len(sort_values) != len(SEARCH_SORT):
+        raise ValueError("Invalid cursor")
+    return sort_values
+
+
+def parse_search_window(size=None, offset=None):
+    try:
+        size = int(size) if size not in (None, "") else SEARCH_PAGE_SIZE
+        offset = int(offset) if offset not in (None, "") else 0
+    except (TypeError, ValueError):
+        raise ValueError("Invalid size or from")
+    if size < 1 or offset < 0:
+        raise ValueError("Invalid size or from")
+
+    size = min(size, MAX_SEARCH_PAGE_SIZE)
+    if offset + size > MAX_SEARCH_WINDOW:
+        raise ValueError(f"from + size must not exceed {MAX_SEARCH_WINDOW}, use cursor for deep pages")
+    return size, offset
+
+
+def build_review_search(query, params, size=SEARCH_PAGE_SIZE, offset=0, cursor=None):
+    search = ReviewDocument.search()
+    if query:
+        search = search.query("match", text=query)
+    search = filter_review_search(search, params)
+    search = (
+        search.sort(*SEARCH_SORT)
+        .source(SEARCH_SOURCE_FIELDS)
+        .highlight("text", fragment_size=HIGHLIGHT_FRAGMENT_SIZE, number_of_fragments=HIGHLIGHT_FRAGMENTS)
+        .extra(size=size, track_scores=True, track_total_hits=True)
+    )
+    if cursor:
+        return search.extra(search_after=decode_search_cursor(cursor))
+    return search.extra(from_=offset)
+
+
+def embed_search_query(query: str) -> list:
+    normalized = " ".join(query.casefold().split())
+    digest = hashlib.sha1(
+        f"{settings.REVIEW_EMBEDDING_BACKEND}|{settings.REVIEW_EMBEDDING_MODEL}|{normalized}".encode("utf-8")
+    ).hexdigest()
+    key = f"{QUERY_EMBEDDING_KEY_PREFIX}:{digest}"
+
+    embedding = cache.get(key)
+    if embedding is None:
+        [embedding] = get_review_embedder().embed([normalized])
+        cache.set(key, embedding, settings.QUERY_EMBEDDING_CACHE_TIMEOUT)
+    return embedding
+
+
+def hybrid_search_pipeline() -> dict:
+    lexical_weight = settings.REVIEW_SEMANTIC_LEXICAL_WEIGHT
+    return {
+        "description": "Min-max normalized BM25 and k-NN scores for review search",
+        "phase_results_processors": [{
+            "normalization-processor": {
+                "normalization": {"technique": "min_max"},
+                "combination": {
+                    "technique": "arithmetic_mean",
+                    "parameters": {"weights": [lexical_weight, round(1 - lexical_weight, 6)]},
+                },
+            },
+        }],
+    }
+
+
+def put_hybrid_search_pipeline(client=None) -> None:
+    client = client or ReviewDocument._get_connection()
+    client.search_pipeline.put(id=HYBRID_SEARCH_PIPELINE, body=hybrid_search_pipeline())
+
+
+def is_missing_search_pipeline(error) -> bool:
+    return (
+        isinstance(error, TransportError)
+        and error.status_code in (400, 404)
+        and HYBRID_SEARCH_PIPELINE in str(error.info)
+    )
+
+
+def build_semantic_search(query, params, size=SEARCH_PAGE_SIZE, offset=0):
+    filters = review_search_filters(params)
+    knn = {"vector": embed_search_query(query), "k": max(offset + size, SEMANTIC_CANDIDATES)}
+    if filters:
+        knn["filter"] = Q("bool", filter=filters).to_dict()
+
+    return (
+        ReviewDocument.search()
+        .query(Hybrid(queries=[Q("bool", must=[Q("match", text=query)], filter=filters), Knn(text_embedding=knn)]))
+        .params(search_pipeline=HYBRID_SEARCH_PIPELINE)
+        .source(SEARCH_SOURCE_FIELDS)
+        .highlight("text", fragment_size=HIGHLIGHT_FRAGMENT_SIZE, number_of_fragments=HIGHLIGHT_FRAGMENTS)
+        .extra(size=size, from_=offset, track_total_hits=True)
+    )
+
+
+def serialize_search_response(response, size):
+    hits = list(response)
+    rows = [
+        {
+            **{field: getattr(hit, field, None) for field in SEARCH_SOURCE_FIELDS},
+            "institution_id": getattr(hit, "institution", None),
+            "event_id": getattr(hit, "event", None),
+            "canonical_id": getattr(hit, "canonical", None),
+            "positive_aspects": list(getattr(hit, "positive_aspects", None) or []),
+            "negative_aspects": list(getattr(hit, "negative_aspects", None) or []),
+        }
+        for hit in hits
+    ]
+
+    results = []
+    for hit, row in zip(hits, serialize_review_rows(rows)):
+        highlight = getattr(hit.meta, "highlight", None)
+        row["score"] = hit.meta.score
+        row["highlight"] = list(highlight.text) if highlight and "text" in highlight else []
+        results.append(row)
+
+    next_cursor = encode_search_cursor(hits[-1].meta.sort) if len(hits) == size and "sort" in hits[-1].meta else None
+    return results, response.hits.total.value, next_cursor
+
+
+def parse_facet_size(value) -> int:
+    if value in (None, ""):
+        return FACET_SIZE
+    try:
+        facet_size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid facet_size: {value}")
+    if facet_size < 1:
+        raise ValueError(f"Invalid facet_size: {value}")
+    return min(facet_size, MAX_FACET_SIZE)
+
+
+def add_review_facets(search, facet_size=FACET_SIZE):
+    for field in FACET_FIELDS:
+        search.aggs.bucket(field, "terms", field=field, size=facet_size)
+    search.aggs.bucket(
+        "reviewed_at", "date_histogram", field="reviewed_at", calendar_interval="month", min_doc_count=1
+    )
+    search.aggs.bucket("aspects", "nested", path="aspects").bucket(
+        "polarity", "terms", field="aspects.polarity", size=2
+    ).bucket("name", "terms", field="aspects.name", size=facet_size)
+    return search
+
+
+def serialize_facets(response) -> dict:
+    aggregations = response.aggregations
+    facets = {
+        field: [{"key": bucket.key, "count": bucket.doc_count} for bucket in aggregations[field].buckets]
+        for field in FACET_FIELDS
+    }
+    facets["reviewed_at"] = [
+        {"key": bucket.key_as_string, "count": bucket.doc_count}
+        for bucket in aggregations.reviewed_at.buckets
+    ]
+    facets["aspects"] = {
+        polarity.key: [{"key": bucket.key, "count": bucket.doc_count} for bucket in polarity.name.buckets]
+        for polarity in aggregations.aspects.polarity.buckets
+    }
+    return facets
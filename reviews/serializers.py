@@ -1,5 +1,15 @@
-from rest_framework import serializers
-from .models import Institution, Event, Review
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .models import Institution, Event, Review, review_text_hash
+
+REVIEW_ROW_COLUMNS = [
+    "id", "text", "sentiment", "confidence", "positive_aspects", "negative_aspects", "source",
+    "source_external_id", "reviewed_at", "created_at", "institution_id", "event_id", "canonical_id",
+]
+
+_datetime_field = serializers.DateTimeField()
 
 
 class InstitutionSerializer(serializers.ModelSerializer):
@@ -20,7 +30,7 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = "__all__"
+        exclude = ["text_hash", "minhash"]
         read_only_fields = ["created_at"]
 
     def validate_institution(self, value):
@@ -32,3 +42,75 @@ class ReviewSerializer(serializers.ModelSerializer):
         if value < 0.0 or value > 1.0:
             raise serializers.ValidationError("Confidence should be between 0.0 and 1.0")
         return value
+
+    def validate(self, attrs):
+        if self.instance is None or ("text" in attrs and attrs["text"] != self.instance.text):
+            duplicates = Review.objects.filter(
+                institution=attrs.get("institution") or self.instance.institution,
+                text_hash=review_text_hash(attrs["text"]),
+            )
+            if self.instance is not None:
+                duplicates = duplicates.exclude(pk=self.instance.pk)
+            if duplicates.exists():
+                raise serializers.ValidationError("Review with the same text already exists for this institution")
+        return attrs
+
+
+def review_rows(queryset):
+    return queryset.values(
+        *REVIEW_ROW_COLUMNS,
+        institution_name=F("institution__name"),
+        event_name=F("event__name"),
+    )
+
+
+def _datetime_formatter():
+    output_format = api_settings.DATETIME_FORMAT
+    field_timezone = _datetime_field.default_timezone()
+    if not isinstance(output_format, str) or output_format.lower() != ISO_8601 or field_timezone is None:
+        return _datetime_field.to_representation
+
+    def format_datetime(value):
+        if not value:
+            return None
+        if timezone.is_naive(value):
+            return _datetime_field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    return format_datetime
+
+
+def serialize_review_rows(rows) -> list:
+    format_datetime = _datetime_formatter()
+    return [
+        {
+            "id": row["id"],
+            "institution_name": row["institution_name"],
+            "event_name": row["event_name"],
+            "text": row["text"],
+            "sentiment": row["sentiment"],
+            "confidence": float(row["confidence"]) if row["confidence"] is not None else None,
+            "positive_aspects": row["positive_aspects"],
+            "negative_aspects": row["negative_aspects"],
+            "source": row["source"],
+            "source_external_id": row["source_external_id"],
+            "reviewed_at": format_datetime(row["reviewed_at"]),
+            "created_at": format_datetime(row["created_at"]),
+            "institution": row["institution_id"],
+            "event": row["event_id"],
+            "canonical": row["canonical_id"],
+        }
+        for row in rows
+    ]
+
+
+def serialize_reviews(reviews) -> list:
+    return serialize_review_rows(
+        {
+            **{column: getattr(review, column) for column in REVIEW_ROW_COLUMNS},
+            "institution_name": review.institution.name,
+            "event_name": review.event.name if review.event_id else None,
+        }
+        for review in reviews
+    )
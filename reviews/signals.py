@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .analytics import refresh_daily_stats, review_stats_keys
+from .cache import EVENTS_SCOPE, INSTITUTIONS_SCOPE, REVIEWS_SCOPE, bump_version
+from .indexing import mark_reviews_dirty
+from .models import Event, Institution, Review
+
+
+@receiver([post_save, post_delete], sender=Institution)
+def bump_institutions_version(sender, **kwargs):
+    bump_version(INSTITUTIONS_SCOPE)
+
+
+@receiver([post_save, post_delete], sender=Event)
+def bump_events_version(sender, **kwargs):
+    bump_version(EVENTS_SCOPE)
+
+
+@receiver([post_save, post_delete], sender=Review)
+def bump_reviews_version(sender, **kwargs):
+    bump_version(REVIEWS_SCOPE)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def mark_review_dirty(sender, instance, **kwargs):
+    mark_reviews_dirty([instance.pk])
+
+
+@receiver(post_save, sender=Institution)
+@receiver(post_save, sender=Event)
+def mark_related_reviews_dirty(sender, instance, created, **kwargs):
+    if not created:
+        mark_reviews_dirty(instance.reviews.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Event)
+def mark_event_reviews_dirty(sender, instance, **kwargs):
+    mark_reviews_dirty(instance.reviews.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Event)
+def move_event_daily_stats(sender, instance, **kwargs):
+    keys = review_stats_keys(instance.reviews.all())
+    if keys:
+        keys |= {(institution_id, None, source, date) for institution_id, _, source, date in keys}
+        transaction.on_commit(lambda: refresh_daily_stats(keys))
+
+
+@receiver(pre_delete, sender=Review)
+def mark_duplicates_dirty(sender, instance, **kwargs):
+    mark_reviews_dirty(instance.duplicates.values_list("id", flat=True))
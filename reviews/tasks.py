@@ -0,0 +1,29 @@
+import logging
+
+from celery import shared_task
+from opensearchpy.exceptions import TransportError
+
+from .indexing import ReviewIndexingError, flush_index_queue
+from .partitions import ensure_review_partitions
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    autoretry_for=(TransportError, ReviewIndexingError),
+    retry_backoff=True,
+    max_retries=5,
+)
+def flush_review_index():
+    result = flush_index_queue()
+    if result["indexed"]:
+        logger.info("Indexed %d reviews, lag %ss", result["indexed"], result["lag_seconds"])
+    return result
+
+
+@shared_task
+def maintain_review_partitions():
+    created = ensure_review_partitions()
+    if created:
+        logger.info("Created review partitions: %s", ", ".join(created))
+    return created
@@ -1,20 +1,83 @@
+import csv
 import datetime
+import io
+import json
+import tempfile
+from unittest import mock
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
 
+from django_opensearch_dsl.search import Search as ReviewSearchClass
+from openpyxl import load_workbook
+from opensearchpy.exceptions import ConnectionError as OpenSearchConnectionError, RequestError
+from opensearchpy.helpers.response import Response as OpenSearchResponse
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from .models import Institution, Event, Review
+from review_analyser.profiling import get_profile_store, percentile
+from review_analyser.db_router import ReadReplicaRouter, current_read_database, read_database_for, reading_from
+from .analytics import rebuild_daily_stats, track_daily_stats
+from .aspects import sync_review_aspects
+from .cache import REVIEWS_SCOPE, bump_version, check_response_cache
+from .models import Institution, Event, Review, ReviewAspect, ReviewDailyStats, review_text_hash
+from .renderers import ORJSONRenderer
+from review_processor.embeddings import HashingEmbedder
+from .serializers import ReviewSerializer, review_rows, serialize_review_rows, serialize_reviews
+from .documents import ReviewDocument
+from .export import stream_csv
+from .management.commands.bench_review_queries import check_plan, review_queries
+from .partitions import (
+    ensure_review_partitions, is_partitioned, partition_bounds, partition_ranges, upcoming_partition_ranges,
+)
+from .indexing import (
+    ReviewIndexingError, flush_index_queue, get_index_queue, index_queue_stats, reindex_reviews, review_id_slices,
+)
+from .search import (
+    add_review_facets, build_review_search, build_semantic_search, decode_search_cursor, embed_search_query,
+    encode_search_cursor,
+)
+from .testing import QueryBudgetMixin
 
 
 User = get_user_model()
 
 
+def search_response(rows, aggregations=None):
+    return {
+        "aggregations": aggregations or {},
+        "took": 1,
+        "timed_out": False,
+        "hits": {
+            "total": {"value": len(rows), "relation": "eq"},
+            "max_score": max((row["score"] for row in rows), default=None),
+            "hits": [
+                {
+                    "_index": "reviews",
+                    "_id": str(row["id"]),
+                    "_score": row["score"],
+                    "_source": {
+                        **{key: value for key, value in row.items() if key != "score"},
+                        "institution": row["institution"],
+                        "event": row["event"],
+                        "canonical": row["canonical"],
+                    },
+                    "highlight": {"text": [f"<em>{row['text']}</em>"]},
+                    "sort": [row["score"], row["reviewed_at"], row["id"]],
+                }
+                for row in rows
+            ],
+        },
+    }
+
+
 class InstitutionCRUDTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(
             username="testuser",
@@ -88,6 +151,7 @@ class InstitutionCRUDTests(TestCase):
 
 class EventCRUDTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(
             username="testuser",
@@ -127,6 +191,7 @@ class EventCRUDTests(TestCase):
 
 class ReviewCRUDTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(
             username="testuser",
@@ -166,7 +231,7 @@ class ReviewCRUDTests(TestCase):
     def test_get_reviews_list(self):
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_create_review(self):
         response = self.client.post(self.list_url, self.review_data)
@@ -191,6 +256,1225 @@ class ReviewCRUDTests(TestCase):
         self.assertEqual(Review.objects.count(), 0)
 
 
+class ReviewTextHashTests(TestCase):
+    def test_legacy_duplicate_can_be_saved(self):
+        institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        reviewed_at = datetime.datetime(2025, 10, 3, tzinfo=datetime.timezone.utc)
+        Review.objects.create(institution=institution, text="Отличный театр!", reviewed_at=reviewed_at)
+        legacy = Review.objects.create(institution=institution, text="Черновик", reviewed_at=reviewed_at)
+        Review.objects.filter(pk=legacy.pk).update(text="Отличный театр!", text_hash=None)
+
+        legacy.refresh_from_db()
+        legacy.sentiment = "negative"
+        legacy.save()
+
+        legacy.refresh_from_db()
+        self.assertIsNone(legacy.text_hash)
+        self.assertEqual(legacy.sentiment, "negative")
+
+    def test_edited_text_is_rehashed(self):
+        institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        reviewed_at = datetime.datetime(2025, 10, 3, tzinfo=datetime.timezone.utc)
+        review = Review.objects.create(institution=institution, text="Черновик", reviewed_at=reviewed_at)
+
+        review.text = "Отличный театр!"
+        review.save()
+        self.assertEqual(Review.objects.get(pk=review.pk).text_hash, review_text_hash("Отличный театр!"))
+
+        review = Review.objects.get(pk=review.pk)
+        review.text = "Отличный театр, хороший звук"
+        review.save(update_fields=["text"])
+        self.assertEqual(Review.objects.get(pk=review.pk).text_hash, review_text_hash("Отличный театр, хороший звук"))
+
+        review.text = "Отличный ***, хороший звук"
+        review.save(rehash=False)
+        self.assertEqual(Review.objects.get(pk=review.pk).text_hash, review_text_hash("Отличный театр, хороший звук"))
+
+        other = Review.objects.create(institution=institution, text="Другой отзыв", reviewed_at=reviewed_at)
+        serializer = ReviewSerializer(other, data={"text": "Отличный театр, хороший звук"}, partial=True)
+        self.assertFalse(serializer.is_valid())
+
+
+class ReviewListPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpass123")
+        self.client.force_authenticate(user=self.user)
+
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        self.other_institution = Institution.objects.create(name="Другой театр", address="Тестовая улица, 2")
+        self.event = Event.objects.create(
+            name="Тестовое мероприятие",
+            date=datetime.datetime(2025, 10, 1, tzinfo=datetime.timezone.utc)
+        )
+
+        same_moment = datetime.datetime(2025, 10, 5, tzinfo=datetime.timezone.utc)
+        for number in range(7):
+            Review.objects.create(
+                institution=self.institution,
+                event=self.event if number % 2 else None,
+                text=f"Отзыв номер {number}",
+                source="yandex" if number < 4 else "2gis",
+                sentiment="positive" if number % 3 else "negative",
+                reviewed_at=same_moment if number < 3 else same_moment + datetime.timedelta(days=number),
+            )
+        Review.objects.create(
+            institution=self.other_institution,
+            text="Отзыв о другом театре",
+            source="yandex",
+            reviewed_at=same_moment,
+        )
+        self.list_url = reverse("review-list")
+
+    def collect_pages(self, params):
+        ids, cursor = [], None
+        while True:
+            response = self.client.get(self.list_url, {**params, **({"cursor": cursor} if cursor else {})})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(review["id"] for review in response.data["results"])
+            cursor = response.data["next_cursor"]
+            if cursor is None:
+                return ids
+
+    def test_cursor_walks_all_reviews_without_gaps_or_repeats(self):
+        ids = self.collect_pages({"limit": 2})
+
+        expected = list(
+            Review.objects.order_by("-reviewed_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_filters(self):
+        ids = self.collect_pages({"institution": self.institution.id, "source": "yandex", "limit": 3})
+        self.assertEqual(len(ids), 4)
+
+        response = self.client.get(self.list_url, {"event": self.event.id, "sentiment": "positive"})
+        self.assertEqual(
+            {review["id"] for review in response.data["results"]},
+            set(Review.objects.filter(event=self.event, sentiment="positive").values_list("id", flat=True)),
+        )
+
+        response = self.client.get(self.list_url, {"date_from": "2025-10-09", "date_to": "2025-10-11"})
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_count_is_optional(self):
+        response = self.client.get(self.list_url, {"institution": self.other_institution.id})
+        self.assertNotIn("count", response.data)
+
+        response = self.client.get(self.list_url, {"institution": self.other_institution.id, "count": "true"})
+        self.assertEqual(response.data["count"], 1)
+
+    def test_invalid_parameters(self):
+        for params in ({"cursor": "broken"}, {"limit": "0"}, {"institution": "abc"}, {"date_from": "вчера"}):
+            response = self.client.get(self.list_url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReviewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpass123")
+        self.client.force_authenticate(user=self.user)
+
+        self.reviews = []
+        for number in range(30):
+            institution = Institution.objects.create(name=f"Театр {number}", address="Тестовая улица, 1")
+            event = Event.objects.create(
+                name=f"Мероприятие {number}",
+                date=datetime.datetime(2025, 10, 1, tzinfo=datetime.timezone.utc)
+            )
+            self.reviews.append(Review.objects.create(
+                institution=institution,
+                event=event,
+                text=f"Отзыв номер {number}",
+                source="yandex",
+                reviewed_at=datetime.datetime(2025, 10, 1, tzinfo=datetime.timezone.utc),
+            ))
+
+    def test_review_list(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse("review-list"), {"limit": 30})
+        self.assertEqual(len(response.data["results"]), 30)
+        self.assertTrue(all(review["event_name"] for review in response.data["results"]))
+
+    def test_review_detail(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get(reverse("review-detail", kwargs={"pk": self.reviews[0].pk}))
+        self.assertEqual(response.data["institution_name"], "Театр 0")
+
+    def test_review_search(self):
+        raw = search_response([
+            {**serialize_reviews([review])[0], "score": 1.0} for review in self.reviews
+        ])
+        with mock.patch.object(
+            ReviewSearchClass, "execute", autospec=True, side_effect=lambda search: OpenSearchResponse(search, raw)
+        ):
+            with self.assertQueryBudget(0):
+                response = self.client.get(reverse("review-search"), {"q": "отзыв", "size": 30})
+        self.assertEqual(response.data["count"], 30)
+
+
+class ReviewFastSerializationTests(TestCase):
+    def setUp(self):
+        institution = Institution.objects.create(name="Театр «Тест»", address="Тестовая улица, 1")
+        event = Event.objects.create(
+            name="Мероприятие",
+            date=datetime.datetime(2025, 10, 1, tzinfo=datetime.timezone.utc)
+        )
+        Review.objects.create(
+            institution=institution,
+            event=event,
+            text="Отличный звук\u2028и свет \"на высоте\"",
+            sentiment="positive",
+            confidence=0.9731,
+            positive_aspects=["звук", "свет"],
+            source="yandex",
+            source_external_id="yandex_1",
+            reviewed_at=datetime.datetime(2025, 10, 3, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        )
+        Review.objects.create(
+            institution=institution,
+            text="Без мероприятия",
+            source="vk",
+            reviewed_at=datetime.datetime(2025, 10, 4, tzinfo=datetime.timezone(datetime.timedelta(hours=5))),
+        )
+        self.queryset = Review.objects.order_by("id")
+
+    def test_rows_match_review_serializer(self):
+        expected = JSONRenderer().render(ReviewSerializer(self.queryset.with_related(), many=True).data)
+
+        self.assertEqual(ORJSONRenderer().render(serialize_review_rows(review_rows(self.queryset))), expected)
+        self.assertEqual(ORJSONRenderer().render(serialize_reviews(self.queryset.with_related())), expected)
+
+    def test_renderer_matches_json_renderer(self):
+        data = {"results": [{"id": 1, "score": 0.5, "tags": ("a", "б")}], 2: None, "moment": datetime.datetime(2025, 1, 1)}
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            ORJSONRenderer().render(data, "application/json; indent=2"),
+            JSONRenderer().render(data, "application/json; indent=2"),
+        )
+
+
+class ReviewExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpass123")
+        self.client.force_authenticate(user=self.user)
+
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        for number in range(5):
+            Review.objects.create(
+                institution=self.institution,
+                text=f"=Отзыв номер {number}, \"в кавычках\"",
+                source="yandex" if number % 2 else "vk",
+                sentiment="positive",
+                confidence=0.9,
+                positive_aspects=["актёры", "звук"],
+                reviewed_at=datetime.datetime(2025, 10, 1 + number, 12, tzinfo=datetime.timezone.utc),
+            )
+
+    def test_csv_export_is_streamed(self):
+        response = self.client.get(reverse("review-export", kwargs={"export_format": "csv"}), {"source": "yandex"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment;", response["Content-Disposition"])
+
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0][:3], ["ID", "Учреждение", "Мероприятие"])
+        self.assertEqual([row[9] for row in rows[1:]], ["'=Отзыв номер 3, \"в кавычках\"", "'=Отзыв номер 1, \"в кавычках\""])
+        self.assertEqual((rows[1][4], rows[1][7]), ("2025-10-04 12:00:00", "актёры; звук"))
+
+    def test_csv_export_escapes_formulas(self):
+        rows = [[1, "+7 999", "-1", "@SUM(A1)", "обычный текст", None, 0.5]]
+
+        content = "".join(stream_csv(rows))
+
+        self.assertEqual(
+            list(csv.reader(io.StringIO(content)))[1], ["1", "'+7 999", "'-1", "'@SUM(A1)", "обычный текст", "", "0.5"]
+        )
+
+    def test_xlsx_export(self):
+        response = self.client.get(reverse("review-export", kwargs={"export_format": "xlsx"}))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        worksheet = load_workbook(io.BytesIO(b"".join(response.streaming_content))).active
+        rows = list(worksheet.iter_rows(values_only=True))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual((rows[1][1], rows[1][9]), ("Тестовый театр", '=Отзыв номер 4, "в кавычках"'))
+
+    def test_export_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = f"{directory}/reviews.csv"
+            call_command("export_reviews", output, date_from="2025-10-02", chunk_size=2, stdout=io.StringIO())
+
+            with open(output, encoding="utf-8-sig", newline="") as fileobj:
+                self.assertEqual(len(list(csv.reader(fileobj))), 5)
+
+    def test_invalid_parameters(self):
+        response = self.client.get(reverse("review-export", kwargs={"export_format": "pdf"}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse("review-export", kwargs={"export_format": "csv"}), {"date_to": "завтра"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReviewSentimentAnalyticsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpass123")
+        self.client.force_authenticate(user=self.user)
+
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        self.list_url = reverse("review-list")
+        self.analytics_url = reverse("review-sentiment-analytics")
+
+        reviews = [
+            ("2025-10-06T10:00:00Z", "positive", 0.9, "yandex"),
+            ("2025-10-06T18:00:00Z", "negative", 0.7, "yandex"),
+            ("2025-10-08T12:00:00Z", "positive", 0.8, "vk"),
+            ("2025-10-13T12:00:00Z", "neutral", None, "yandex"),
+            ("2025-11-02T12:00:00Z", "positive", 0.6, "vk"),
+        ]
+        for number, (reviewed_at, sentiment, confidence, source) in enumerate(reviews):
+            data = {
+                "institution": self.institution.id,
+                "text": f"Отзыв номер {number}",
+                "reviewed_at": reviewed_at,
+                "sentiment": sentiment,
+                "source": source,
+            }
+            if confidence is not None:
+                data["confidence"] = confidence
+            response = self.client.post(self.list_url, data)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def get_results(self, **params):
+        response = self.client.get(self.analytics_url, {"institution": self.institution.id, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["results"]
+
+    def test_daily_buckets(self):
+        results = self.get_results()
+
+        self.assertEqual([str(row["period"]) for row in results], ["2025-10-06", "2025-10-08", "2025-10-13", "2025-11-02"])
+        self.assertEqual((results[0]["positive"], results[0]["negative"], results[0]["total"]), (1, 1, 2))
+        self.assertAlmostEqual(results[0]["mean_confidence"], 0.8)
+        self.assertIsNone(results[2]["mean_confidence"])
+
+    def test_week_and_month_buckets(self):
+        weeks = self.get_results(bucket="week")
+        self.assertEqual([(str(row["period"]), row["total"]) for row in weeks], [
+            ("2025-10-06", 3), ("2025-10-13", 1), ("2025-10-27", 1),
+        ])
+
+        months = self.get_results(bucket="month", group_by="source", date_to="2025-10-31")
+        self.assertEqual(
+            [(str(row["period"]), row["source"], row["positive"], row["total"]) for row in months],
+            [("2025-10-01", "vk", 1, 1), ("2025-10-01", "yandex", 1, 3)],
+        )
+
+    def test_stats_follow_updates_and_deletes(self):
+        review = Review.objects.get(text="Отзыв номер 1")
+        detail_url = reverse("review-detail", kwargs={"pk": review.pk})
+
+        response = self.client.put(detail_url, {
+            "institution": self.institution.id,
+            "text": review.text,
+            "reviewed_at": "2025-10-06T18:00:00Z",
+            "sentiment": "positive",
+            "confidence": 0.5,
+            "source": "yandex",
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_results()[0]["positive"], 2)
+
+        self.client.delete(reverse("review-detail", kwargs={"pk": Review.objects.get(text="Отзыв номер 3").pk}))
+        self.assertEqual([str(row["period"]) for row in self.get_results()], ["2025-10-06", "2025-10-08", "2025-11-02"])
+
+    def test_near_duplicates_are_counted_once(self):
+        canonical = Review.objects.get(text="Отзыв номер 4")
+        Review.objects.create(
+            institution=self.institution,
+            text="Отзыв номер 4, репост",
+            canonical=canonical,
+            sentiment="positive",
+            source="yandex",
+            reviewed_at=canonical.reviewed_at,
+        )
+        rebuild_daily_stats()
+        self.assertEqual(self.get_results()[-1]["total"], 1)
+
+        self.client.delete(reverse("review-detail", kwargs={"pk": canonical.pk}))
+        [promoted] = ReviewDailyStats.objects.filter(date=datetime.date(2025, 11, 2))
+        self.assertEqual((promoted.source, promoted.positive_count), ("yandex", 1))
+
+    def test_deleting_an_event_keeps_its_reviews_in_the_stats(self):
+        event = Event.objects.create(name="Премьера", date=datetime.datetime(2025, 10, 1, tzinfo=datetime.timezone.utc))
+        review = Review.objects.get(text="Отзыв номер 4")
+        with track_daily_stats(review):
+            Review.objects.filter(pk=review.pk).update(event=event)
+        self.assertEqual(list(ReviewDailyStats.objects.filter(event=event).values_list("positive_count")), [(1,)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event.delete()
+
+        self.assertEqual(
+            list(ReviewDailyStats.objects.filter(date=datetime.date(2025, 11, 2)).values_list("event", "positive_count")),
+            [(None, 1)],
+        )
+
+    def test_rebuild_matches_incremental_rollup(self):
+        fields = ["institution_id", "event_id", "source", "date", "positive_count", "negative_count",
+                  "neutral_count", "confidence_sum", "confidence_count"]
+        incremental = sorted(ReviewDailyStats.objects.values_list(*fields))
+
+        rebuild_daily_stats()
+
+        self.assertEqual(sorted(ReviewDailyStats.objects.values_list(*fields)), incremental)
+
+    def test_invalid_parameters(self):
+        for params in ({"bucket": "year"}, {"group_by": "text"}, {"date_from": "вчера"}):
+            response = self.client.get(self.analytics_url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReviewTopAspectsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpass123")
+        self.client.force_authenticate(user=self.user)
+
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        other_institution = Institution.objects.create(name="Другой театр", address="Тестовая улица, 2")
+        reviews = [
+            (self.institution, "2025-10-03", "yandex", ["актёры", "звук"], ["буфет"]),
+            (self.institution, "2025-10-04", "vk", ["актёры"], ["буфет", "гардероб"]),
+            (self.institution, "2025-10-20", "yandex", [], ["буфет", "звук"]),
+            (other_institution, "2025-10-04", "yandex", [], ["гардероб", "гардероб"]),
+        ]
+        for number, (institution, reviewed_at, source, positive, negative) in enumerate(reviews):
+            response = self.client.post(reverse("review-list"), {
+                "institution": institution.id,
+                "text": f"Отзыв номер {number}",
+                "reviewed_at": reviewed_at,
+                "source": source,
+                "positive_aspects": positive,
+                "negative_aspects": negative,
+            }, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.url = reverse("review-top-aspects")
+
+    def get_results(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(row["aspect"], row["polarity"], row["count"]) for row in response.data["results"]]
+
+    def test_top_aspects(self):
+        self.assertEqual(self.get_results(institution=self.institution.id, limit=3), [
+            ("буфет", "negative", 3), ("актёры", "positive", 2), ("гардероб", "negative", 1),
+        ])
+
+    def test_filters(self):
+        self.assertEqual(
+            self.get_results(polarity="negative", date_from="2025-10-01", date_to="2025-10-10"),
+            [("буфет", "negative", 2), ("гардероб", "negative", 2)],
+        )
+        self.assertEqual(
+            self.get_results(institution=self.institution.id, source="yandex", polarity="positive"),
+            [("актёры", "positive", 1), ("звук", "positive", 1)],
+        )
+
+    def test_near_duplicates_are_counted_once(self):
+        canonical = Review.objects.get(text="Отзыв номер 0")
+        duplicate = Review.objects.create(
+            institution=self.institution,
+            text="Отзыв номер 0, репост",
+            canonical=canonical,
+            source="vk",
+            positive_aspects=canonical.positive_aspects,
+            negative_aspects=canonical.negative_aspects,
+            reviewed_at=canonical.reviewed_at,
+        )
+        sync_review_aspects([duplicate])
+
+        self.assertEqual(self.get_results(institution=self.institution.id, limit=2), [
+            ("буфет", "negative", 3), ("актёры", "positive", 2),
+        ])
+
+    def test_backfill_rebuilds_links(self):
+        ReviewAspect.objects.all().delete()
+
+        call_command("backfill_review_aspects", batch_size=2, stdout=io.StringIO())
+
+        self.assertEqual(ReviewAspect.objects.count(), 9)
+        self.assertEqual(self.get_results(institution=self.institution.id, limit=1), [("буфет", "negative", 3)])
+
+    def test_invalid_parameters(self):
+        for params in ({"polarity": "neutral"}, {"limit": "many"}, {"event": "abc"}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpass123")
+        self.client.force_authenticate(user=self.user)
+
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        self.review = Review.objects.create(
+            institution=self.institution,
+            text="Отличный театр",
+            source="yandex",
+            reviewed_at=datetime.datetime(2025, 10, 1, tzinfo=datetime.timezone.utc),
+        )
+        self.list_url = reverse("review-list")
+
+    def test_repeated_reads_are_served_from_cache(self):
+        first = self.client.get(self.list_url, {"source": "yandex"})
+
+        with self.assertQueryBudget(0):
+            second = self.client.get(self.list_url, {"source": "yandex"})
+
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertNotEqual(self.client.get(self.list_url, {"source": "vk"})["ETag"], first["ETag"])
+
+    def test_if_none_match(self):
+        etag = self.client.get(self.list_url)["ETag"]
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_cache_is_per_user(self):
+        etag = self.client.get(self.list_url)["ETag"]
+
+        other_user = User.objects.create_user(username="otheruser", email="other@example.com", password="testpass123")
+        self.client.force_authenticate(user=other_user)
+        self.assertNotEqual(self.client.get(self.list_url)["ETag"], etag)
+
+    def test_saves_invalidate_cached_responses(self):
+        etag = self.client.get(self.list_url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.institution.name = "Новое название"
+            self.institution.save()
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["institution_name"], "Новое название")
+
+    def test_bulk_updates_invalidate_cached_responses(self):
+        self.client.get(self.list_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.filter(pk=self.review.pk).update(sentiment="positive")
+            bump_version(REVIEWS_SCOPE)
+
+        self.assertEqual(self.client.get(self.list_url).data["results"][0]["sentiment"], "positive")
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_process_local_cache_is_bypassed(self):
+        self.client.get(self.list_url)
+        Review.objects.filter(pk=self.review.pk).update(sentiment="positive")
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.data["results"][0]["sentiment"], "positive")
+        self.assertNotIn("ETag", response)
+        self.assertEqual([error.id for error in check_response_cache(None)], ["reviews.W001"])
+
+    def test_errors_are_not_cached(self):
+        self.client.get(self.list_url, {"limit": "0"})
+
+        with self.assertQueryBudget(1):
+            response = self.client.get(self.list_url, {"limit": "0"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(REVIEW_EMBEDDING_BACKEND="hashing")
+class ReviewSearchTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpass123")
+        self.client.force_authenticate(user=self.user)
+
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        self.reviews = [
+            Review.objects.create(
+                institution=self.institution,
+                text=f"Отличный звук, отзыв номер {number}",
+                source="yandex",
+                sentiment="positive",
+                confidence=0.9,
+                positive_aspects=["звук"],
+                reviewed_at=datetime.datetime(2025, 10, 1 + number, tzinfo=datetime.timezone.utc),
+            )
+            for number in range(3)
+        ]
+        self.url = reverse("review-search")
+
+    def test_search_body(self):
+        body = build_review_search(
+            "звук",
+            {"institution": str(self.institution.id), "sentiment": "positive", "date_from": "2025-10-02"},
+            size=2,
+            offset=4,
+        ).to_dict()
+
+        self.assertEqual((body["from"], body["size"]), (4, 2))
+        self.assertEqual(body["query"]["bool"]["must"], [{"match": {"text": "звук"}}])
+        self.assertIn({"term": {"institution": self.institution.id}}, body["query"]["bool"]["filter"])
+        self.assertIn({"term": {"sentiment": "positive"}}, body["query"]["bool"]["filter"])
+        self.assertEqual(
+            body["query"]["bool"]["filter"][-1],
+            {"range": {"reviewed_at": {"gte": "2025-10-02T00:00:00+00:00"}}},
+        )
+        self.assertIn("text", body["highlight"]["fields"])
+        self.assertIn("institution_name", body["_source"])
+
+    def test_results_come_from_source(self):
+        rows = [
+            {**row, "score": 2.0 - number / 10}
+            for number, row in enumerate(serialize_reviews(self.reviews))
+        ]
+        raw = search_response(rows[:2])
+
+        with mock.patch.object(
+            ReviewSearchClass, "execute", autospec=True, side_effect=lambda search: OpenSearchResponse(search, raw)
+        ):
+            with self.assertQueryBudget(0):
+                response = self.client.get(self.url, {"q": "звук", "size": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first = response.data["results"][0]
+        self.assertEqual(
+            {key: value for key, value in first.items() if key not in ("score", "highlight")},
+            ReviewSerializer(self.reviews[0]).data,
+        )
+        self.assertEqual((first["score"], first["highlight"]), (2.0, [f"<em>{self.reviews[0].text}</em>"]))
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(decode_search_cursor(response.data["next_cursor"])[-1], self.reviews[1].id)
+
+    def test_cursor_uses_search_after(self):
+        sort_values = [1.5, "2025-10-01T00:00:00Z", 7]
+        body = build_review_search("звук", {}, size=2, cursor=encode_search_cursor(sort_values)).to_dict()
+
+        self.assertNotIn("from", body)
+        self.assertEqual(body["search_after"], sort_values)
+
+    def test_hashing_embedder(self):
+        embedder = HashingEmbedder(384)
+        heating, heater, parking = embedder.embed(["Не работало отопление", "отопления нет", "Удобная парковка"])
+
+        self.assertEqual(len(heating), 384)
+        self.assertAlmostEqual(sum(value * value for value in heating), 1.0)
+        self.assertEqual(embedder.embed(["Не работало отопление"]), [heating])
+        similarity = lambda first, second: sum(a * b for a, b in zip(first, second))
+        self.assertGreater(similarity(heating, heater), similarity(heating, parking))
+
+    def test_semantic_search_body(self):
+        search = build_semantic_search("холодно в зале", {"institution": str(self.institution.id)}, size=5, offset=10)
+        body = search.to_dict()
+
+        lexical, knn = body["query"]["hybrid"]["queries"]
+        institution_filter = {"term": {"institution": self.institution.id}}
+        self.assertEqual(lexical["bool"]["must"], [{"match": {"text": "холодно в зале"}}])
+        self.assertEqual(lexical["bool"]["filter"], [institution_filter])
+        self.assertEqual(knn["knn"]["text_embedding"]["filter"], {"bool": {"filter": [institution_filter]}})
+        self.assertEqual(knn["knn"]["text_embedding"]["k"], 100)
+        self.assertEqual(len(knn["knn"]["text_embedding"]["vector"]), 384)
+        self.assertEqual((body["from"], body["size"]), (10, 5))
+        self.assertEqual(search._params["search_pipeline"], "reviews-hybrid")
+
+    def test_query_embeddings_are_cached(self):
+        with mock.patch.object(HashingEmbedder, "embed", autospec=True, return_value=[[1.0, 0.0]]) as embed:
+            first = embed_search_query("Холодно в  зале")
+            second = embed_search_query("холодно в зале")
+
+        self.assertEqual(first, second)
+        embed.assert_called_once()
+
+    def test_semantic_search_endpoint(self):
+        url = reverse("review-semantic-search")
+        self.assertEqual(self.client.get(url).data, {"results": [], "count": 0, "query": ""})
+
+        rows = [{**row, "score": 0.8} for row in serialize_reviews(self.reviews[:1])]
+        raw = search_response(rows)
+        with mock.patch.object(
+            ReviewSearchClass, "execute", autospec=True, side_effect=lambda search: OpenSearchResponse(search, raw)
+        ):
+            with self.assertQueryBudget(0):
+                response = self.client.get(url, {"q": "хороший звук", "size": 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["id"], self.reviews[0].id)
+        self.assertEqual(response.data["count"], 1)
+
+    def test_semantic_search_without_pipeline(self):
+        error = RequestError(400, "illegal_argument_exception", {
+            "error": {"reason": "Pipeline reviews-hybrid is not defined"},
+        })
+        with mock.patch.object(ReviewSearchClass, "execute", side_effect=error):
+            response = self.client.get(reverse("review-semantic-search"), {"q": "хороший звук"})
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn("create_search_pipeline", response.data["error"])
+
+        client = mock.MagicMock()
+        with mock.patch.object(ReviewDocument, "_get_connection", return_value=client):
+            call_command("create_search_pipeline", stdout=io.StringIO())
+        self.assertEqual(client.search_pipeline.put.call_args.kwargs["id"], "reviews-hybrid")
+
+    def test_document_indexes_nested_aspects(self):
+        review = self.reviews[0]
+        review.negative_aspects = ["буфет", "буфет"]
+
+        document = ReviewDocument().prepare(review)
+
+        self.assertEqual(document["aspects"], [
+            {"name": "звук", "polarity": "positive"}, {"name": "буфет", "polarity": "negative"},
+        ])
+        self.assertEqual((document["institution_name"], document["sentiment"]), ("Тестовый театр", "positive"))
+
+    def test_facet_aggregations_body(self):
+        body = add_review_facets(build_review_search("", {"source": "yandex"}), facet_size=5).to_dict()
+
+        self.assertNotIn("must", body["query"]["bool"])
+        self.assertEqual(body["aggs"]["sentiment"], {"terms": {"field": "sentiment", "size": 5}})
+        self.assertEqual(body["aggs"]["aspects"]["nested"], {"path": "aspects"})
+        self.assertEqual(
+            body["aggs"]["aspects"]["aggs"]["polarity"]["aggs"]["name"],
+            {"terms": {"field": "aspects.name", "size": 5}},
+        )
+
+    def test_faceted_search_returns_hits_and_counts(self):
+        def buckets(*pairs):
+            return {"buckets": [{"key": key, "doc_count": count} for key, count in pairs]}
+
+        aggregations = {
+            "sentiment": buckets(("positive", 3)),
+            "source": buckets(("yandex", 3)),
+            "institution": buckets((self.institution.id, 3)),
+            "event": buckets(),
+            "reviewed_at": {"buckets": [
+                {"key_as_string": "2025-10-01T00:00:00.000Z", "key": 1759276800000, "doc_count": 3},
+            ]},
+            "aspects": {"doc_count": 3, "polarity": {"buckets": [
+                {"key": "positive", "doc_count": 3, "name": buckets(("звук", 3))},
+            ]}},
+        }
+        raw = search_response([{**serialize_reviews([self.reviews[0]])[0], "score": 1.0}], aggregations)
+
+        with mock.patch.object(
+            ReviewSearchClass, "execute", autospec=True, side_effect=lambda search: OpenSearchResponse(search, raw)
+        ):
+            with self.assertQueryBudget(0):
+                response = self.client.get(reverse("review-faceted-search"), {"sentiment": "positive"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        facets = response.data["facets"]
+        self.assertEqual(facets["sentiment"], [{"key": "positive", "count": 3}])
+        self.assertEqual(facets["aspects"], {"positive": [{"key": "звук", "count": 3}]})
+        self.assertEqual(facets["reviewed_at"], [{"key": "2025-10-01T00:00:00.000Z", "count": 3}])
+
+    def test_invalid_parameters(self):
+        response = self.client.get(reverse("review-faceted-search"), {"facet_size": "0"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        for params in ({"size": "0"}, {"from": "9990", "size": "20"}, {"cursor": "broken"}, {"institution": "abc"}):
+            response = self.client.get(self.url, {"q": "звук", **params})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(REVIEW_EMBEDDING_BACKEND="hashing")
+class ReviewIndexQueueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.queue = get_index_queue()
+        self.queue.clear()
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reviews = [
+                Review.objects.create(
+                    institution=self.institution,
+                    text=f"Отзыв номер {number}",
+                    source="yandex",
+                    reviewed_at=datetime.datetime(2025, 10, 1 + number, tzinfo=datetime.timezone.utc),
+                )
+                for number in range(3)
+            ]
+
+    def mock_bulk(self, errors=()):
+        return mock.patch.object(ReviewDocument, "bulk", autospec=True, return_value=(0, list(errors)))
+
+    def test_saves_are_queued_once_after_commit(self):
+        self.assertEqual(self.queue.size(), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reviews[0].sentiment = "positive"
+            self.reviews[0].save()
+            self.reviews[0].save()
+        self.assertEqual(self.queue.size(), 3)
+
+    def test_flush_indexes_and_deletes_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted_id = self.reviews[2].pk
+            self.reviews[2].delete()
+
+        with self.mock_bulk() as bulk, self.captureOnCommitCallbacks(execute=True):
+            result = flush_index_queue(batch_size=2)
+
+        self.assertEqual(result["indexed"], 3)
+        self.assertEqual(result["batches"], 2)
+        self.assertEqual(self.queue.size(), 0)
+        actions = [action for call in bulk.call_args_list for action in call.args[1]]
+        self.assertEqual(
+            sorted((action["_op_type"], action["_id"]) for action in actions),
+            [("delete", deleted_id), ("index", self.reviews[0].pk), ("index", self.reviews[1].pk)],
+        )
+        indexed = next(action for action in actions if action["_id"] == self.reviews[0].pk)
+        self.assertEqual(indexed["_source"]["institution_name"], "Тестовый театр")
+
+    def test_failed_batches_are_requeued(self):
+        with self.mock_bulk() as bulk:
+            bulk.side_effect = OpenSearchConnectionError("N/A", "unreachable", None)
+            with self.assertRaises(OpenSearchConnectionError):
+                flush_index_queue()
+        self.assertEqual(self.queue.size(), 3)
+
+        failed_id = self.reviews[1].pk
+        errors = [{"index": {"_id": str(failed_id), "status": 429}}]
+        with self.mock_bulk(errors), self.assertRaises(ReviewIndexingError):
+            flush_index_queue()
+        self.assertEqual(self.queue.pop(10)[0][0], failed_id)
+
+    def test_missing_documents_are_not_retried(self):
+        self.queue.clear()
+        self.queue.add([987654], 0.0)
+
+        errors = [{"delete": {"_id": "987654", "status": 404}}]
+        with self.mock_bulk(errors):
+            self.assertEqual(flush_index_queue()["indexed"], 1)
+        self.assertEqual(self.queue.size(), 0)
+
+    @override_settings(REVIEW_INDEX_BATCH_SIZE=4)
+    def test_full_queue_schedules_a_single_flush(self):
+        with mock.patch("reviews.tasks.flush_review_index.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.institution.name = "Новое название"
+                self.institution.save()
+                Review.objects.create(
+                    institution=self.institution,
+                    text="Ещё один отзыв",
+                    source="yandex",
+                    reviewed_at=datetime.datetime(2025, 10, 9, tzinfo=datetime.timezone.utc),
+                )
+                Review.objects.create(
+                    institution=self.institution,
+                    text="И ещё один отзыв",
+                    source="yandex",
+                    reviewed_at=datetime.datetime(2025, 10, 10, tzinfo=datetime.timezone.utc),
+                )
+
+        self.assertEqual(self.queue.size(), 5)
+        delay.assert_called_once_with()
+
+    def test_index_status_reports_lag(self):
+        self.queue.clear()
+        self.queue.add([self.reviews[0].pk], 0.0)
+        self.assertGreater(index_queue_stats()["lag_seconds"], 0)
+
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(username="testuser", password="testpass123"))
+        self.assertEqual(client.get(reverse("review-index-status")).status_code, status.HTTP_403_FORBIDDEN)
+
+        client.force_authenticate(
+            user=User.objects.create_superuser(username="admin", email="admin@example.com", password="testpass123")
+        )
+        response = client.get(reverse("review-index-status"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["pending"], 1)
+
+
+@override_settings(REVIEW_EMBEDDING_BACKEND="hashing")
+class ReviewReindexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_index_queue().clear()
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        self.reviews = [
+            Review.objects.create(
+                institution=self.institution,
+                text=f"Отзыв номер {number}",
+                source="yandex",
+                reviewed_at=datetime.datetime(2025, 10, 1 + number, tzinfo=datetime.timezone.utc),
+            )
+            for number in range(5)
+        ]
+        self.client = mock.MagicMock()
+        self.client.indices.exists_alias.return_value = True
+        self.client.indices.get_alias.return_value = {"reviews-20250101000000": {"aliases": {"reviews": {}}}}
+
+    def reindex(self, bulk_side_effect=None, **kwargs):
+        with mock.patch.object(ReviewDocument, "_get_connection", return_value=self.client), \
+                mock.patch.object(ReviewDocument, "bulk", autospec=True, return_value=(0, [])) as bulk:
+            bulk.side_effect = bulk_side_effect
+            return reindex_reviews(**kwargs), bulk
+
+    def test_id_slices_cover_all_reviews(self):
+        slices = review_id_slices(2)
+        self.assertEqual(slices[0][0], self.reviews[0].pk)
+        self.assertEqual(slices[-1][1], self.reviews[-1].pk)
+        self.assertEqual(sum(last - first + 1 for first, last in slices), len(self.reviews))
+
+    def test_new_index_is_loaded_and_alias_switched(self):
+        result, bulk = self.reindex(workers=1, batch_size=2)
+
+        index = result["index"]
+        self.assertEqual(result["indexed"], 5)
+        self.assertEqual(result["replaced"], ["reviews-20250101000000"])
+        created = self.client.indices.create.call_args.kwargs
+        self.assertEqual(created["index"], index)
+        self.assertEqual(created["body"]["settings"]["refresh_interval"], "-1")
+        self.assertIn("aspects", created["body"]["mappings"]["properties"])
+        self.assertEqual(created["body"]["mappings"]["properties"]["text_embedding"]["type"], "knn_vector")
+        self.assertNotIn("refresh_interval", ReviewDocument._index.to_dict()["settings"])
+
+        self.assertEqual(bulk.call_count, 3)
+        self.assertEqual({action["_index"] for call in bulk.call_args_list for action in call.args[1]}, {index})
+        self.client.search_pipeline.put.assert_called_once()
+        self.client.indices.put_settings.assert_called_once_with(
+            index=index, body={"refresh_interval": None, "number_of_replicas": 0}
+        )
+        self.client.indices.update_aliases.assert_called_once_with(body={"actions": [
+            {"remove": {"index": "reviews-20250101000000", "alias": "reviews"}},
+            {"add": {"index": index, "alias": "reviews"}},
+        ]})
+        self.client.indices.delete.assert_called_once_with(index="reviews-20250101000000", ignore_unavailable=True)
+
+    def test_concrete_index_is_replaced_by_alias(self):
+        self.client.indices.exists_alias.return_value = False
+        self.client.indices.exists.return_value = True
+
+        result, _ = self.reindex(workers=1)
+
+        self.assertEqual(result["replaced"], [])
+        self.client.indices.update_aliases.assert_called_once_with(body={"actions": [
+            {"add": {"index": result["index"], "alias": "reviews"}},
+            {"remove_index": {"index": "reviews"}},
+        ]})
+        self.client.indices.delete.assert_not_called()
+
+    def test_changes_during_reindex_are_caught_up(self):
+        edited = self.reviews[0]
+        edits = []
+
+        def edit_during_load(document, actions, **kwargs):
+            if not edits and any(action["_id"] == edited.pk for action in actions):
+                edits.append(edited.pk)
+                Review.objects.filter(pk=edited.pk).update(text="Исправленный отзыв")
+                get_index_queue().add([edited.pk], 0.0)
+                flush_index_queue()
+            return 0, []
+
+        result, bulk = self.reindex(edit_during_load, workers=1, batch_size=2)
+
+        documents = [
+            action["_source"]["text"]
+            for call in bulk.call_args_list
+            for action in call.args[1]
+            if action["_index"] == result["index"] and action["_id"] == edited.pk
+        ]
+        self.assertEqual(documents, ["Отзыв номер 0", "Исправленный отзыв"])
+        self.assertEqual(get_index_queue(f"review-index:catch-up:{result['index']}").size(), 0)
+
+    def test_failed_load_drops_new_index(self):
+        with self.assertRaises(OpenSearchConnectionError):
+            self.reindex(OpenSearchConnectionError("N/A", "unreachable", None), workers=1)
+
+        index = self.client.indices.create.call_args.kwargs["index"]
+        self.client.indices.delete.assert_called_once_with(index=index, ignore_unavailable=True)
+        self.client.indices.update_aliases.assert_not_called()
+
+
+class ReviewQueryPlanTests(TestCase):
+    def setUp(self):
+        institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        self.canonical = Review.objects.create(
+            institution=institution,
+            text="Отличный звук",
+            source="yandex",
+            reviewed_at=datetime.datetime(2025, 10, 1, tzinfo=datetime.timezone.utc),
+        )
+        self.duplicate = Review.objects.create(
+            institution=institution,
+            text="Отличный звук!!",
+            source="vk",
+            sentiment="positive",
+            canonical=self.canonical,
+            reviewed_at=datetime.datetime(2025, 10, 2, tzinfo=datetime.timezone.utc),
+        )
+
+    def test_pending_reviews(self):
+        self.assertEqual(list(Review.objects.pending()), [self.canonical])
+
+    def test_benchmark_queries_run(self):
+        queries = review_queries(self.canonical, self.canonical.pk)
+
+        self.assertEqual(len({name for name, *_ in queries}), len(queries))
+        results = {name: list(queryset) for name, queryset, *_ in queries}
+        self.assertEqual(results["duplicates of a review"], [self.duplicate.pk])
+        self.assertEqual(results["pending reviews"], [self.canonical.pk])
+        self.assertEqual(results["review list, next page"], [])
+
+    def test_check_plan(self):
+        plan = [{
+            "Plan": {
+                "Node Type": "Limit",
+                "Plans": [{
+                    "Node Type": "Sort",
+                    "Plans": [{"Node Type": "Seq Scan", "Relation Name": "reviews_review"}],
+                }],
+            },
+            "Execution Time": 812.5,
+        }]
+        elapsed, indexes, problems = check_plan(json.dumps(plan), ["review_reviewed_at_idx"], allow_sort=False)
+        self.assertEqual((elapsed, indexes), (812.5, []))
+        self.assertEqual(len(problems), 3)
+
+        plan = [{
+            "Plan": {
+                "Node Type": "Limit",
+                "Plans": [{"Node Type": "Index Scan", "Index Name": "review_reviewed_at_idx"}],
+            },
+            "Execution Time": 0.2,
+        }]
+        self.assertEqual(check_plan(plan, ["review_reviewed_at_idx"], allow_sort=False)[2], [])
+
+
+class ReviewPartitionTests(SimpleTestCase):
+    def test_partition_ranges(self):
+        first = datetime.datetime(2024, 11, 20, tzinfo=datetime.timezone.utc)
+        last = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+        monthly = partition_ranges(first, last, "month")
+        self.assertEqual(
+            [name for name, *_ in monthly],
+            ["reviews_review_2024_11", "reviews_review_2024_12", "reviews_review_2025_01"],
+        )
+        self.assertEqual(monthly[1][1:], (datetime.datetime(2024, 12, 1, tzinfo=datetime.timezone.utc), last))
+        self.assertEqual([name for name, *_ in partition_ranges(first, last, "year")], [
+            "reviews_review_2024", "reviews_review_2025",
+        ])
+        for name, start, end in monthly + partition_ranges(first, last, "year"):
+            self.assertEqual(partition_bounds(name), (start, end))
+        self.assertIsNone(partition_bounds("reviews_review_default"))
+
+    @override_settings(REVIEW_PARTITION_INTERVAL="month", REVIEW_PARTITIONS_AHEAD=2)
+    def test_upcoming_partitions(self):
+        now = datetime.datetime(2025, 12, 15, tzinfo=datetime.timezone.utc)
+        with mock.patch("reviews.partitions.timezone.now", return_value=now):
+            ranges = upcoming_partition_ranges(since=datetime.datetime(2025, 11, 3, tzinfo=datetime.timezone.utc))
+
+        self.assertEqual([name for name, *_ in ranges], [
+            "reviews_review_2025_11", "reviews_review_2025_12", "reviews_review_2026_01", "reviews_review_2026_02",
+        ])
+
+    def test_check_plan_maps_partitions_to_parents(self):
+        plan = [{
+            "Plan": {
+                "Node Type": "Append",
+                "Plans": [
+                    {
+                        "Node Type": "Index Scan",
+                        "Index Name": f"{name}_institution_id_reviewed_at_id_idx",
+                        "Relation Name": name,
+                    }
+                    for name in ("reviews_review_2024_03", "reviews_review_2024_04")
+                ] + [{"Node Type": "Seq Scan", "Relation Name": "reviews_review_default", "Actual Rows": 0}],
+            },
+        }]
+        parents = {
+            "reviews_review_2024_03": "reviews_review",
+            "reviews_review_2024_04": "reviews_review",
+            "reviews_review_default": "reviews_review",
+            "reviews_review_2024_03_institution_id_reviewed_at_id_idx": "review_institution_list_idx",
+            "reviews_review_2024_04_institution_id_reviewed_at_id_idx": "review_institution_list_idx",
+        }
+
+        _, indexes, problems = check_plan(plan, ["review_institution_list_idx"], parents=parents)
+        self.assertEqual((indexes, problems), (["review_institution_list_idx"], []))
+        self.assertEqual(
+            check_plan(plan, ["review_institution_list_idx"], parents=parents, max_partitions=1)[2],
+            ["scanned 3 partitions"],
+        )
+
+    def test_partition_maintenance_is_skipped_without_postgresql(self):
+        self.assertFalse(is_partitioned())
+        self.assertEqual(ensure_review_partitions(), [])
+
+
+class ReadReplicaRouterTests(SimpleTestCase):
+    def test_reads_go_to_the_replica_only_inside_the_context(self):
+        router = ReadReplicaRouter()
+
+        self.assertIsNone(router.db_for_read(Review))
+        with reading_from("replica"):
+            self.assertEqual(router.db_for_read(Review), "replica")
+            self.assertEqual(router.db_for_write(Review), "default")
+            self.assertIsNone(router.db_for_read(Review))
+        self.assertIsNone(current_read_database())
+
+    @override_settings(READ_REPLICA_DATABASE="replica")
+    def test_replica_is_not_migrated(self):
+        router = ReadReplicaRouter()
+
+        self.assertFalse(router.allow_migrate("replica", "reviews"))
+        self.assertIsNone(router.allow_migrate("default", "reviews"))
+
+
+@override_settings(READ_REPLICA_DATABASE="default", RESPONSE_CACHE_ENABLED=True)
+class ReadReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", email="writer@example.com", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        Review.objects.create(
+            institution=self.institution,
+            text="Отличный звук",
+            source="yandex",
+            reviewed_at=datetime.datetime(2025, 10, 1, tzinfo=datetime.timezone.utc),
+        )
+        self.reads = []
+
+    def record_reads(self):
+        return mock.patch.object(
+            ReadReplicaRouter,
+            "db_for_read",
+            autospec=True,
+            side_effect=lambda router, model, **hints: self.reads.append(current_read_database()),
+        )
+
+    def test_reads_follow_the_users_own_writes(self):
+        reader = APIClient()
+        reader.force_authenticate(User.objects.create_user(
+            username="reader", email="reader@example.com", password="testpass123"
+        ))
+
+        with self.record_reads():
+            self.client.get(reverse("review-list"))
+            self.assertEqual(set(self.reads), {"default"})
+
+            response = self.client.post(reverse("institution-list"), {"name": "Новый театр", "address": "-"})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertIsNone(read_database_for(self.user))
+
+            self.reads.clear()
+            self.client.get(reverse("review-list"), {"limit": 10})
+            self.assertEqual(set(self.reads), {None})
+
+            self.reads.clear()
+            reader.get(reverse("review-list"))
+            self.assertEqual(set(self.reads), {"default"})
+
+    def test_replica_pages_are_not_cached_right_after_a_write(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_version(REVIEWS_SCOPE)
+
+        with self.record_reads():
+            first = self.client.get(reverse("review-list"))
+            self.assertNotIn("ETag", first)
+            self.reads.clear()
+            self.client.get(reverse("review-list"))
+            self.assertEqual(set(self.reads), {"default"})
+
+            cache.delete_many([f"response-version-bumped:{REVIEWS_SCOPE}"])
+            self.assertIn("ETag", self.client.get(reverse("review-list")))
+            self.reads.clear()
+            self.client.get(reverse("review-list"))
+            self.assertEqual(self.reads, [])
+
+    def test_streamed_export_reads_from_the_replica(self):
+        with self.record_reads():
+            response = self.client.get(reverse("review-export", kwargs={"export_format": "csv"}))
+            self.assertEqual(self.reads, [])
+            content = b"".join(response.streaming_content).decode("utf-8-sig")
+
+        self.assertIn("Отличный звук", content)
+        self.assertEqual(set(self.reads), {"default"})
+
+
+@override_settings(REQUEST_PROFILING_ENABLED=True, REQUEST_PROFILING_SAMPLE_RATE=1.0, REQUEST_PROFILING_SLOW_MS=60000)
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_profile_store().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="testpass123"
+        ))
+        institution = Institution.objects.create(name="Тестовый театр", address="Тестовая улица, 1")
+        for number in range(3):
+            Review.objects.create(
+                institution=institution,
+                text=f"Отзыв номер {number}",
+                source="yandex",
+                reviewed_at=datetime.datetime(2025, 10, 1 + number, tzinfo=datetime.timezone.utc),
+            )
+
+    def test_requests_are_profiled_per_endpoint(self):
+        for _ in range(2):
+            self.client.get(reverse("review-list"), {"limit": 2})
+
+        response = self.client.get(reverse("request-profiling"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        report = {row["endpoint"]: row for row in response.data["endpoints"]}
+        reviews = report["GET /api/reviews/"]
+        self.assertEqual(reviews["count"], 2)
+        self.assertGreaterEqual(reviews["queries"]["p99"], 1)
+        self.assertGreater(reviews["response_bytes"]["p99"], 0)
+        self.assertGreaterEqual(reviews["serialization_ms"]["p95"], 0)
+
+    @override_settings(REQUEST_PROFILING_SLOW_MS=0)
+    def test_slow_requests_are_logged_with_top_queries(self):
+        with self.assertLogs("review_analyser.profiling", "WARNING") as logs:
+            self.client.get(reverse("review-list"))
+
+        self.assertIn("Slow request GET /api/reviews/", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+
+    @override_settings(REQUEST_PROFILING_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_not_recorded(self):
+        self.client.get(reverse("review-list"))
+
+        self.assertEqual(get_profile_store().samples(), {})
+
+    def test_report_is_admin_only(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(
+            username="viewer", email="viewer@example.com", password="testpass123"
+        ))
+
+        self.assertEqual(client.get(reverse("request-profiling")).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_percentile(self):
+        self.assertEqual([percentile(list(range(1, 101)), rank) for rank in (50, 95, 99)], [50, 95, 99])
+        self.assertEqual(percentile([], 95), 0.0)
+
+
 class AuthenticationRequiredTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -9,4 +9,10 @@ urlpatterns = [
     path('reviews/', views.ReviewList.as_view(), name='review-list'),
     path('reviews/<int:pk>/', views.ReviewDetail.as_view(), name='review-detail'),
     path('reviews/search/', views.ReviewSearch.as_view(), name='review-search'),
+    path('reviews/search/facets/', views.ReviewFacetedSearch.as_view(), name='review-faceted-search'),
+    path('reviews/search/semantic/', views.ReviewSemanticSearch.as_view(), name='review-semantic-search'),
+    path('reviews/search/index-status/', views.ReviewIndexStatus.as_view(), name='review-index-status'),
+    path('reviews/export/<str:export_format>/', views.ReviewExport.as_view(), name='review-export'),
+    path('reviews/analytics/sentiment/', views.ReviewSentimentAnalytics.as_view(), name='review-sentiment-analytics'),
+    path('reviews/analytics/aspects/', views.ReviewTopAspects.as_view(), name='review-top-aspects'),
 ]
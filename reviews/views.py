@@ -1,14 +1,32 @@
+from django.http import FileResponse, StreamingHttpResponse
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from .documents import ReviewDocument
-from .models import Institution, Event, Review
-from .serializers import InstitutionSerializer, EventSerializer, ReviewSerializer
+from review_analyser.db_router import use_read_replica
+from .analytics import (
+    STATS_BUCKETS, STATS_GROUP_COLUMNS, refresh_daily_stats, review_stats_keys, sentiment_timeline,
+    track_daily_stats,
+)
+from .cache import EVENTS_SCOPE, INSTITUTIONS_SCOPE, REVIEWS_SCOPE, cache_response
+from .aspects import DEFAULT_TOP_ASPECTS, MAX_TOP_ASPECTS, sync_review_aspects, top_aspects
+from .export import CONTENT_TYPES, EXPORT_FORMATS, export_filename, export_xlsx_file, iter_export_rows, stream_csv
+from .filters import filter_daily_stats, filter_reviews
+from .indexing import index_queue_stats
+from .models import Institution, Event, Review, ReviewAspect, ReviewDailyStats
+from .pagination import estimate_count, paginate_reviews, parse_page_size
+from .search import (
+    HYBRID_SEARCH_PIPELINE, add_review_facets, build_review_search, build_semantic_search, is_missing_search_pipeline,
+    parse_facet_size, parse_search_window, serialize_facets, serialize_search_response,
+)
+from .serializers import (
+    InstitutionSerializer, EventSerializer, ReviewSerializer, review_rows, serialize_review_rows,
+)
 
 
 class InstitutionList(APIView):
+    @cache_response(INSTITUTIONS_SCOPE)
     def get(self, request):
         institutions = Institution.objects.all()
         serializer = InstitutionSerializer(institutions, many=True)
@@ -74,6 +92,7 @@ class InstitutionDetail(APIView):
 
 
 class EventList(APIView):
+    @cache_response(EVENTS_SCOPE)
     def get(self, request):
         events = Event.objects.all()
         serializer = EventSerializer(events, many=True)
@@ -139,15 +158,33 @@ class EventDetail(APIView):
 
 
 class ReviewList(APIView):
+    @cache_response(REVIEWS_SCOPE, INSTITUTIONS_SCOPE, EVENTS_SCOPE)
+    @use_read_replica
     def get(self, request):
-        reviews = Review.objects.all().order_by("-reviewed_at")
-        serializer = ReviewSerializer(reviews, many=True)
-        return Response(serializer.data)
+        try:
+            reviews = filter_reviews(Review.objects.all(), request.query_params)
+            page, next_cursor = paginate_reviews(
+                review_rows(reviews),
+                cursor=request.query_params.get("cursor"),
+                page_size=parse_page_size(request.query_params.get("limit")),
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {
+            "results": serialize_review_rows(page),
+            "next_cursor": next_cursor,
+        }
+        if request.query_params.get("count") in ("1", "true"):
+            data["count"] = estimate_count(reviews)
+        return Response(data)
 
     def post(self, request):
         serializer = ReviewSerializer(data=request.data)
         if serializer.is_valid():
             review = serializer.save()
+            sync_review_aspects([review])
+            refresh_daily_stats(review_stats_keys(Review.objects.filter(pk=review.pk)))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -155,7 +192,7 @@ class ReviewList(APIView):
 class ReviewDetail(APIView):
     def get_object(self, pk):
         try:
-            return Review.objects.get(pk=pk)
+            return Review.objects.with_related().get(pk=pk)
         except Review.DoesNotExist:
             return None
 
@@ -179,7 +216,9 @@ class ReviewDetail(APIView):
 
         serializer = ReviewSerializer(review, data=request.data)
         if serializer.is_valid():
-            updated_review = serializer.save()
+            with track_daily_stats(review):
+                updated_review = serializer.save()
+            sync_review_aspects([updated_review])
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -191,35 +230,168 @@ class ReviewDetail(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        review.delete()
+        with track_daily_stats(review):
+            review.delete()
         return Response(
             {"message": "Review deleted successfully"},
             status=status.HTTP_204_NO_CONTENT
         )
 
+class ReviewExport(APIView):
+    @use_read_replica
+    def get(self, request, export_format):
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Unsupported export format: {export_format}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            reviews = filter_reviews(Review.objects.all(), request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = iter_export_rows(reviews)
+        filename = export_filename(export_format)
+        if export_format == "xlsx":
+            return FileResponse(
+                export_xlsx_file(rows),
+                as_attachment=True,
+                filename=filename,
+                content_type=CONTENT_TYPES["xlsx"],
+            )
+
+        response = StreamingHttpResponse(stream_csv(rows), content_type=CONTENT_TYPES["csv"])
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ReviewSentimentAnalytics(APIView):
+    @use_read_replica
+    def get(self, request):
+        bucket = request.query_params.get("bucket", "day")
+        group_by = request.query_params.get("group_by") or None
+        if bucket not in STATS_BUCKETS:
+            return Response({"error": f"Invalid bucket: {bucket}"}, status=status.HTTP_400_BAD_REQUEST)
+        if group_by is not None and group_by not in STATS_GROUP_COLUMNS:
+            return Response({"error": f"Invalid group_by: {group_by}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            stats = filter_daily_stats(ReviewDailyStats.objects.all(), request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "bucket": bucket,
+            "group_by": group_by,
+            "results": sentiment_timeline(stats, bucket=bucket, group_by=group_by),
+        })
+
+
+class ReviewTopAspects(APIView):
+    @use_read_replica
+    def get(self, request):
+        polarity = request.query_params.get("polarity") or None
+        if polarity is not None and polarity not in dict(ReviewAspect.POLARITY_CHOICES):
+            return Response({"error": f"Invalid polarity: {polarity}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = int(request.query_params.get("limit", DEFAULT_TOP_ASPECTS))
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return Response({"error": "Invalid limit"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            review_aspects = filter_reviews(ReviewAspect.objects.all(), request.query_params, prefix="review__")
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "results": top_aspects(review_aspects, polarity=polarity, limit=min(limit, MAX_TOP_ASPECTS)),
+        })
+
+
 class ReviewSearch(APIView):
+    facets = False
+
+    @cache_response(REVIEWS_SCOPE, INSTITUTIONS_SCOPE, EVENTS_SCOPE)
     def get(self, request, *args, **kwargs):
         search_query = request.GET.get('q', '').strip()
-        if not search_query:
+        if not search_query and not self.facets:
             return Response({
                 'results': [],
                 'count': 0,
-                'query': search_query
+                'query': search_query,
+                'next_cursor': None,
             })
+
         try:
-            search = ReviewDocument.search().query(
-                'match', text=search_query
+            size, offset = parse_search_window(request.GET.get('size'), request.GET.get('from'))
+            search = build_review_search(
+                search_query,
+                request.query_params,
+                size=size,
+                offset=offset,
+                cursor=request.GET.get('cursor'),
             )
+            if self.facets:
+                search = add_review_facets(search, parse_facet_size(request.GET.get('facet_size')))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
             response = search.execute()
-            review_ids = [hit.meta.id for hit in response]
-            reviews = Review.objects.filter(id__in=review_ids)
-            serializer = ReviewSerializer(reviews, many=True)
-            return Response({
-                'results': serializer.data,
-                'count': len(serializer.data),
+            results, count, next_cursor = serialize_search_response(response, size)
+            data = {
+                'results': results,
+                'count': count,
                 'query': search_query,
-            })
+                'next_cursor': next_cursor,
+            }
+            if self.facets:
+                data['facets'] = serialize_facets(response)
+            return Response(data)
         except Exception as e:
             return Response({
                 'error': f'Error occured: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ReviewFacetedSearch(ReviewSearch):
+    facets = True
+
+
+class ReviewSemanticSearch(APIView):
+    @cache_response(REVIEWS_SCOPE, INSTITUTIONS_SCOPE, EVENTS_SCOPE)
+    def get(self, request):
+        search_query = request.GET.get('q', '').strip()
+        if not search_query:
+            return Response({'results': [], 'count': 0, 'query': search_query})
+
+        try:
+            size, offset = parse_search_window(request.GET.get('size'), request.GET.get('from'))
+            search = build_semantic_search(search_query, request.query_params, size=size, offset=offset)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            response = search.execute()
+            results, count, _ = serialize_search_response(response, size)
+            return Response({'results': results, 'count': count, 'query': search_query})
+        except Exception as e:
+            if is_missing_search_pipeline(e):
+                return Response({
+                    'error': f'Search pipeline {HYBRID_SEARCH_PIPELINE} is missing, '
+                             f'run "python manage.py create_search_pipeline"'
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            return Response({
+                'error': f'Error occured: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ReviewIndexStatus(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(index_queue_stats())